@@ -0,0 +1,5 @@
+"""Performance benchmarks for Tech Docs Explorer.
+
+Run a benchmark as a module from the project root, e.g.:
+    uv run python -m benchmarks.chunking
+"""
@@ -0,0 +1,100 @@
+"""Chunking throughput benchmark.
+
+Measures how split_documents() scales with the number of worker processes on
+a synthetic corpus, and checks that every worker count produces exactly the
+same nodes in the same order.
+
+Usage:
+    uv run python -m benchmarks.chunking --documents 200 --paragraphs 400
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import List
+
+from llama_index.core import Document
+
+from core.indexing.pipeline import split_documents
+
+
+_WORDS = (
+    "kubernetes pod deployment service ingress container image registry "
+    "request response handler middleware dependency injection router "
+    "database transaction index query cache latency throughput replica"
+).split()
+
+
+def _make_corpus(num_documents: int, paragraphs: int, seed: int) -> List[Document]:
+    """Build a reproducible synthetic corpus of technical-looking documents."""
+    rng = random.Random(seed)
+    documents = []
+    for doc_idx in range(num_documents):
+        text = "\n\n".join(
+            ". ".join(
+                " ".join(rng.choices(_WORDS, k=rng.randint(8, 20))).capitalize()
+                for _ in range(rng.randint(3, 8))
+            )
+            + "."
+            for _ in range(paragraphs)
+        )
+        documents.append(
+            Document(
+                text=text,
+                id_=f"doc-{doc_idx}",
+                metadata={"filename": f"doc-{doc_idx}.pdf"},
+            )
+        )
+    return documents
+
+
+def main() -> None:
+    """Run the benchmark and print a throughput table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default=None,
+        help="Comma-separated worker counts (default: 1, 2, 4, 8 up to CPU count)",
+    )
+    args = parser.parse_args()
+
+    documents = _make_corpus(args.documents, args.paragraphs, args.seed)
+    total_mb = sum(len(doc.text) for doc in documents) / 1_000_000
+    print(f"Corpus: {len(documents)} documents, {total_mb:.1f} MB of text")
+
+    if args.workers:
+        worker_counts = sorted({int(w) for w in args.workers.split(",")} | {1})
+    else:
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'chunks/s':>10} {'MB/s':>7} {'speedup':>8}")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        nodes = split_documents(
+            documents, args.chunk_size, args.chunk_overlap, workers=workers
+        )
+        elapsed = time.perf_counter() - start
+
+        signature = [(node.ref_doc_id, node.get_content()) for node in nodes]
+        if baseline is None:
+            baseline = (elapsed, signature)
+        elif signature != baseline[1]:
+            raise RuntimeError(f"Output with {workers} workers differs from serial")
+
+        print(
+            f"{workers:>8} {elapsed:>9.2f} {len(nodes) / elapsed:>10.0f} "
+            f"{total_mb / elapsed:>7.2f} {baseline[0] / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Chroma client contention benchmark.
+
+Measures how many get_chroma_client() calls per second concurrent threads
+complete once the client exists, with the lock-free fast path and with a
+baseline that takes the client lock on every call (the previous behaviour).
+
+Usage:
+    uv run python -m benchmarks.client_contention --threads 1,4,16 --calls 20000
+"""
+
+import argparse
+import threading
+import time
+from typing import Callable, List
+
+from core.storage import client as client_module
+from core.storage.client import get_chroma_client, get_client_metrics
+
+
+def _locked_get_client():
+    """Baseline: read the existing client under the lock on every call."""
+    with client_module._chroma_client_lock:
+        return client_module._chroma_client
+
+
+def _run(fn: Callable[[], object], threads: int, calls: int, count: bool) -> float:
+    """Run calls per thread concurrently and return the elapsed seconds."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker() -> None:
+        barrier.wait()
+        for _ in range(calls):
+            client = fn()
+            if count:
+                client.heartbeat()
+
+    workers: List[threading.Thread] = [
+        threading.Thread(target=worker) for _ in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a throughput table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=str, default="1,2,4,8,16")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument(
+        "--heartbeat",
+        action="store_true",
+        help="Also call client.heartbeat() after each lookup",
+    )
+    args = parser.parse_args()
+
+    get_chroma_client()  # Create the client outside the measurement
+
+    print(f"{'threads':>8} {'mode':>10} {'seconds':>9} {'calls/s':>12} {'speedup':>8}")
+    for threads in sorted({int(t) for t in args.threads.split(",")}):
+        total = threads * args.calls
+        baseline = _run(_locked_get_client, threads, args.calls, args.heartbeat)
+        fast = _run(get_chroma_client, threads, args.calls, args.heartbeat)
+        print(f"{threads:>8} {'locked':>10} {baseline:>9.3f} {total / baseline:>12.0f}")
+        print(
+            f"{threads:>8} {'lock-free':>10} {fast:>9.3f} {total / fast:>12.0f} "
+            f"{baseline / fast:>7.2f}x"
+        )
+
+    print(f"Client metrics: {get_client_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
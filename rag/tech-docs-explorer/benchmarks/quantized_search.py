@@ -0,0 +1,136 @@
+"""Quantized search benchmark.
+
+Compares exact float32 search with the two-stage quantized search
+(1-bit or int8 candidate pass + float32 rescoring) and reports the memory
+saved, latency and recall@k for several rescore factors. Runs on synthetic
+clustered vectors by default, or on the embeddings of a collection.
+
+Usage:
+    uv run python -m benchmarks.quantized_search --vectors 100000 --dim 1536
+    uv run python -m benchmarks.quantized_search --collection tech_docs
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from core.storage.quantized import QuantizedIndex
+
+
+def _synthetic_vectors(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors around random topic centers, like embeddings of a corpus."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)]
+    vectors += 0.8 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _collection_vectors(name: str) -> np.ndarray:
+    """Read every embedding of a collection."""
+    from core.storage import get_or_create_collection
+
+    collection = get_or_create_collection(name)
+    pages = []
+    for offset in range(0, collection.count(), 5000):
+        page = collection.get(include=["embeddings"], limit=5000, offset=offset)
+        pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+    if not pages:
+        raise SystemExit(f"Collection '{name}' is empty")
+    vectors = np.concatenate(pages)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(1e-12)
+
+
+def _pages(vectors: np.ndarray) -> Iterable[Tuple[List[str], np.ndarray, List[str]]]:
+    """Feed the vectors to QuantizedIndex.build() a page at a time."""
+    for start in range(0, len(vectors), 10000):
+        page = vectors[start : start + 10000]
+        ids = [str(start + i) for i in range(len(page))]
+        yield ids, page, [""] * len(page)
+
+
+def _percentile_ms(latencies: List[float], q: float) -> float:
+    """Percentile of latencies in seconds, in milliseconds."""
+    return float(np.percentile(latencies, q)) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a memory/latency/recall table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", type=str, default=None)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--bits", type=str, default="1,8")
+    parser.add_argument("--rescore-factor", type=str, default="1,4,10,20")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.collection:
+        vectors = _collection_vectors(args.collection)
+    else:
+        vectors = _synthetic_vectors(
+            args.vectors + args.queries, args.dim, args.clusters, args.seed
+        )
+    # Hold out queries so they are not in the corpus
+    rng = np.random.default_rng(args.seed)
+    num_queries = min(args.queries, len(vectors) // 10)
+    order = rng.permutation(len(vectors))
+    queries, corpus = vectors[order[:num_queries]], vectors[order[num_queries:]]
+    top_k = min(args.top_k, len(corpus))
+    print(f"{len(corpus)} vectors x {corpus.shape[1]} dims, {num_queries} queries")
+
+    # Exact search over float32 vectors held in RAM (ground truth)
+    exact, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = corpus @ query
+        exact.append(set(np.argpartition(-scores, top_k - 1)[:top_k].tolist()))
+        latencies.append(time.perf_counter() - start)
+
+    print(
+        f"{'mode':>8} {'rescore':>7} {'ram_mb':>9} {'saved':>7} "
+        f"{'p50_ms':>7} {'p95_ms':>7} {f'recall@{top_k}':>10}"
+    )
+    float_mb = corpus.nbytes / 1_000_000
+    print(
+        f"{'float32':>8} {'-':>7} {float_mb:>9.1f} {'0%':>7} "
+        f"{_percentile_ms(latencies, 50):>7.2f} {_percentile_ms(latencies, 95):>7.2f} "
+        f"{1.0:>10.3f}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for bits in sorted({int(b) for b in args.bits.split(",")}):
+            index = QuantizedIndex.build(
+                Path(tmp) / f"b{bits}",
+                _pages(corpus),
+                count=len(corpus),
+                bits=bits,
+                space="cosine",
+            )
+            ram_mb = index.memory_bytes / 1_000_000
+            saved = 1 - index.memory_bytes / index.full_precision_bytes
+            for factor in sorted({int(f) for f in args.rescore_factor.split(",")}):
+                hits, latencies = 0, []
+                for query, truth in zip(queries, exact):
+                    start = time.perf_counter()
+                    results = index.search(query, top_k, rescore_k=top_k * factor)
+                    latencies.append(time.perf_counter() - start)
+                    hits += len(truth & {int(node_id) for node_id, _ in results})
+                print(
+                    f"{f'{bits}-bit':>8} {f'x{factor}':>7} {ram_mb:>9.1f} "
+                    f"{saved:>7.0%} {_percentile_ms(latencies, 50):>7.2f} "
+                    f"{_percentile_ms(latencies, 95):>7.2f} "
+                    f"{hits / (top_k * num_queries):>10.3f}"
+                )
+            del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Command-line interface for Tech Docs Explorer.
+
+Provides headless commands for operating the index without the Streamlit UI:
+- ingest: Bulk-index directories and URL lists
+- export / import: Write the index to a snapshot and load it on another node
+- tune-hnsw: Measure HNSW latency/recall tradeoffs on the current corpus
+- quantize: Build or refresh the quantized indexes ahead of queries
+"""
+
+from .main import main
+
+__all__ = ["main"]
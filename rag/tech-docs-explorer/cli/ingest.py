@@ -0,0 +1,375 @@
+"""Bulk ingestion command.
+
+Indexes every supported file under one or more directories plus the URLs
+listed in one or more text files, using the same loaders and indexing
+pipeline as the Streamlit indexing tab. Sources are loaded concurrently and
+indexed in batches as they arrive; progress goes to stderr and a JSON
+summary goes to stdout (or --summary), so the command can run from cron.
+
+Usage:
+    tech-docs-explorer ingest --dir ./docs --urls urls.txt --stack fastapi
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from llama_index.core import Document
+
+from core.indexing import IndexStats, delete_document, index_documents
+from core.loaders import BaseLoader, CrawlerLoader, get_loader
+from core.storage import rebuild_stacks
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the ingest subcommand."""
+    parser = subparsers.add_parser(
+        "ingest",
+        help="Bulk-index directories and URL lists",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument(
+        "--dir",
+        dest="dirs",
+        action="append",
+        default=[],
+        type=Path,
+        help="Directory to scan recursively for supported files (repeatable)",
+    )
+    parser.add_argument(
+        "--urls",
+        dest="url_files",
+        action="append",
+        default=[],
+        type=Path,
+        help="Text file with one URL per line; '#' starts a comment (repeatable)",
+    )
+    parser.add_argument(
+        "--stack", required=True, help="Technology stack tag for all sources"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of sources loaded concurrently (default: 8)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Documents per indexing batch (default: 100)",
+    )
+    parser.add_argument(
+        "--crawl-depth",
+        type=int,
+        default=None,
+        help="Crawl same-domain links from each URL up to this depth",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Page budget per crawled URL (default: crawler.max_pages)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="When crawling, re-index only pages changed since the last crawl",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help=(
+            "Index into a new collection version and swap it in when done; "
+            "it replaces the whole collection (or stack shard)"
+        ),
+    )
+    parser.add_argument(
+        "--keep-untouched",
+        action="store_true",
+        help=(
+            "With --rebuild, carry over the documents not re-indexed from the "
+            "active version (needs the same embedding model and chunking)"
+        ),
+    )
+    parser.add_argument(
+        "--summary",
+        type=Path,
+        default=None,
+        help="Write the JSON summary to this file instead of stdout",
+    )
+    parser.set_defaults(handler=run)
+
+
+def _log(message: str) -> None:
+    """Write a progress line to stderr."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def collect_sources(dirs: List[Path], url_files: List[Path]) -> List[Dict[str, Any]]:
+    """Expand directories and URL list files into individual sources.
+
+    Args:
+        dirs: Directories to scan recursively
+        url_files: Files with one URL per line
+
+    Returns:
+        List of source dicts with "source", "type" and optional "filename"
+
+    Raises:
+        ValueError: If a directory or URL file doesn't exist
+    """
+    sources: List[Dict[str, Any]] = []
+
+    for directory in dirs:
+        if not directory.is_dir():
+            raise ValueError(f"Directory not found: {directory}")
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file():
+                continue
+            try:
+                get_loader(path)
+            except ValueError:
+                continue  # Unsupported file type
+            sources.append(
+                {
+                    "source": str(path),
+                    "type": "file",
+                    # Relative path keeps same-named files in different folders apart
+                    "filename": str(path.relative_to(directory)),
+                }
+            )
+
+    for url_file in url_files:
+        if not url_file.is_file():
+            raise ValueError(f"URL list not found: {url_file}")
+        for line in url_file.read_text().splitlines():
+            url = line.split("#", 1)[0].strip()
+            if url:
+                sources.append({"source": url, "type": "url"})
+
+    return sources
+
+
+def _load_source(
+    source: Dict[str, Any], stack: str, crawl_options: Optional[Dict[str, Any]]
+) -> List[Document]:
+    """Load one source and tag its documents like the indexing tab does."""
+    loader: BaseLoader
+    if source["type"] == "url" and crawl_options is not None:
+        loader = CrawlerLoader(**crawl_options)
+    else:
+        loader = get_loader(source["source"])
+    documents = loader.load(source["source"])
+
+    for doc in documents:
+        doc.metadata["stack"] = stack
+        doc.metadata["source_type"] = (
+            "url" if source["type"] == "url" else loader.get_source_type()
+        )
+        if "filename" in source:
+            doc.metadata["original_filename"] = source["filename"]
+
+    return documents
+
+
+def _accumulate(totals: Dict[str, Any], stats: IndexStats) -> None:
+    """Add the statistics of one indexing batch to the running totals."""
+    totals["documents_indexed"] += stats.documents_processed
+    totals["chunks"] += stats.num_chunks
+    totals["duplicates_removed"] += stats.duplicates_removed
+    totals["embedding_tokens"] += stats.embedding_tokens
+    totals["estimated_cost"] += stats.estimated_cost
+    totals["bytes_processed"] += stats.bytes_processed
+    totals["peak_rss_mb"] = max(totals["peak_rss_mb"], stats.peak_rss_mb)
+    for stage in ("split", "dedup", "embed", "store"):
+        totals["stage_times"][stage] += stats.stage_times[stage]
+
+
+def ingest(
+    sources: List[Dict[str, Any]],
+    stack: str,
+    workers: int = 8,
+    batch_size: int = 100,
+    collection_name: str = "tech_docs",
+    crawl_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Load sources concurrently and index them in batches.
+
+    Args:
+        sources: Sources returned by collect_sources()
+        stack: Technology stack tag for all documents
+        workers: Number of concurrent loader threads
+        batch_size: Number of documents per index_documents() call
+        collection_name: Collection to index into
+        crawl_options: CrawlerLoader arguments to crawl URL sources instead of
+            fetching single pages. With only_changed, the previous chunks of
+            each changed page are replaced.
+
+    Returns:
+        Summary dict with counts, failures, tokens, cost, per-stage timings
+        and throughput. Loading overlaps with indexing, so it is only
+        reflected in the total time_taken.
+    """
+    start_time = time.time()
+    metadata = {"stacks": stack}
+    totals: Dict[str, Any] = {
+        "sources_total": len(sources),
+        "sources_loaded": 0,
+        "sources_failed": [],
+        "documents_indexed": 0,
+        "chunks": 0,
+        "duplicates_removed": 0,
+        "embedding_tokens": 0,
+        "estimated_cost": 0.0,
+        "batches": 0,
+        "bytes_processed": 0,
+        "peak_rss_mb": 0.0,
+        "stage_times": {"split": 0.0, "dedup": 0.0, "embed": 0.0, "store": 0.0},
+    }
+    pending: List[Document] = []
+
+    replace_pages = bool(crawl_options and crawl_options.get("only_changed"))
+
+    def _flush() -> None:
+        batch = pending[:]
+        pending.clear()
+        if replace_pages:
+            for doc in batch:
+                delete_document(doc.metadata["source_url"], collection_name)
+        stats = index_documents(batch, metadata, collection_name=collection_name)
+        totals["batches"] += 1
+        _accumulate(totals, stats)
+        _log(
+            f"[INGEST] Batch {totals['batches']}: {stats.documents_processed} docs -> "
+            f"{stats.num_chunks} chunks in {stats.time_taken:.2f}s "
+            f"(split {stats.split_time:.2f}s, dedup {stats.dedup_time:.2f}s, "
+            f"embed {stats.embed_time:.2f}s, store {stats.store_time:.2f}s)"
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(_load_source, source, stack, crawl_options): source
+            for source in sources
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+            try:
+                documents = future.result()
+            except Exception as e:
+                totals["sources_failed"].append(
+                    {"source": source["source"], "error": str(e)}
+                )
+                _log(f"[INGEST] [{done}/{len(sources)}] FAILED {source['source']}: {e}")
+                continue
+
+            totals["sources_loaded"] += 1
+            pending.extend(documents)
+            _log(
+                f"[INGEST] [{done}/{len(sources)}] Loaded {source['source']} "
+                f"({len(documents)} docs)"
+            )
+
+            if len(pending) >= batch_size:
+                _flush()
+
+    if pending:
+        _flush()
+
+    totals["collection"] = collection_name
+    totals["time_taken"] = time.time() - start_time
+    stage_times = totals["stage_times"]
+    indexing_time = sum(stage_times.values())
+    totals["chunks_per_second"] = (
+        totals["chunks"] / indexing_time if indexing_time else 0.0
+    )
+    totals["tokens_per_second"] = (
+        totals["embedding_tokens"] / stage_times["embed"]
+        if stage_times["embed"]
+        else 0.0
+    )
+    return totals
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the ingest command.
+
+    Returns:
+        0 if every source was indexed, 1 if some sources failed,
+        2 if no source could be loaded or indexing failed
+    """
+    try:
+        sources = collect_sources(args.dirs, args.url_files)
+    except ValueError as e:
+        _log(f"[INGEST] Error: {e}")
+        return 2
+
+    if not sources:
+        _log("[INGEST] No supported sources found")
+        return 2
+
+    crawl_options = None
+    if args.crawl_depth is not None:
+        crawl_options = {
+            "max_depth": args.crawl_depth,
+            "max_pages": args.max_pages,
+            "only_changed": args.changed_only,
+        }
+    elif args.changed_only:
+        _log("[INGEST] Error: --changed-only requires --crawl-depth")
+        return 2
+
+    if args.keep_untouched and not args.rebuild:
+        _log("[INGEST] Error: --keep-untouched requires --rebuild")
+        return 2
+
+    if args.rebuild and args.changed_only:
+        _log("[INGEST] Error: --rebuild needs every page, not only changed ones")
+        return 2
+
+    _log(f"[INGEST] {len(sources)} source(s) to index with stack '{args.stack}'")
+
+    summary: Optional[Dict[str, Any]] = None
+    try:
+        # A rebuild indexes into a fresh version that replaces the active one
+        # (with sharding enabled, only the shard of this stack is rebuilt)
+        context = (
+            rebuild_stacks(
+                "tech_docs", [args.stack], keep_documents=args.keep_untouched
+            )
+            if args.rebuild
+            else nullcontext()
+        )
+        with context as targets:
+            summary = ingest(
+                sources,
+                stack=args.stack,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                collection_name=targets[args.stack] if targets else "tech_docs",
+                crawl_options=crawl_options,
+            )
+            if args.rebuild and summary["documents_indexed"] == 0:
+                raise RuntimeError("Rebuild produced an empty index; keeping current")
+    except Exception as e:
+        _log(f"[INGEST] Error: {e}")
+        summary = summary or {"sources_total": len(sources)}
+        summary["error"] = str(e)
+
+    output = json.dumps(summary, indent=2)
+    if args.summary:
+        args.summary.write_text(output + "\n")
+    else:
+        print(output)
+
+    if "error" in summary or summary["sources_loaded"] == 0:
+        return 2
+    return 1 if summary["sources_failed"] else 0
+
+
+__all__ = ["register", "collect_sources", "ingest", "run"]
@@ -0,0 +1,47 @@
+"""Command-line entry point for Tech Docs Explorer."""
+
+import argparse
+from typing import List, Optional
+
+from cli import ingest, quantize, snapshot, tune_hnsw
+from config import configure_logging, get_settings
+from core.storage import drop_retired_collections
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands registered."""
+    parser = argparse.ArgumentParser(
+        prog="tech-docs-explorer",
+        description="Headless operations for the Tech Docs Explorer index.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest.register(subparsers)
+    snapshot.register(subparsers)
+    tune_hnsw.register(subparsers)
+    quantize.register(subparsers)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the selected command.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(get_settings().debug)
+    # Collections retired by a process that exited before deleting them
+    try:
+        drop_retired_collections()
+    except Exception as e:
+        print(f"[CLEAR_DB] Warning: could not delete retired collections: {e}")
+    return args.handler(args)
+
+
+__all__ = ["build_parser", "main"]
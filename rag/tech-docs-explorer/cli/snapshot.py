@@ -0,0 +1,116 @@
+"""Snapshot export and import commands.
+
+Export writes a collection and its per-stack shards to a columnar snapshot
+(Parquet chunks plus an NPY embedding matrix per collection); import
+bulk-loads a snapshot into new collection versions and activates them, so a
+new node gets a full index without any embedding calls.
+
+Usage:
+    tech-docs-explorer export ./snapshots/latest --dtype float16
+    tech-docs-explorer import ./snapshots/latest
+"""
+
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from core.storage import export_snapshot, import_snapshot
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the export and import subcommands."""
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export the index to a snapshot directory",
+        description="Export a collection to a Parquet + NPY snapshot.",
+    )
+    export_parser.add_argument(
+        "output_dir", type=Path, help="Directory to write the snapshot into"
+    )
+    export_parser.add_argument(
+        "--collection",
+        default="tech_docs",
+        help="Collection to export, with its shards (default: tech_docs)",
+    )
+    export_parser.add_argument(
+        "--dtype",
+        choices=["float16", "float32"],
+        default="float16",
+        help="Embedding storage type (default: float16, half the size)",
+    )
+    export_parser.set_defaults(handler=run_export)
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Load a snapshot into a new collection version",
+        description="Bulk-load a snapshot and swap it in as the active collection.",
+    )
+    import_parser.add_argument(
+        "snapshot_dir", type=Path, help="Directory written by the export command"
+    )
+    import_parser.add_argument(
+        "--collection",
+        default="tech_docs",
+        help="Collection to replace with the snapshot (default: tech_docs)",
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Chunks per insert (default: the maximum ChromaDB accepts)",
+    )
+    import_parser.set_defaults(handler=run_import)
+
+
+def _log(message: str) -> None:
+    """Write a progress line to stderr."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """Run the export command.
+
+    Progress goes to stderr; only the manifest is written to stdout.
+
+    Returns:
+        0 on success, 2 on error
+    """
+    try:
+        with redirect_stdout(sys.stderr):
+            manifest = export_snapshot(
+                args.output_dir, collection_name=args.collection, dtype=args.dtype
+            )
+    except Exception as e:
+        _log(f"[SNAPSHOT] Error: {e}")
+        return 2
+
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+def run_import(args: argparse.Namespace) -> int:
+    """Run the import command.
+
+    Progress goes to stderr; only the result is written to stdout.
+
+    Returns:
+        0 on success, 2 on error (the active collection is left untouched)
+    """
+    try:
+        with redirect_stdout(sys.stderr):
+            result = import_snapshot(
+                args.snapshot_dir,
+                collection_name=args.collection,
+                batch_size=args.batch_size,
+            )
+    except Exception as e:
+        _log(f"[SNAPSHOT] Error: {e}")
+        return 2
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+__all__ = ["register", "run_export", "run_import"]
@@ -0,0 +1,131 @@
+"""HNSW tuning command.
+
+Sweeps M, construction_ef and search_ef on the embeddings already stored in
+a collection and reports build time, index size, query latency and recall
+against exact search, then suggests the fastest configuration that reaches
+the target recall.
+
+Usage:
+    tech-docs-explorer tune-hnsw --m 8,16,32 --search-ef 10,50,100 --target-recall 0.95
+"""
+
+import argparse
+import sys
+from typing import List
+
+from core.storage import tune_hnsw
+
+
+def _int_list(value: str) -> List[int]:
+    """Parse a comma-separated list of positive integers."""
+    try:
+        values = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected integers, got '{value}'")
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError(f"Expected positive integers, got '{value}'")
+    return values
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the tune-hnsw subcommand."""
+    parser = subparsers.add_parser(
+        "tune-hnsw",
+        help="Sweep HNSW parameters against exact search on the current corpus",
+        description=(
+            "Build scratch HNSW indexes from the collection's embeddings and "
+            "measure build time, index size, latency and recall@k."
+        ),
+    )
+    parser.add_argument(
+        "--collection",
+        default="tech_docs",
+        help="Collection to tune (default: tech_docs)",
+    )
+    parser.add_argument(
+        "--m", type=_int_list, default=[8, 16, 32], help="M values (default: 8,16,32)"
+    )
+    parser.add_argument(
+        "--construction-ef",
+        type=_int_list,
+        default=[100, 200],
+        help="construction_ef values (default: 100,200)",
+    )
+    parser.add_argument(
+        "--search-ef",
+        type=_int_list,
+        default=[10, 50, 100, 200],
+        help="search_ef values (default: 10,50,100,200)",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=200,
+        help="Chunks held out as queries (default: 200)",
+    )
+    parser.add_argument(
+        "--top-k", type=int, default=10, help="Neighbours per query (default: 10)"
+    )
+    parser.add_argument(
+        "--target-recall",
+        type=float,
+        default=0.95,
+        help="Recall the suggested configuration must reach (default: 0.95)",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the tune-hnsw command.
+
+    Returns:
+        0 on success, 2 on error
+    """
+    try:
+        results = tune_hnsw(
+            collection_name=args.collection,
+            m_values=args.m,
+            construction_ef_values=args.construction_ef,
+            search_ef_values=args.search_ef,
+            num_queries=args.queries,
+            top_k=args.top_k,
+        )
+    except Exception as e:
+        print(f"[HNSW] Error: {e}", file=sys.stderr, flush=True)
+        return 2
+
+    print(
+        f"{'M':>4} {'constr_ef':>9} {'search_ef':>9} {'build_s':>8} {'index_mb':>9} "
+        f"{'p50_ms':>7} {'p95_ms':>7} {'qps':>7} {f'recall@{args.top_k}':>10}"
+    )
+    for r in results:
+        print(
+            f"{r['M']:>4} {r['construction_ef']:>9} {r['search_ef']:>9} "
+            f"{r['build_seconds']:>8.2f} {r['index_mb']:>9.1f} {r['p50_ms']:>7.2f} "
+            f"{r['p95_ms']:>7.2f} {r['qps']:>7.0f} {r['recall']:>10.3f}"
+        )
+
+    candidates = [r for r in results if r["recall"] >= args.target_recall]
+    if not candidates:
+        print(
+            f"\nNo configuration reached recall {args.target_recall:.2f}; "
+            "try larger M, construction_ef or search_ef."
+        )
+        return 0
+
+    best = min(candidates, key=lambda r: (r["p50_ms"], r["index_mb"]))
+    print(
+        f"\nFastest configuration with recall >= {args.target_recall:.2f} "
+        f"(recall {best['recall']:.3f}, p50 {best['p50_ms']:.2f}ms). "
+        "Add to config/config.yaml and re-index:\n"
+        f"hnsw:\n"
+        f"  collections:\n"
+        f"    {args.collection}:\n"
+        f"      M: {best['M']}\n"
+        f"      construction_ef: {best['construction_ef']}\n"
+        f"      search_ef: {best['search_ef']}"
+    )
+    return 0
+
+
+__all__ = ["register", "run"]
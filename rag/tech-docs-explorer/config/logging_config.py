@@ -0,0 +1,27 @@
+"""Logging setup for Tech Docs Explorer.
+
+Application modules log through loggers named after their module
+(logging.getLogger(__name__)); this module routes them to stderr with a
+timestamped format. Third-party loggers stay at WARNING.
+"""
+
+import logging
+
+
+_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+# Top-level packages whose loggers are shown at INFO (DEBUG in debug mode)
+_APP_LOGGERS = ("cli", "core", "llm", "ui")
+
+
+def configure_logging(debug: bool = False) -> None:
+    """Configure logging for the application (safe to call more than once).
+
+    Args:
+        debug: Show DEBUG messages from application loggers.
+    """
+    logging.basicConfig(level=logging.WARNING, format=_LOG_FORMAT)
+    for name in _APP_LOGGERS:
+        logging.getLogger(name).setLevel(logging.DEBUG if debug else logging.INFO)
+
+
+__all__ = ["configure_logging"]
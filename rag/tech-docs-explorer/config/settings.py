@@ -13,6 +13,12 @@ import yaml
 from dotenv import load_dotenv
 
 
+# Supported ChromaDB client modes (chroma.mode in config.yaml)
+CHROMA_MODES = ("embedded", "http")
+# Supported vector search backends (rag.retrieval_mode in config.yaml)
+RETRIEVAL_MODES = ("hnsw", "quantized")
+
+
 class Settings:
     """Singleton class for application settings.
 
@@ -62,11 +68,26 @@ class Settings:
 
     def _validate_settings(self):
         """Validate required settings are present."""
-        if not self.openai_api_key:
+        if self.llm_provider == "openai" and not self.openai_api_key:
             raise ValueError(
                 "OPENAI_API_KEY is required. Please set it in your .env file.\n"
                 "Copy .env.example to .env and add your API key."
             )
+        if self.chroma_mode not in CHROMA_MODES:
+            raise ValueError(
+                f"Invalid chroma.mode '{self.chroma_mode}' in config.yaml. "
+                f"Use one of: {', '.join(CHROMA_MODES)}"
+            )
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(
+                f"Invalid rag.retrieval_mode '{self.retrieval_mode}' in config.yaml. "
+                f"Use one of: {', '.join(RETRIEVAL_MODES)}"
+            )
+        if self.quantization_bits not in (1, 8):
+            raise ValueError(
+                f"Invalid rag.quantization.bits {self.quantization_bits} in "
+                "config.yaml. Use 1 or 8"
+            )
 
     # App settings
     @property
@@ -90,6 +111,31 @@ class Settings:
         """Get chunk overlap for text splitting."""
         return self._config.get("indexing", {}).get("chunk_overlap", 200)
 
+    @property
+    def split_workers(self) -> int:
+        """Get number of worker processes for chunking (0 = all CPU cores)."""
+        return self._config.get("indexing", {}).get("split_workers", 0)
+
+    @property
+    def dedup_enabled(self) -> bool:
+        """Get whether near-duplicate chunks are dropped before embedding."""
+        return self._config.get("indexing", {}).get("dedup", {}).get("enabled", True)
+
+    @property
+    def dedup_threshold(self) -> float:
+        """Get Jaccard similarity threshold for near-duplicate chunks."""
+        return self._config.get("indexing", {}).get("dedup", {}).get("threshold", 0.9)
+
+    @property
+    def dedup_num_perm(self) -> int:
+        """Get number of MinHash permutations for near-duplicate detection."""
+        return self._config.get("indexing", {}).get("dedup", {}).get("num_perm", 128)
+
+    @property
+    def dedup_shingle_size(self) -> int:
+        """Get number of words per shingle for near-duplicate detection."""
+        return self._config.get("indexing", {}).get("dedup", {}).get("shingle_size", 5)
+
     # RAG settings
     @property
     def default_top_k(self) -> int:
@@ -111,27 +157,337 @@ class Settings:
         """Get reranking default enabled state."""
         return self._config.get("rag", {}).get("reranking_enabled", False)
 
+    @property
+    def retrieval_mode(self) -> str:
+        """Get vector search backend ("hnsw" or "quantized")."""
+        return self._config.get("rag", {}).get("retrieval_mode", "hnsw")
+
+    @property
+    def quantization_bits(self) -> int:
+        """Get bits per dimension of quantized embeddings (1 or 8)."""
+        return self._config.get("rag", {}).get("quantization", {}).get("bits", 1)
+
+    @property
+    def quantization_rescore_factor(self) -> int:
+        """Get candidates rescored in float32 per requested chunk."""
+        return (
+            self._config.get("rag", {})
+            .get("quantization", {})
+            .get("rescore_factor", 10)
+        )
+
+    @property
+    def expansion_mode(self) -> str:
+        """Get context expansion of retrieved chunks ("none", "neighbours" or "parent")."""
+        return (
+            self._config.get("rag", {}).get("expansion", {}).get("mode", "neighbours")
+        )
+
+    @property
+    def expansion_window(self) -> int:
+        """Get neighbour chunks added on each side of a retrieved chunk."""
+        return self._config.get("rag", {}).get("expansion", {}).get("window", 1)
+
+    @property
+    def expansion_max_chunks(self) -> int:
+        """Get maximum chunks in the expanded context sent to the LLM."""
+        return self._config.get("rag", {}).get("expansion", {}).get("max_chunks", 10)
+
+    # PDF settings
+    @property
+    def pdf_workers(self) -> int:
+        """Get number of worker processes for PDF page extraction (0 = all cores)."""
+        return self._config.get("pdf", {}).get("workers", 0)
+
+    @property
+    def pdf_slow_page_seconds(self) -> float:
+        """Get extraction time above which a PDF page is reported as slow."""
+        return self._config.get("pdf", {}).get("slow_page_seconds", 1.0)
+
+    # Crawler settings
+    @property
+    def crawler_max_depth(self) -> int:
+        """Get default link depth followed by the web crawler."""
+        return self._config.get("crawler", {}).get("max_depth", 1)
+
+    @property
+    def crawler_max_pages(self) -> int:
+        """Get default page budget per crawl."""
+        return self._config.get("crawler", {}).get("max_pages", 50)
+
+    @property
+    def crawler_concurrency(self) -> int:
+        """Get number of concurrent requests made by the web crawler."""
+        return self._config.get("crawler", {}).get("concurrency", 8)
+
+    @property
+    def crawler_timeout_seconds(self) -> float:
+        """Get HTTP timeout for crawler requests."""
+        return self._config.get("crawler", {}).get("timeout_seconds", 15)
+
+    @property
+    def crawler_user_agent(self) -> str:
+        """Get User-Agent sent by the crawler (also used for robots.txt rules)."""
+        return self._config.get("crawler", {}).get("user_agent", "TechDocsExplorer/0.1")
+
+    # ChromaDB settings
+    @property
+    def chroma_mode(self) -> str:
+        """Get ChromaDB client mode: "embedded" (local directory) or "http" (server)."""
+        return self._config.get("chroma", {}).get("mode", "embedded")
+
+    @property
+    def chroma_host(self) -> str:
+        """Get ChromaDB server host (http mode)."""
+        return self._config.get("chroma", {}).get("host", "localhost")
+
+    @property
+    def chroma_port(self) -> int:
+        """Get ChromaDB server port (http mode)."""
+        return self._config.get("chroma", {}).get("port", 8000)
+
+    @property
+    def chroma_ssl(self) -> bool:
+        """Get whether the ChromaDB server is reached over HTTPS (http mode)."""
+        return self._config.get("chroma", {}).get("ssl", False)
+
+    @property
+    def chroma_max_connections(self) -> int:
+        """Get maximum pooled HTTP connections to the ChromaDB server per process."""
+        return self._config.get("chroma", {}).get("max_connections", 32)
+
+    @property
+    def chroma_max_keepalive_connections(self) -> int:
+        """Get maximum idle HTTP connections kept open to the ChromaDB server."""
+        return self._config.get("chroma", {}).get("max_keepalive_connections", 16)
+
+    @property
+    def chroma_keepalive_seconds(self) -> float:
+        """Get how long idle HTTP connections to the ChromaDB server are kept."""
+        return self._config.get("chroma", {}).get("keepalive_seconds", 40)
+
+    # Storage settings
+    @property
+    def gc_grace_seconds(self) -> float:
+        """Get grace period before deleting old collection versions."""
+        return self._config.get("storage", {}).get("gc_grace_seconds", 30)
+
+    @property
+    def shard_by_stack(self) -> bool:
+        """Get whether each stack is indexed into its own collection shard."""
+        return self._config.get("storage", {}).get("shard_by_stack", False)
+
+    @property
+    def shard_search_workers(self) -> int:
+        """Get maximum number of shards searched in parallel per query."""
+        return self._config.get("storage", {}).get("shard_search_workers", 8)
+
+    # HNSW index settings
+    def get_hnsw_config(self, collection_name: str) -> Dict[str, Any]:
+        """Get HNSW parameters for a logical collection.
+
+        Starts from hnsw.default and applies the overrides listed under
+        hnsw.collections.<collection_name>.
+
+        Args:
+            collection_name: Logical collection name (e.g. "tech_docs").
+
+        Returns:
+            Dictionary of HNSW parameters (space, M, construction_ef, ...).
+        """
+        hnsw = self._config.get("hnsw", {})
+        config = {"space": "cosine", **(hnsw.get("default") or {})}
+        config.update((hnsw.get("collections") or {}).get(collection_name) or {})
+        return config
+
     # LLM settings
     @property
     def llm_provider(self) -> str:
         """Get LLM provider name."""
         return self._config.get("llm", {}).get("provider", "openai")
 
+    @property
+    def llm_temperature(self) -> float:
+        """Get temperature of the answer LLM (0 makes answers cacheable)."""
+        return self._config.get("llm", {}).get("temperature", 0.1)
+
+    @property
+    def llm_cache_enabled(self) -> bool:
+        """Get whether LLM completions are cached on disk."""
+        return self._config.get("llm", {}).get("cache", {}).get("enabled", False)
+
+    @property
+    def llm_cache_ttl_seconds(self) -> float:
+        """Get age after which cached LLM completions expire."""
+        return self._config.get("llm", {}).get("cache", {}).get("ttl_seconds", 604800)
+
+    @property
+    def llm_cache_max_size_mb(self) -> float:
+        """Get size above which least recently used completions are evicted."""
+        return self._config.get("llm", {}).get("cache", {}).get("max_size_mb", 256)
+
+    @property
+    def llm_http_max_connections(self) -> int:
+        """Get maximum pooled HTTP connections to the LLM API per process."""
+        return self._config.get("llm", {}).get("http", {}).get("max_connections", 20)
+
+    @property
+    def llm_http_max_keepalive_connections(self) -> int:
+        """Get maximum idle HTTP connections kept open to the LLM API."""
+        http = self._config.get("llm", {}).get("http", {})
+        return http.get("max_keepalive_connections", 10)
+
+    @property
+    def llm_http_keepalive_seconds(self) -> float:
+        """Get how long idle HTTP connections to the LLM API are kept."""
+        return self._config.get("llm", {}).get("http", {}).get("keepalive_seconds", 60)
+
+    @property
+    def llm_http_timeout_seconds(self) -> float:
+        """Get timeout of each LLM API request."""
+        return self._config.get("llm", {}).get("http", {}).get("timeout_seconds", 60)
+
+    @property
+    def llm_http_max_retries(self) -> int:
+        """Get how many times a throttled or failed LLM API request is retried."""
+        return self._config.get("llm", {}).get("http", {}).get("max_retries", 3)
+
+    @property
+    def llm_http_backoff_base_seconds(self) -> float:
+        """Get backoff before the first retry (doubles on each retry, jittered)."""
+        http = self._config.get("llm", {}).get("http", {})
+        return http.get("backoff_base_seconds", 1.0)
+
+    @property
+    def llm_http_backoff_max_seconds(self) -> float:
+        """Get longest backoff between LLM API retries."""
+        http = self._config.get("llm", {}).get("http", {})
+        return http.get("backoff_max_seconds", 30.0)
+
+    @property
+    def llm_rate_limit_enabled(self) -> bool:
+        """Get whether LLM API calls go through the client-side rate limiter."""
+        return self._config.get("llm", {}).get("rate_limit", {}).get("enabled", True)
+
+    @property
+    def llm_requests_per_minute(self) -> int:
+        """Get LLM API request budget per minute (0 = unlimited)."""
+        rate_limit = self._config.get("llm", {}).get("rate_limit", {})
+        return rate_limit.get("requests_per_minute", 500)
+
+    @property
+    def llm_tokens_per_minute(self) -> int:
+        """Get LLM API token budget per minute (0 = unlimited)."""
+        rate_limit = self._config.get("llm", {}).get("rate_limit", {})
+        return rate_limit.get("tokens_per_minute", 200000)
+
+    @property
+    def llm_max_concurrent_requests(self) -> int:
+        """Get maximum LLM API requests in flight per process (0 = unlimited)."""
+        rate_limit = self._config.get("llm", {}).get("rate_limit", {})
+        return rate_limit.get("max_concurrent", 8)
+
+    @property
+    def llm_completion_tokens_estimate(self) -> int:
+        """Get completion tokens assumed per LLM request for the token budget."""
+        rate_limit = self._config.get("llm", {}).get("rate_limit", {})
+        return rate_limit.get("completion_tokens_estimate", 512)
+
+    @property
+    def local_embed_dim(self) -> int:
+        """Get dimension of the local provider's hashed embeddings."""
+        return self._config.get("llm", {}).get("local", {}).get("embed_dim", 384)
+
+    @property
+    def local_embedding_model(self) -> str:
+        """Get HuggingFace model the local provider embeds with ("" = hashed)."""
+        return self._config.get("llm", {}).get("local", {}).get("embedding_model") or ""
+
+    @property
+    def local_answer_sentences(self) -> int:
+        """Get number of context sentences in local (extractive) answers."""
+        return self._config.get("llm", {}).get("local", {}).get("answer_sentences", 3)
+
+    # Chat settings
+    @property
+    def chat_history_max_tokens(self) -> int:
+        """Get token budget of the history used to condense follow-up questions."""
+        return self._config.get("chat", {}).get("history_max_tokens", 1500)
+
+    @property
+    def chat_reuse_similarity(self) -> float:
+        """Get similarity above which follow-ups reuse the previous chunks."""
+        return self._config.get("chat", {}).get("reuse_similarity", 0.9)
+
+    # Usage ledger settings
+    @property
+    def usage_enabled(self) -> bool:
+        """Get whether query and indexing usage is recorded in the ledger."""
+        return self._config.get("usage", {}).get("enabled", True)
+
+    @property
+    def usage_daily_budget_usd(self) -> float:
+        """Get daily spend budget in USD (0 = no budget)."""
+        return self._config.get("usage", {}).get("daily_budget_usd", 0.0)
+
+    @property
+    def usage_enforce_budget(self) -> bool:
+        """Get whether queries are refused once the daily budget is spent."""
+        return self._config.get("usage", {}).get("enforce_budget", False)
+
     # Pricing settings
+    def _pricing(self, model_key: str) -> Dict[str, Any]:
+        """Get the pricing of a model (free with the local provider)."""
+        if self.llm_provider == "local":
+            return {"name": "local", "input_per_1m": 0.0, "output_per_1m": 0.0}
+        return self._config.get("pricing", {}).get(model_key, {})
+
     @property
     def llm_pricing(self) -> Dict[str, Any]:
         """Get LLM model pricing configuration."""
-        return self._config.get("pricing", {}).get("llm_model", {})
+        return self._pricing("llm_model")
 
     @property
     def embedding_pricing(self) -> Dict[str, Any]:
         """Get embedding model pricing configuration."""
-        return self._config.get("pricing", {}).get("embedding_model", {})
+        return self._pricing("embedding_model")
 
     @property
     def rerank_pricing(self) -> Dict[str, Any]:
         """Get rerank model pricing configuration."""
-        return self._config.get("pricing", {}).get("rerank_model", {})
+        return self._pricing("rerank_model")
+
+    def get_pdf_cache_path(self) -> Path:
+        """Get the extracted PDF text cache directory path."""
+        cache_dir = self._config.get("pdf", {}).get("cache_dir", ".data/pdf_cache")
+        path = Path(__file__).parent.parent / cache_dir
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def get_http_cache_path(self) -> Path:
+        """Get the crawler HTTP cache directory path."""
+        cache_dir = self._config.get("crawler", {}).get("cache_dir", ".data/http_cache")
+        path = Path(__file__).parent.parent / cache_dir
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def get_llm_cache_path(self) -> Path:
+        """Get the LLM completion cache directory path."""
+        cache_dir = (
+            self._config.get("llm", {})
+            .get("cache", {})
+            .get("cache_dir", ".data/llm_cache")
+        )
+        path = Path(__file__).parent.parent / cache_dir
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def get_usage_path(self) -> Path:
+        """Get the usage ledger directory path."""
+        ledger_dir = self._config.get("usage", {}).get("ledger_dir", ".data/usage")
+        path = Path(__file__).parent.parent / ledger_dir
+        path.mkdir(parents=True, exist_ok=True)
+        return path
 
     def get_chroma_path(self) -> Path:
         """Get ChromaDB persistence directory path."""
@@ -5,9 +5,25 @@ from core.helpers.pricing import (
     estimate_llm_cost,
     format_cost,
 )
+from core.helpers.usage import (
+    UsageRecord,
+    aggregate_usage,
+    check_budget,
+    expensive_queries,
+    latency_percentile,
+    record_usage,
+    spend_today,
+)
 
 __all__ = [
     "estimate_embedding_cost",
     "estimate_llm_cost",
     "format_cost",
+    "UsageRecord",
+    "aggregate_usage",
+    "check_budget",
+    "expensive_queries",
+    "latency_percentile",
+    "record_usage",
+    "spend_today",
 ]
@@ -0,0 +1,299 @@
+"""Usage and cost ledger.
+
+This module appends one record per query and indexing run (tokens, cost,
+latency, cache hits) to a local SQLite database, so spend can be tracked
+over time instead of being shown once and lost:
+- Recording usage (append-only: records are never updated or deleted)
+- Aggregating by day, operation and model
+- Finding the most expensive query patterns
+- Checking spend against the daily budget
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
+
+from config import get_settings
+
+
+_LEDGER_FILENAME = "usage.sqlite3"
+# Dimensions records can be grouped by
+GROUP_BY_COLUMNS = ("day", "operation", "model")
+# Serializes schema creation within this process
+_ledger_lock = threading.Lock()
+_schema_ready: set = set()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    embedding_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    cache_hits INTEGER NOT NULL,
+    query TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_by_day ON usage (day, operation, model);
+CREATE INDEX IF NOT EXISTS usage_by_operation ON usage (operation, day);
+CREATE INDEX IF NOT EXISTS usage_by_model ON usage (model, day);
+"""
+
+
+@dataclass
+class UsageRecord:
+    """Usage of one query or indexing run.
+
+    Attributes:
+        operation: "query" or "index"
+        model: Main model used (LLM for queries, embedding model for indexing)
+        input_tokens: LLM prompt tokens
+        output_tokens: LLM completion tokens
+        embedding_tokens: Embedding tokens
+        cost: Estimated cost in USD
+        latency_ms: Total time of the operation in milliseconds
+        cache_hits: LLM calls served from the completion cache
+        query: Question asked (empty for indexing), for finding expensive patterns
+        timestamp: Unix time of the operation (defaults to now)
+    """
+
+    operation: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    embedding_tokens: int = 0
+    cost: float = 0.0
+    latency_ms: float = 0.0
+    cache_hits: int = 0
+    query: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+
+def _ledger_path() -> Path:
+    """Get the path of the ledger database."""
+    return get_settings().get_usage_path() / _LEDGER_FILENAME
+
+
+def _day(timestamp: float) -> str:
+    """Get the UTC day (YYYY-MM-DD) of a timestamp."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+@contextmanager
+def _connect() -> Generator[sqlite3.Connection, None, None]:
+    """Open the ledger database, committing on success and rolling back on error."""
+    path = _ledger_path()
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        if path not in _schema_ready:
+            with _ledger_lock:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                _schema_ready.add(path)
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def record_usage(record: UsageRecord) -> None:
+    """Append a usage record to the ledger.
+
+    Does nothing when usage.enabled is false. Failures are logged and
+    swallowed: losing a record must not fail the query or indexing run.
+
+    Args:
+        record: Usage of the operation
+
+    Example:
+        >>> record_usage(UsageRecord("query", "gpt-4o-mini", 1200, 150, cost=0.0003))
+    """
+    if not get_settings().usage_enabled:
+        return
+
+    values = asdict(record)
+    values["day"] = _day(record.timestamp)
+    values["query"] = record.query[:500]
+    try:
+        with _connect() as conn:
+            conn.execute(
+                f"INSERT INTO usage ({', '.join(values)}) "
+                f"VALUES ({', '.join('?' * len(values))})",
+                list(values.values()),
+            )
+    except Exception as e:
+        print(f"[USAGE] Failed to record {record.operation} usage: {e}")
+
+
+def aggregate_usage(
+    group_by: Sequence[str] = ("day",),
+    since: Optional[float] = None,
+    operation: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Aggregate usage records.
+
+    Args:
+        group_by: Columns to group by, any of "day", "operation" and "model"
+        since: Only records from this Unix time on (None = all)
+        operation: Only records of this operation (None = all)
+
+    Returns:
+        One dictionary per group with the group columns plus operations,
+        cost, input_tokens, output_tokens, embedding_tokens, cache_hits,
+        avg_latency_ms and max_latency_ms, ordered by the group columns
+
+    Raises:
+        ValueError: If a group_by column is not supported
+
+    Example:
+        >>> for row in aggregate_usage(["day", "model"], since=time.time() - 7 * 86400):
+        ...     print(row["day"], row["model"], row["cost"])
+    """
+    unknown = set(group_by) - set(GROUP_BY_COLUMNS)
+    if unknown:
+        raise ValueError(
+            f"Cannot group usage by {sorted(unknown)}. Supported: {GROUP_BY_COLUMNS}"
+        )
+
+    where, params = _filters(since, operation)
+    columns = ", ".join(group_by)
+    select = f"{columns}, " if group_by else ""
+    group = f"GROUP BY {columns} ORDER BY {columns}" if group_by else ""
+    with _connect() as conn:
+        cursor = conn.execute(
+            f"SELECT {select}COUNT(*) AS operations, "
+            "COALESCE(SUM(cost), 0) AS cost, "
+            "COALESCE(SUM(input_tokens), 0) AS input_tokens, "
+            "COALESCE(SUM(output_tokens), 0) AS output_tokens, "
+            "COALESCE(SUM(embedding_tokens), 0) AS embedding_tokens, "
+            "COALESCE(SUM(cache_hits), 0) AS cache_hits, "
+            "COALESCE(AVG(latency_ms), 0) AS avg_latency_ms, "
+            "COALESCE(MAX(latency_ms), 0) AS max_latency_ms "
+            f"FROM usage {where} {group}",
+            params,
+        )
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def latency_percentile(
+    q: float, since: Optional[float] = None, operation: Optional[str] = "query"
+) -> float:
+    """Get a latency percentile in milliseconds (0 if there are no records).
+
+    Args:
+        q: Percentile between 0 and 100 (e.g. 95)
+        since: Only records from this Unix time on (None = all)
+        operation: Only records of this operation (None = all)
+    """
+    where, params = _filters(since, operation)
+    with _connect() as conn:
+        count = conn.execute(f"SELECT COUNT(*) FROM usage {where}", params).fetchone()[
+            0
+        ]
+        if not count:
+            return 0.0
+        offset = min(count - 1, int(count * q / 100))
+        row = conn.execute(
+            f"SELECT latency_ms FROM usage {where} ORDER BY latency_ms "
+            "LIMIT 1 OFFSET ?",
+            [*params, offset],
+        ).fetchone()
+    return row[0]
+
+
+def query_pattern(query: str) -> str:
+    """Normalize a question (case, punctuation, numbers) so repeats group together."""
+    text = re.sub(r"\b\d+(?:[.,]\d+)*\b", "#", query.lower())
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s#]", " ", text)).strip()
+
+
+def expensive_queries(
+    limit: int = 10, since: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Get the query patterns with the highest total cost.
+
+    Args:
+        limit: Maximum number of patterns
+        since: Only records from this Unix time on (None = all)
+
+    Returns:
+        One dictionary per pattern with pattern, operations, cost and
+        avg_latency_ms, most expensive first
+    """
+    where, params = _filters(since, "query")
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT query, cost, latency_ms FROM usage {where}", params
+        ).fetchall()
+
+    patterns: Dict[str, Dict[str, Any]] = {}
+    for query, cost, latency_ms in rows:
+        pattern = query_pattern(query)
+        entry = patterns.setdefault(
+            pattern, {"pattern": pattern, "operations": 0, "cost": 0.0, "latency": 0.0}
+        )
+        entry["operations"] += 1
+        entry["cost"] += cost
+        entry["latency"] += latency_ms
+
+    ranked = sorted(patterns.values(), key=lambda p: p["cost"], reverse=True)[:limit]
+    for entry in ranked:
+        entry["avg_latency_ms"] = entry.pop("latency") / entry["operations"]
+    return ranked
+
+
+def spend_today() -> float:
+    """Get the estimated cost in USD of all operations of the current UTC day."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT COALESCE(SUM(cost), 0) FROM usage WHERE day = ?",
+            (_day(time.time()),),
+        ).fetchone()
+    return row[0]
+
+
+def check_budget() -> None:
+    """Enforce the daily budget (usage.daily_budget_usd, if enforced).
+
+    Raises:
+        ValueError: If usage.enforce_budget is set and today's spend has
+            reached the daily budget
+    """
+    settings = get_settings()
+    budget = settings.usage_daily_budget_usd
+    if not (settings.usage_enabled and settings.usage_enforce_budget and budget > 0):
+        return
+    spent = spend_today()
+    if spent >= budget:
+        raise ValueError(
+            f"Se alcanzó el presupuesto diario de USD ${budget:.2f} "
+            f"(gastado hoy: USD ${spent:.4f}). Inténtalo de nuevo mañana o "
+            "ajusta usage.daily_budget_usd en config.yaml."
+        )
+
+
+def _filters(since: Optional[float], operation: Optional[str]) -> Tuple[str, List[Any]]:
+    """Build the WHERE clause and parameters of a since/operation filter."""
+    conditions, params = [], []
+    if since is not None:
+        # Filter on the indexed day first, then on the exact time
+        conditions.append("day >= ? AND timestamp >= ?")
+        params.extend([_day(since), since])
+    if operation is not None:
+        conditions.append("operation = ?")
+        params.append(operation)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
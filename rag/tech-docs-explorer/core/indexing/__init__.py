@@ -2,10 +2,15 @@
 
 This module provides:
 - Data models for indexing operations (IndexStats, DocumentInfo, ChunkInfo, DocumentSummary, ChunkDetail)
-- Document indexing pipeline (index_documents)
+- Document indexing pipeline (index_documents, split_documents, delete_document)
+- Near-duplicate chunk detection (MinHashDeduplicator)
+- Section-aware Markdown chunking (MarkdownSectionSplitter)
+- Previous/next/parent links between chunks (link_neighbours)
 - Query functions for retrieving indexed documents and chunks
 """
 
+from .dedup import DedupResult, MinHashDeduplicator
+from .markdown_splitter import MarkdownSectionSplitter
 from .models import (
     ChunkDetail,
     ChunkInfo,
@@ -13,7 +18,14 @@ from .models import (
     DocumentSummary,
     IndexStats,
 )
-from .pipeline import index_documents
+from .neighbours import (
+    LINK_METADATA_KEYS,
+    NEXT_CHUNK_KEY,
+    PARENT_KEY,
+    PREV_CHUNK_KEY,
+    link_neighbours,
+)
+from .pipeline import delete_document, index_documents, split_documents
 from .queries import (
     get_all_documents_summary,
     get_chunks_for_document,
@@ -30,6 +42,16 @@ __all__ = [
     "ChunkDetail",
     # Pipeline
     "index_documents",
+    "split_documents",
+    "delete_document",
+    "MinHashDeduplicator",
+    "DedupResult",
+    "MarkdownSectionSplitter",
+    "link_neighbours",
+    "PREV_CHUNK_KEY",
+    "NEXT_CHUNK_KEY",
+    "PARENT_KEY",
+    "LINK_METADATA_KEYS",
     # Queries
     "get_indexed_documents",
     "get_document_chunks",
@@ -0,0 +1,306 @@
+"""Near-duplicate chunk detection using MinHash and LSH.
+
+Documentation sites repeat navigation blocks, license footers and other
+boilerplate on every page. This module detects chunks whose word shingles
+overlap above a Jaccard similarity threshold so they can be dropped before
+embedding:
+- MinHash signatures approximate the Jaccard similarity between chunks
+- LSH banding finds candidate pairs without comparing every pair of chunks
+- Signatures of chunks indexed earlier (stored in the document catalog) can
+  be matched too, so duplicates are found across indexing runs
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from llama_index.core.schema import BaseNode
+
+from core.storage import document_name
+
+
+# Mersenne prime used for the universal hash permutations
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class DedupResult:
+    """Result of near-duplicate detection over a list of nodes.
+
+    Attributes:
+        nodes: Nodes to keep (canonical chunks and unique chunks), in input order
+        duplicates: Mapping of dropped node ID -> canonical node ID
+        signatures: MinHash signature of each kept node, by node ID
+    """
+
+    nodes: List[BaseNode]
+    duplicates: Dict[str, str] = field(default_factory=dict)
+    signatures: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def num_removed(self) -> int:
+        """Number of nodes dropped as near-duplicates."""
+        return len(self.duplicates)
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick LSH bands and rows whose S-curve threshold is closest to the target.
+
+    The probability that two items with Jaccard similarity s share a bucket is
+    1 - (1 - s^r)^b, which rises sharply around s = (1/b)^(1/r).
+    """
+    best = (1, num_perm)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashDeduplicator:
+    """Detect near-duplicate texts with MinHash signatures and LSH banding.
+
+    The first occurrence of a group of near-duplicates is kept as the canonical
+    chunk; later occurrences are reported as duplicates of it.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Estimated Jaccard similarity above which chunks are duplicates.
+            num_perm: Number of hash permutations in each MinHash signature.
+            shingle_size: Number of consecutive words per shingle.
+            seed: Seed for the hash permutations (keeps results reproducible).
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Deduplication threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        # Signatures and buckets are only comparable with the same parameters
+        self.scheme = (
+            f"minhash-{num_perm}-{self.bands}x{self.rows}-{shingle_size}-{seed}"
+        )
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Hash the word shingles of a text into 32-bit integers."""
+        words = _WORD_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        if len(words) <= size:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {
+                " ".join(words[i : i + size]) for i in range(len(words) - size + 1)
+            }
+
+        return np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(s.encode(), digest_size=4).digest(), "little"
+                )
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: Text to sign.
+
+        Returns:
+            Array of num_perm 32-bit minimum hash values.
+        """
+        hashes = self._shingle_hashes(text)
+        # (a * h + b) mod p stays below 2^64 because a, b and h are 32-bit values
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+
+    def bucket_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Get the LSH bucket key of each band of a signature.
+
+        Two signatures are compared only if they share at least one key.
+        """
+        return [
+            hashlib.blake2b(
+                band.to_bytes(2, "little")
+                + signature[band * self.rows : (band + 1) * self.rows].tobytes(),
+                digest_size=8,
+            ).digest()
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        """Serialize a signature compactly (its values fit in 32 bits)."""
+        return signature.astype(np.uint32).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        """Deserialize a signature written by to_bytes()."""
+        return np.frombuffer(data, dtype=np.uint32).astype(np.uint64)
+
+    def match_known(
+        self, signatures: Dict[str, np.ndarray], known: Dict[str, np.ndarray]
+    ) -> Dict[str, str]:
+        """Match signatures against the ones of previously indexed chunks.
+
+        Args:
+            signatures: Signatures to check, by node ID.
+            known: Signatures of indexed chunks sharing a bucket with them,
+                by chunk ID.
+
+        Returns:
+            Mapping of node ID -> ID of the indexed chunk it duplicates.
+        """
+        buckets: Dict[bytes, List[str]] = {}
+        for chunk_id, sig in sorted(known.items()):
+            for key in self.bucket_keys(sig):
+                buckets.setdefault(key, []).append(chunk_id)
+
+        matches: Dict[str, str] = {}
+        for node_id, sig in signatures.items():
+            candidates = sorted(
+                {
+                    chunk_id
+                    for key in self.bucket_keys(sig)
+                    for chunk_id in buckets.get(key, ())
+                }
+            )
+            for chunk_id in candidates:
+                if float(np.mean(known[chunk_id] == sig)) >= self.threshold:
+                    matches[node_id] = chunk_id
+                    break
+        return matches
+
+    def find_duplicates(self, texts: Sequence[str]) -> Dict[int, int]:
+        """Find near-duplicates among texts.
+
+        Args:
+            texts: Texts to compare, in priority order (earlier texts win).
+
+        Returns:
+            Mapping of duplicate index -> canonical index.
+        """
+        return self._find_duplicates([self.signature(text) for text in texts])
+
+    def _find_duplicates(self, signatures: Sequence[np.ndarray]) -> Dict[int, int]:
+        """Find near-duplicates among signatures (see find_duplicates())."""
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        duplicates: Dict[int, int] = {}
+
+        for idx, sig in enumerate(signatures):
+            # Collect canonical candidates sharing at least one band bucket
+            candidates = set()
+            keys = []
+            for band in range(self.bands):
+                key = (band, sig[band * self.rows : (band + 1) * self.rows].tobytes())
+                keys.append(key)
+                candidates.update(buckets.get(key, ()))
+
+            canonical = None
+            for candidate in sorted(candidates):
+                similarity = float(np.mean(signatures[candidate] == sig))
+                if similarity >= self.threshold:
+                    canonical = candidate
+                    break
+
+            if canonical is not None:
+                duplicates[idx] = canonical
+                continue
+
+            # Only canonical chunks are indexed, so duplicates always point to one
+            for key in keys:
+                buckets.setdefault(key, []).append(idx)
+
+        return duplicates
+
+    def deduplicate(self, nodes: List[BaseNode]) -> DedupResult:
+        """Drop near-duplicate nodes, keeping the first occurrence.
+
+        Canonical nodes get a "duplicate_count" metadata entry with the number
+        of copies that were collapsed into them, and a "duplicate_sources"
+        entry with the documents those copies came from (comma-separated,
+        since ChromaDB metadata can't hold lists).
+
+        Args:
+            nodes: Nodes with final IDs assigned.
+
+        Returns:
+            DedupResult with the kept nodes, the duplicate -> canonical ID map
+            and the signatures of the kept nodes.
+        """
+        signatures = [self.signature(node.get_content()) for node in nodes]
+        duplicates = self._find_duplicates(signatures)
+        kept_signatures = {
+            node.node_id: signatures[idx]
+            for idx, node in enumerate(nodes)
+            if idx not in duplicates
+        }
+        if not duplicates:
+            return DedupResult(nodes=list(nodes), signatures=kept_signatures)
+
+        duplicate_counts: Dict[int, int] = {}
+        duplicate_sources: Dict[int, List[str]] = {}
+        for dup, canonical in duplicates.items():
+            duplicate_counts[canonical] = duplicate_counts.get(canonical, 0) + 1
+            sources = duplicate_sources.setdefault(canonical, [])
+            source = document_name(nodes[dup].metadata)
+            if source not in sources:
+                sources.append(source)
+
+        kept = []
+        for idx, node in enumerate(nodes):
+            if idx in duplicates:
+                continue
+            if idx in duplicate_counts:
+                node.metadata["duplicate_count"] = duplicate_counts[idx]
+                node.metadata["duplicate_sources"] = ", ".join(duplicate_sources[idx])
+                # Keep the references out of the embedded/LLM text
+                node.excluded_embed_metadata_keys = [
+                    *node.excluded_embed_metadata_keys,
+                    "duplicate_count",
+                    "duplicate_sources",
+                ]
+                node.excluded_llm_metadata_keys = [
+                    *node.excluded_llm_metadata_keys,
+                    "duplicate_count",
+                    "duplicate_sources",
+                ]
+            kept.append(node)
+
+        return DedupResult(
+            nodes=kept,
+            duplicates={
+                nodes[dup].node_id: nodes[canonical].node_id
+                for dup, canonical in duplicates.items()
+            },
+            signatures=kept_signatures,
+        )
+
+
+__all__ = ["DedupResult", "MinHashDeduplicator"]
@@ -0,0 +1,343 @@
+"""Heading- and code-block-aware chunking for Markdown documents.
+
+SentenceSplitter cuts Markdown wherever the token budget runs out, so a chunk
+often starts in the middle of one section and ends in the next. This module
+splits Markdown along its structure in a single pass over the text:
+- Headings start new sections; each chunk records its heading path
+- Fenced code blocks are never split across chunks unless they exceed the
+  chunk size on their own
+- Consecutive small sections under the same heading are packed together up
+  to the token budget, so chunks stay section-aligned but dense
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.node_parser import NodeParser, SentenceSplitter
+from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.utils import get_tokenizer, get_tqdm_iterable
+
+
+_HEADING_PATTERN = re.compile(r"^ {0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+@dataclass
+class _Block:
+    """A paragraph, heading or fenced code block with its token count.
+
+    Continuation blocks are lines of a paragraph that had to be broken up;
+    they are joined to the previous block with a single newline.
+    """
+
+    text: str
+    tokens: int
+    is_code: bool = False
+    continuation: bool = False
+
+
+@dataclass
+class _Section:
+    """Blocks under one heading, with the heading path leading to it."""
+
+    path: Tuple[str, ...]
+    blocks: List[_Block] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return sum(block.tokens for block in self.blocks) + max(len(self.blocks) - 1, 0)
+
+
+def _common_prefix(a: Tuple[str, ...], b: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Longest common prefix of two heading paths."""
+    prefix = []
+    for left, right in zip(a, b):
+        if left != right:
+            break
+        prefix.append(left)
+    return tuple(prefix)
+
+
+class MarkdownSectionSplitter(NodeParser):
+    """Split Markdown documents into section-aligned, token-sized chunks.
+
+    Each node gets a "heading_path" metadata entry such as
+    "Guía de Respuesta > Clasificación > SEV-1", which is also embedded with
+    the chunk text so retrieval sees the section context.
+
+    Example:
+        >>> splitter = MarkdownSectionSplitter(chunk_size=512, chunk_overlap=50)
+        >>> nodes = splitter.get_nodes_from_documents(markdown_docs)
+        >>> nodes[0].metadata["heading_path"]
+        'Installation > Requirements'
+    """
+
+    chunk_size: int = Field(
+        default=1000, description="The token chunk size for each chunk.", gt=0
+    )
+    chunk_overlap: int = Field(
+        default=200,
+        description="Token overlap used only when a single paragraph is split.",
+        ge=0,
+    )
+    heading_separator: str = Field(
+        default=" > ", description="Separator between headings in heading_path."
+    )
+
+    _tokenizer: Callable = PrivateAttr()
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        heading_separator: str = " > ",
+        tokenizer: Optional[Callable] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_size: Maximum chunk size in tokens (metadata included).
+            chunk_overlap: Token overlap when an oversized paragraph has to be
+                split by sentences. Section boundaries need no overlap.
+            heading_separator: Separator used to join the heading path.
+            tokenizer: Tokenizer function. Defaults to the global LlamaIndex
+                tokenizer, the same one SentenceSplitter uses.
+        """
+        super().__init__(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            heading_separator=heading_separator,
+            **kwargs,
+        )
+        self._tokenizer = tokenizer or get_tokenizer()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "MarkdownSectionSplitter"
+
+    def _count(self, text: str) -> int:
+        return len(self._tokenizer(text))
+
+    def _parse_sections(self, text: str) -> List[_Section]:
+        """Parse Markdown into sections of blocks in one pass over the lines."""
+        sections = [_Section(path=())]
+        headings: List[Tuple[int, str]] = []
+        paragraph: List[str] = []
+        fence: Optional[str] = None
+        code: List[str] = []
+
+        def flush_paragraph() -> None:
+            block_text = "\n".join(paragraph).strip()
+            paragraph.clear()
+            if block_text:
+                sections[-1].blocks.append(_Block(block_text, self._count(block_text)))
+
+        for line in text.splitlines():
+            if fence is not None:
+                code.append(line)
+                stripped = line.strip()
+                # A fence closes with the same character, at least as long
+                if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                    block_text = "\n".join(code)
+                    sections[-1].blocks.append(
+                        _Block(block_text, self._count(block_text), is_code=True)
+                    )
+                    fence, code = None, []
+                continue
+
+            fence_match = _FENCE_PATTERN.match(line)
+            if fence_match:
+                flush_paragraph()
+                fence = fence_match.group(1)
+                code = [line]
+                continue
+
+            heading_match = _HEADING_PATTERN.match(line)
+            if heading_match:
+                flush_paragraph()
+                level = len(heading_match.group(1))
+                # Headings may skip levels (H1 -> H3), so pop by level, not depth
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, heading_match.group(2)))
+                heading_text = line.strip()
+                sections.append(
+                    _Section(
+                        path=tuple(title for _, title in headings),
+                        blocks=[_Block(heading_text, self._count(heading_text))],
+                    )
+                )
+                continue
+
+            if line.strip():
+                paragraph.append(line)
+            else:
+                flush_paragraph()
+
+        flush_paragraph()
+        if code:
+            # Unterminated fence: keep the code as-is
+            block_text = "\n".join(code)
+            sections[-1].blocks.append(
+                _Block(block_text, self._count(block_text), is_code=True)
+            )
+
+        return [section for section in sections if section.blocks]
+
+    def _split_code(self, block: _Block, budget: int) -> List[str]:
+        """Split an oversized code block by lines, re-opening the fence per piece."""
+        lines = block.text.splitlines()
+        opener = lines[0]
+        fence = _FENCE_PATTERN.match(opener).group(1)
+        if len(lines) > 1 and lines[-1].strip().startswith(fence):
+            closer, body = lines[-1], lines[1:-1]
+        else:  # Unterminated fence
+            closer, body = fence, lines[1:]
+        budget = max(budget - self._count(opener) - self._count(closer) - 2, 1)
+
+        pieces: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for line in body:
+            line_tokens = self._count(line) + 1
+            if current and current_tokens + line_tokens > budget:
+                pieces.append("\n".join([opener, *current, closer]))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += line_tokens
+        if current:
+            pieces.append("\n".join([opener, *current, closer]))
+        return pieces
+
+    def _fit_block(
+        self, block: _Block, budget: int, sentence_splitter: SentenceSplitter
+    ) -> List[_Block]:
+        """Break a block larger than the budget into blocks that fit.
+
+        Code is split by lines inside re-opened fences; prose is split by
+        lines first (list items, table rows) and by sentences only when a
+        single line is still too long.
+        """
+        if block.tokens <= budget:
+            return [block]
+
+        if block.is_code:
+            return [
+                _Block(piece, self._count(piece), is_code=True)
+                for piece in self._split_code(block, budget)
+            ]
+
+        pieces = []
+        for line in block.text.splitlines():
+            if self._count(line) > budget:
+                pieces.extend(sentence_splitter.split_text(line))
+            else:
+                pieces.append(line)
+        return [
+            _Block(piece, self._count(piece), continuation=idx > 0)
+            for idx, piece in enumerate(pieces)
+        ]
+
+    def split_markdown(
+        self, text: str, metadata_str: str = ""
+    ) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Split Markdown text into chunks with their heading paths.
+
+        Args:
+            text: Markdown text.
+            metadata_str: Metadata text that is embedded with every chunk; its
+                tokens are subtracted from the chunk budget.
+
+        Returns:
+            List of (chunk_text, heading_path) tuples in document order.
+
+        Raises:
+            ValueError: If the metadata alone exceeds the chunk size.
+        """
+        sections = self._parse_sections(text)
+        longest_path = max(
+            (self.heading_separator.join(s.path) for s in sections), key=len, default=""
+        )
+        metadata_len = self._count(metadata_str) + self._count(longest_path)
+        budget = self.chunk_size - metadata_len
+        if budget <= 0:
+            raise ValueError(
+                f"Metadata length ({metadata_len}) is longer than chunk size "
+                f"({self.chunk_size}). Consider increasing the chunk size or "
+                "decreasing the size of your metadata to avoid this."
+            )
+        sentence_splitter = SentenceSplitter(
+            chunk_size=budget,
+            chunk_overlap=min(self.chunk_overlap, budget // 2),
+            tokenizer=self._tokenizer,
+        )
+
+        chunks: List[Tuple[str, Tuple[str, ...]]] = []
+        current: List[str] = []
+        current_tokens = 0
+        current_path: Tuple[str, ...] = ()
+
+        def flush() -> None:
+            nonlocal current_tokens
+            if current:
+                chunks.append(("".join(current), current_path))
+            current.clear()
+            current_tokens = 0
+
+        for section in sections:
+            merged_path = _common_prefix(current_path, section.path)
+            # Start each section on a fresh chunk unless it fits entirely and
+            # shares a heading with the chunk being built
+            fits = current_tokens + 1 + section.tokens <= budget
+            if current and not (fits and (merged_path or not current_path)):
+                flush()
+            current_path = merged_path if current else section.path
+
+            for section_block in section.blocks:
+                # Oversized sections continue on the next chunk, still under
+                # their own heading path
+                for block in self._fit_block(section_block, budget, sentence_splitter):
+                    if current and current_tokens + 1 + block.tokens > budget:
+                        flush()
+                        current_path = section.path
+                    if current:
+                        current.append("\n" if block.continuation else "\n\n")
+                        current_tokens += 1
+                    current.append(block.text)
+                    current_tokens += block.tokens
+
+        flush()
+        return chunks
+
+    def _parse_nodes(
+        self,
+        nodes: Sequence[BaseNode],
+        show_progress: bool = False,
+        **kwargs: Any,
+    ) -> List[BaseNode]:
+        """Split each document and attach the heading path to its chunks."""
+        all_nodes: List[BaseNode] = []
+        for node in get_tqdm_iterable(nodes, show_progress, "Parsing nodes"):
+            metadata_str = max(
+                node.get_metadata_str(mode=MetadataMode.EMBED),
+                node.get_metadata_str(mode=MetadataMode.LLM),
+                key=len,
+            )
+            chunks = self.split_markdown(
+                node.get_content(metadata_mode=MetadataMode.NONE), metadata_str
+            )
+            split_nodes = build_nodes_from_splits(
+                [chunk_text for chunk_text, _ in chunks], node, id_func=self.id_func
+            )
+            for split_node, (_, path) in zip(split_nodes, chunks):
+                split_node.metadata["heading_path"] = self.heading_separator.join(path)
+            all_nodes.extend(split_nodes)
+        return all_nodes
+
+
+__all__ = ["MarkdownSectionSplitter"]
@@ -20,6 +20,16 @@ class IndexStats:
         documents_processed: Number of documents processed
         embedding_tokens: Total tokens used for embeddings (estimated)
         estimated_cost: Estimated cost in USD for the indexing operation
+        duplicates_removed: Number of near-duplicate chunks dropped before embedding
+        dedup_ratio: Fraction of split chunks dropped as near-duplicates (0.0-1.0)
+        duplicates: Mapping of dropped chunk ID -> ID of the indexed canonical chunk
+        load_time: Seconds spent loading the documents (measured by the caller)
+        split_time: Seconds spent splitting documents into chunks
+        dedup_time: Seconds spent detecting near-duplicate chunks
+        embed_time: Seconds spent generating embeddings
+        store_time: Seconds spent writing vectors to ChromaDB
+        bytes_processed: UTF-8 size of the input document text in bytes
+        peak_rss_mb: Peak resident memory of the process so far, in MB
     """
 
     num_chunks: int
@@ -27,6 +37,37 @@ class IndexStats:
     documents_processed: int
     embedding_tokens: int = 0
     estimated_cost: float = 0.0
+    duplicates_removed: int = 0
+    dedup_ratio: float = 0.0
+    duplicates: Dict[str, str] = field(default_factory=dict)
+    load_time: float = 0.0
+    split_time: float = 0.0
+    dedup_time: float = 0.0
+    embed_time: float = 0.0
+    store_time: float = 0.0
+    bytes_processed: int = 0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Chunks indexed per second of indexing time (loading excluded)."""
+        return self.num_chunks / self.time_taken if self.time_taken else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Embedding tokens per second of embedding time."""
+        return self.embedding_tokens / self.embed_time if self.embed_time else 0.0
+
+    @property
+    def stage_times(self) -> Dict[str, float]:
+        """Duration of each pipeline stage in seconds, in execution order."""
+        return {
+            "load": self.load_time,
+            "split": self.split_time,
+            "dedup": self.dedup_time,
+            "embed": self.embed_time,
+            "store": self.store_time,
+        }
 
 
 @dataclass
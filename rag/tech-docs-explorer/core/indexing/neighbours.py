@@ -0,0 +1,79 @@
+"""Links between neighbouring chunks for small-to-big retrieval.
+
+Each chunk records the IDs of the chunks before and after it in the same
+document and the ID of its parent section (the Markdown heading it sits
+under, or the PDF page). Retrieval can then search over small, precise
+chunks and expand the best ones to their neighbours or whole section before
+synthesis, without embedding anything else (see core/retrieval/expansion.py).
+"""
+
+import hashlib
+from typing import List
+
+from llama_index.core.schema import BaseNode
+
+from core.storage import document_name
+
+
+PREV_CHUNK_KEY = "prev_chunk_id"
+NEXT_CHUNK_KEY = "next_chunk_id"
+PARENT_KEY = "parent_id"
+# Link metadata is kept out of the embedded and LLM text
+LINK_METADATA_KEYS = (PREV_CHUNK_KEY, NEXT_CHUNK_KEY, PARENT_KEY)
+
+
+def _document_key(node: BaseNode) -> str:
+    """Get the document a chunk belongs to (PDF pages share their file)."""
+    name = document_name(node.metadata)
+    return name if name != "Unknown" else node.ref_doc_id or ""
+
+
+def _parent_id(node: BaseNode) -> str:
+    """Get the ID of the section or page of a chunk ("" if it has neither)."""
+    section = node.metadata.get("heading_path") or node.metadata.get("page_label")
+    if not section:
+        return ""
+    key = f"{_document_key(node)}\x00{section}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def link_neighbours(nodes: List[BaseNode]) -> None:
+    """Record the previous, next and parent section IDs of each chunk.
+
+    Links only join chunks of the same document, in the order given,
+    so they must be computed on the final list (IDs assigned, duplicates
+    dropped): a dropped chunk is skipped over. Missing links are stored as
+    "" because ChromaDB metadata can't hold None.
+
+    Args:
+        nodes: Chunks in document order, with their final IDs
+
+    Example:
+        >>> link_neighbours(nodes)
+        >>> nodes[1].metadata["prev_chunk_id"] == nodes[0].node_id
+        True
+    """
+    keys = [_document_key(node) for node in nodes]
+    for idx, node in enumerate(nodes):
+        has_prev = idx > 0 and keys[idx - 1] == keys[idx]
+        has_next = idx + 1 < len(nodes) and keys[idx + 1] == keys[idx]
+        node.metadata[PREV_CHUNK_KEY] = nodes[idx - 1].node_id if has_prev else ""
+        node.metadata[NEXT_CHUNK_KEY] = nodes[idx + 1].node_id if has_next else ""
+        node.metadata[PARENT_KEY] = _parent_id(node)
+        node.excluded_embed_metadata_keys = [
+            *node.excluded_embed_metadata_keys,
+            *LINK_METADATA_KEYS,
+        ]
+        node.excluded_llm_metadata_keys = [
+            *node.excluded_llm_metadata_keys,
+            *LINK_METADATA_KEYS,
+        ]
+
+
+__all__ = [
+    "PREV_CHUNK_KEY",
+    "NEXT_CHUNK_KEY",
+    "PARENT_KEY",
+    "LINK_METADATA_KEYS",
+    "link_neighbours",
+]
@@ -5,41 +5,313 @@ into the vector database with chunking and metadata.
 """
 
 import hashlib
+import multiprocessing
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import groupby
+from typing import Any, Dict, List, Optional
 
-import tiktoken
-from llama_index.core import Document, StorageContext, VectorStoreIndex
+from chromadb.api.models.Collection import Collection
+from llama_index.core import Document
 from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.vector_stores.chroma import ChromaVectorStore
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
 
 from config import get_settings
 from core.helpers.pricing import estimate_embedding_cost
-from core.storage import get_or_create_collection
-from llm import get_llm_provider
+from core.helpers.usage import UsageRecord, record_usage
+from core.storage import (
+    collection_names,
+    document_filter,
+    document_name,
+    document_name_field,
+    find_signatures,
+    get_document,
+    get_or_create_collection,
+    record_chunks,
+    record_signatures,
+    remove_document,
+    route_by_stack,
+)
+from llm import BACKGROUND, get_llm_provider, llm_priority
 
+from .dedup import MinHashDeduplicator
+from .markdown_splitter import MarkdownSectionSplitter
 from .models import IndexStats
+from .neighbours import link_neighbours
 
 
-def index_documents(documents: List[Document], metadata: Dict[str, Any]) -> IndexStats:
+# Chunks written to ChromaDB per request
+_UPSERT_BATCH_SIZE = 5000
+# Below this amount of text, spawning workers (each re-imports LlamaIndex)
+# costs more than splitting serially
+_PARALLEL_SPLIT_MIN_CHARS = 10_000_000
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (0.0 if unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _is_markdown(document: Document) -> bool:
+    """Whether a document should be chunked along its Markdown structure."""
+    return document.metadata.get("source_type") == "markdown"
+
+
+def _split_shard(
+    shard: List[Document], chunk_size: int, chunk_overlap: int
+) -> List[BaseNode]:
+    """Split a shard of documents into nodes (runs inside a worker process).
+
+    Markdown documents are split by section with MarkdownSectionSplitter;
+    everything else goes through SentenceSplitter. Runs of consecutive
+    documents of the same kind are split together to keep document order.
+    """
+    sentence_splitter = SentenceSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    markdown_splitter = MarkdownSectionSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
+    nodes: List[BaseNode] = []
+    for is_markdown, run in groupby(shard, key=_is_markdown):
+        splitter = markdown_splitter if is_markdown else sentence_splitter
+        nodes.extend(splitter.get_nodes_from_documents(list(run)))
+    return nodes
+
+
+def _chunk_source(node: BaseNode) -> str:
+    """Get the stable source of a chunk (not the temp path of an upload)."""
+    name = document_name(node.metadata)
+    return name if name != "Unknown" else node.metadata.get("file_path", "")
+
+
+def _delete_stale_chunks(collection: Collection, nodes: List[BaseNode]) -> int:
+    """Delete the chunks of the given documents that are not in the new chunks.
+
+    A re-indexed document that was edited gets new chunk IDs; without this
+    its previous chunks would stay next to the new ones.
+
+    Returns:
+        Number of chunks deleted.
+    """
+    new_ids = {node.node_id for node in nodes}
+    documents = {
+        document_name(node.metadata): document_name_field(node.metadata)
+        for node in nodes
+    }
+    stale: List[str] = []
+    for name, field in documents.items():
+        if not field:
+            continue  # Chunks without a name can't be matched to a document
+        existing = collection.get(
+            where=document_filter(name, field), include=["metadatas"]
+        )
+        stale.extend(
+            chunk_id
+            for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+            if chunk_id not in new_ids and document_name(metadata) == name
+        )
+    if stale:
+        collection.delete(ids=stale)
+    return len(stale)
+
+
+def _upsert_nodes(collection: Collection, nodes: List[BaseNode]) -> List[BaseNode]:
+    """Write embedded nodes to a collection, replacing their documents' chunks.
+
+    Chunks with the same ID are overwritten and chunks of the same documents
+    that are no longer produced are deleted.
+
+    Returns:
+        The nodes written, one per ID.
+    """
+    # The same input listed twice in one run yields the same IDs
+    nodes = list({node.node_id: node for node in nodes}.values())
+    stale = _delete_stale_chunks(collection, nodes)
+    if stale:
+        print(f"[INDEXING] Deleted {stale} outdated chunks of re-indexed documents")
+    for start in range(0, len(nodes), _UPSERT_BATCH_SIZE):
+        batch = nodes[start : start + _UPSERT_BATCH_SIZE]
+        metadatas = []
+        for node in batch:
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=True)
+            metadatas.append(
+                {key: "" if value is None else value for key, value in metadata.items()}
+            )
+        collection.upsert(
+            ids=[node.node_id for node in batch],
+            embeddings=[node.get_embedding() for node in batch],
+            documents=[
+                node.get_content(metadata_mode=MetadataMode.NONE) for node in batch
+            ],
+            metadatas=metadatas,
+        )
+    return nodes
+
+
+def _find_indexed_duplicates(
+    deduplicator: MinHashDeduplicator,
+    nodes_by_target: Dict[str, List[BaseNode]],
+    signatures: Dict[str, Any],
+) -> Dict[str, str]:
+    """Find the nodes that duplicate chunks indexed by earlier calls.
+
+    Each node is compared with the stored signatures of the collection it
+    is written to (e.g. the other batches of an ingest run). Chunks of the
+    documents being indexed are left out, so a re-indexed document never
+    matches its own previous chunks.
+
+    Returns:
+        Mapping of node ID -> ID of the indexed chunk it duplicates.
+    """
+    found: Dict[str, str] = {}
+    for target, target_nodes in nodes_by_target.items():
+        collection = get_or_create_collection(target)
+        target_signatures = {
+            node.node_id: signatures[node.node_id] for node in target_nodes
+        }
+        known = find_signatures(
+            collection.name,
+            deduplicator.scheme,
+            (
+                key
+                for signature in target_signatures.values()
+                for key in deduplicator.bucket_keys(signature)
+            ),
+            exclude_documents={_chunk_source(node) for node in target_nodes},
+        )
+        if not known:
+            continue
+        matches = deduplicator.match_known(
+            target_signatures,
+            {
+                chunk_id: deduplicator.from_bytes(signature)
+                for chunk_id, signature in known.items()
+            },
+        )
+        if matches:
+            # Only count chunks that are still in the collection
+            present = set(
+                collection.get(ids=sorted(set(matches.values())), include=[])["ids"]
+            )
+            found.update(
+                (node_id, chunk_id)
+                for node_id, chunk_id in matches.items()
+                if chunk_id in present
+            )
+    return found
+
+
+def _group_by_target(
+    nodes: List[BaseNode], routes: Dict[str, str]
+) -> Dict[str, List[BaseNode]]:
+    """Group nodes by the collection their stack is routed to."""
+    nodes_by_target: Dict[str, List[BaseNode]] = {}
+    for node in nodes:
+        target = routes[node.metadata.get("stack", "")]
+        nodes_by_target.setdefault(target, []).append(node)
+    return nodes_by_target
+
+
+def split_documents(
+    documents: List[Document],
+    chunk_size: int,
+    chunk_overlap: int,
+    workers: Optional[int] = None,
+) -> List[BaseNode]:
+    """Split documents into nodes, sharding by document across a process pool.
+
+    Nodes are returned in document order, exactly as a single serial
+    pass would produce them, regardless of the number of
+    workers. Small inputs are split in-process to avoid pool startup costs.
+
+    Args:
+        documents: Documents to split
+        chunk_size: Chunk size in tokens
+        chunk_overlap: Chunk overlap in tokens
+        workers: Number of worker processes. None or 0 uses all CPU cores,
+            1 disables parallelism.
+
+    Returns:
+        List of nodes in document order
+
+    Example:
+        >>> nodes = split_documents(docs, chunk_size=1000, chunk_overlap=200, workers=4)
+    """
+    workers = min(workers or os.cpu_count() or 1, len(documents))
+    total_chars = sum(len(doc.text) for doc in documents)
+
+    if workers <= 1 or total_chars < _PARALLEL_SPLIT_MIN_CHARS:
+        return _split_shard(documents, chunk_size, chunk_overlap)
+
+    # One shard per document keeps the pool balanced when document sizes vary;
+    # map() yields results in submission order, so the output is deterministic
+    shards = [[doc] for doc in documents]
+    # spawn avoids forking the parent's ChromaDB/Streamlit threads
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = executor.map(
+            _split_shard,
+            shards,
+            [chunk_size] * len(shards),
+            [chunk_overlap] * len(shards),
+            chunksize=max(1, len(shards) // (workers * 4)),
+        )
+        return [node for shard_nodes in results for node in shard_nodes]
+
+
+def index_documents(
+    documents: List[Document],
+    metadata: Dict[str, Any],
+    collection_name: str = "tech_docs",
+    load_time: float = 0.0,
+    shard_targets: Optional[Dict[str, str]] = None,
+) -> IndexStats:
     """Index documents into the vector database with chunking and metadata.
 
     This function:
-    1. Splits documents into chunks using SentenceSplitter
-    2. Generates unique IDs for each chunk
+    1. Splits documents into chunks (in parallel per document): Markdown by
+       section with MarkdownSectionSplitter, everything else with SentenceSplitter
+    2. Generates deterministic IDs for each chunk (source, position, content),
+       so re-indexing a document replaces its chunks: unchanged chunks are
+       overwritten and chunks it no longer produces are deleted
     3. Adds user metadata (stack, indexed_at) to each node
-    4. Creates embeddings using the configured embedding model
-    5. Stores vectors in ChromaDB
-    6. Returns indexing statistics
+    4. Drops near-duplicate chunks (boilerplate) if deduplication is enabled,
+       both within the call and against chunks indexed by earlier calls
+    5. Links each chunk to its previous/next chunk and parent section (not embedded)
+    6. Creates embeddings using the configured embedding model
+    7. Stores vectors in ChromaDB (in the shard of each chunk's stack when
+       sharding is enabled) and updates the document catalog
+    8. Returns indexing statistics, including the duration of each stage
 
     Args:
-        documents: List of LlamaIndex Document objects to index
+        documents: List of LlamaIndex Document objects to index. Every part of
+            a source (e.g. all the pages of a PDF) must be in the same call,
+            since the chunks a source no longer produces are deleted
         metadata: User metadata to add to all chunks (e.g., {"stack": "fastapi"})
+        collection_name: Logical or physical collection to write into. Pass the
+            name yielded by blue_green_rebuild() to index into a new version.
+        load_time: Seconds the caller spent loading the documents, reported
+            in the stats alongside the stages measured here
+        shard_targets: Collection to write each stack into, as yielded by
+            rebuild_stacks(). Overrides the routing of collection_name.
 
     Returns:
-        IndexStats with number of chunks, time taken, and documents processed
+        IndexStats with number of chunks, per-stage timings, throughput,
+        and documents processed
 
     Raises:
         ValueError: If documents list is empty
@@ -54,65 +326,130 @@ def index_documents(documents: List[Document], metadata: Dict[str, Any]) -> Inde
     if not documents:
         raise ValueError("No documents provided for indexing")
 
-    start_time = time.time()
+    start_time = time.perf_counter()
     settings = get_settings()
 
     try:
-        # Create sentence splitter with config parameters
-        splitter = SentenceSplitter(
-            chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap
+        # Split documents into nodes with config parameters
+        stage_start = time.perf_counter()
+        nodes = split_documents(
+            documents,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            workers=settings.split_workers,
         )
-
-        # Split documents into nodes
-        nodes = splitter.get_nodes_from_documents(documents)
+        split_time = time.perf_counter() - stage_start
 
         # Add timestamp to metadata (create copy to avoid mutating caller's dict)
         indexed_at = datetime.now().isoformat()
         new_metadata = {**metadata, "indexed_at": indexed_at}
 
-        # Generate unique IDs and add metadata to each node
-        for idx, node in enumerate(nodes):
-            # Generate unique ID based on content hash + index + timestamp
-            content_preview = node.get_content()[:100]
-            source = node.metadata.get("source_url") or node.metadata.get(
-                "file_path", ""
-            )
-            # Include index and precise timestamp to guarantee uniqueness
-            id_string = f"{content_preview}{source}{idx}{time.time()}"
-            unique_id = hashlib.sha256(id_string.encode()).hexdigest()[:16]
-            node.id_ = unique_id
+        # Generate deterministic IDs and add metadata to each node
+        chunk_counts: Dict[str, int] = {}
+        for node in nodes:
+            # The ID depends only on the source, the chunk's position in it and
+            # its content, so re-indexing the same input upserts the same chunks
+            source = _chunk_source(node)
+            chunk_index = chunk_counts.get(source, 0)
+            chunk_counts[source] = chunk_index + 1
+            id_string = f"{source}\x00{chunk_index}\x00{node.get_content()}"
+            node.id_ = hashlib.sha256(id_string.encode()).hexdigest()[:16]
 
             # Add user metadata to node
             for key, value in new_metadata.items():
                 node.metadata[key] = value
 
+        # Collection (or shard) each stack is written to
+        routes = route_by_stack(
+            collection_name,
+            (node.metadata.get("stack", "") for node in nodes),
+            shard_targets,
+        )
+
+        # Drop near-duplicate chunks before paying for their embeddings
+        stage_start = time.perf_counter()
+        num_split = len(nodes)
+        duplicates: Dict[str, str] = {}
+        deduplicator: Optional[MinHashDeduplicator] = None
+        signatures: Dict[str, Any] = {}
+        if settings.dedup_enabled and nodes:
+            deduplicator = MinHashDeduplicator(
+                threshold=settings.dedup_threshold,
+                num_perm=settings.dedup_num_perm,
+                shingle_size=settings.dedup_shingle_size,
+            )
+            dedup_result = deduplicator.deduplicate(nodes)
+            nodes = dedup_result.nodes
+            duplicates = dedup_result.duplicates
+            signatures = dedup_result.signatures
+            indexed = _find_indexed_duplicates(
+                deduplicator, _group_by_target(nodes, routes), signatures
+            )
+            if indexed:
+                nodes = [node for node in nodes if node.node_id not in indexed]
+                duplicates = {
+                    dup: indexed.get(canonical, canonical)
+                    for dup, canonical in duplicates.items()
+                }
+                duplicates.update(indexed)
+        dedup_time = time.perf_counter() - stage_start
+
+        # Link each chunk to its neighbours and section for small-to-big
+        # retrieval (after dedup, so links skip the dropped chunks)
+        link_neighbours(nodes)
+
         # Get embedding model from LLM provider with token tracking
         provider = get_llm_provider(settings.llm_provider)
 
         # Create token counter for tracking embedding tokens
         token_counter = TokenCountingHandler(
-            tokenizer=tiktoken.encoding_for_model(settings.embedding_model).encode
+            tokenizer=provider.get_tokenizer(settings.embedding_model)
         )
         callback_manager = CallbackManager([token_counter])
 
         embed_model = provider.get_embedding_model()
         embed_model.callback_manager = callback_manager
 
-        # Get or create ChromaDB collection
-        collection = get_or_create_collection("tech_docs")
-
-        # Create vector store and storage context
-        vector_store = ChromaVectorStore(chroma_collection=collection)
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        # Embed explicitly (instead of through VectorStoreIndex) so embedding
+        # and vector store writes can be timed separately. Indexing yields
+        # the LLM API rate limit to interactive queries.
+        stage_start = time.perf_counter()
+        with llm_priority(BACKGROUND) as llm_usage:
+            embeddings = embed_model.get_text_embedding_batch(
+                [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes],
+                show_progress=True,
+            )
+        if llm_usage.wait_seconds > 1 or llm_usage.retries:
+            print(
+                f"[INDEXING] Embedding requests queued {llm_usage.wait_seconds:.1f}s "
+                f"in the rate limiter ({llm_usage.retries} retries)"
+            )
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        embed_time = time.perf_counter() - stage_start
 
-        # Create index and persist with callback manager for token tracking
-        VectorStoreIndex(
-            nodes=nodes,
-            storage_context=storage_context,
-            embed_model=embed_model,
-            callback_manager=callback_manager,  # Pass callback to index
-            show_progress=True,
-        )
+        # Write the vectors to the collection (or shard) of each stack
+        stage_start = time.perf_counter()
+        for target, target_nodes in _group_by_target(nodes, routes).items():
+            collection = get_or_create_collection(target)
+            written = _upsert_nodes(collection, target_nodes)
+            record_chunks(collection, [node.metadata for node in written], replace=True)
+            if deduplicator is not None:
+                # Later calls (e.g. the next batches of an ingest run) dedup against them
+                record_signatures(
+                    collection.name,
+                    deduplicator.scheme,
+                    [
+                        (
+                            node.node_id,
+                            _chunk_source(node),
+                            deduplicator.to_bytes(signatures[node.node_id]),
+                            deduplicator.bucket_keys(signatures[node.node_id]),
+                        )
+                        for node in written
+                    ],
+                )
+        store_time = time.perf_counter() - stage_start
 
         # Get real token usage from callback
         total_tokens = token_counter.total_embedding_token_count
@@ -121,7 +458,16 @@ def index_documents(documents: List[Document], metadata: Dict[str, Any]) -> Inde
         )
 
         # Calculate statistics
-        time_taken = time.time() - start_time
+        time_taken = time.perf_counter() - start_time
+        record_usage(
+            UsageRecord(
+                operation="index",
+                model=settings.embedding_model,
+                embedding_tokens=total_tokens,
+                cost=estimated_cost,
+                latency_ms=time_taken * 1000,
+            )
+        )
 
         return IndexStats(
             num_chunks=len(nodes),
@@ -129,10 +475,71 @@ def index_documents(documents: List[Document], metadata: Dict[str, Any]) -> Inde
             documents_processed=len(documents),
             embedding_tokens=total_tokens,
             estimated_cost=estimated_cost,
+            duplicates_removed=len(duplicates),
+            dedup_ratio=len(duplicates) / num_split if num_split else 0.0,
+            duplicates=duplicates,
+            load_time=load_time,
+            split_time=split_time,
+            dedup_time=dedup_time,
+            embed_time=embed_time,
+            store_time=store_time,
+            bytes_processed=sum(len(doc.text.encode("utf-8")) for doc in documents),
+            peak_rss_mb=_peak_rss_mb(),
         )
 
     except Exception as e:
         raise RuntimeError(f"Failed to index documents: {str(e)}") from e
 
 
-__all__ = ["index_documents"]
+def delete_document(doc_identifier: str, collection_name: str = "tech_docs") -> int:
+    """Delete all chunks of a document from the vector database.
+
+    Args:
+        doc_identifier: Document name (original_filename, filename or source_url)
+        collection_name: Logical or physical collection to delete from (and
+            its stack shards)
+
+    Returns:
+        Number of chunks deleted
+
+    Raises:
+        ValueError: If doc_identifier is empty
+        RuntimeError: If deletion fails
+
+    Example:
+        >>> deleted = delete_document("https://example.com/docs")
+        >>> print(f"Deleted {deleted} chunks")
+    """
+    if not doc_identifier:
+        raise ValueError("Document identifier cannot be empty")
+
+    try:
+        deleted = 0
+        # The document may be in the base collection or in any stack shard
+        for name in collection_names(collection_name):
+            collection = get_or_create_collection(name)
+            row = get_document(collection, doc_identifier)
+            if row is None or not row["name_field"]:
+                continue
+            results = collection.get(
+                where=document_filter(doc_identifier, row["name_field"]),
+                include=["metadatas"],
+            )
+            # A chunk can match the field and still belong to a document
+            # named by a field of higher precedence
+            chunk_ids = [
+                chunk_id
+                for chunk_id, metadata in zip(results["ids"], results["metadatas"])
+                if document_name(metadata) == doc_identifier
+            ]
+            if chunk_ids:
+                collection.delete(ids=chunk_ids)
+                remove_document(collection, doc_identifier)
+            deleted += len(chunk_ids)
+        return deleted
+
+    except Exception as e:
+        raise RuntimeError(f"Failed to delete document: {str(e)}") from e
+
+
+__all__ = ["index_documents", "split_documents", "delete_document"]
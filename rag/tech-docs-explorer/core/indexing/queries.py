@@ -1,23 +1,80 @@
 """Query functions for retrieving indexed documents and chunks.
 
 This module provides functionality for:
-- Retrieving summaries of all indexed documents
-- Getting chunks for specific documents
+- Retrieving summaries of all indexed documents (from the document catalog)
+- Getting chunks for specific documents (filtered and paginated in ChromaDB)
+
+Documents are looked up in the base collection and in every stack shard.
 """
 
 import hashlib
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from chromadb.api.models.Collection import Collection
 
-from core.storage import get_or_create_collection
+from core.storage import (
+    collection_names,
+    document_filter,
+    get_or_create_collection,
+    list_documents,
+)
 
 from .models import ChunkDetail, ChunkInfo, DocumentInfo, DocumentSummary
 
 
+def _doc_id(name: str) -> str:
+    """Get the stable short identifier of a document name."""
+    return hashlib.sha256(name.encode()).hexdigest()[:16]
+
+
+def _catalog_rows() -> List[Tuple[Dict[str, Any], Collection]]:
+    """Get the catalog rows of every collection of tech_docs, newest first.
+
+    Each row is paired with the collection holding the document's chunks. A
+    document found in more than one collection (e.g. indexed before and after
+    sharding was enabled) is listed once, from its most recent indexing.
+    """
+    rows = [
+        (row, collection)
+        for collection in map(get_or_create_collection, collection_names("tech_docs"))
+        for row in list_documents(collection)
+    ]
+    rows.sort(key=lambda item: item[0]["indexed_at"], reverse=True)
+
+    seen = set()
+    unique_rows = []
+    for row, collection in rows:
+        if row["name"] not in seen:
+            seen.add(row["name"])
+            unique_rows.append((row, collection))
+    return unique_rows
+
+
+def _document_where(
+    matches: Callable[[Dict[str, Any]], bool],
+) -> Tuple[Optional[Dict[str, Any]], Optional[Collection]]:
+    """Find a document in the catalog and build the where filter of its chunks.
+
+    Args:
+        matches: Predicate selecting the document's catalog row.
+
+    Returns:
+        The where filter and the collection holding the chunks, or
+        (None, None) if no document matches or its chunks have no name.
+    """
+    for row, collection in _catalog_rows():
+        if matches(row):
+            if not row["name_field"]:
+                break
+            return document_filter(row["name"], row["name_field"]), collection
+    return None, None
+
+
 def get_indexed_documents() -> List[DocumentInfo]:
     """Retrieve summary information about all indexed documents.
 
-    This function queries ChromaDB to get all document metadata,
-    groups chunks by document, and returns summary information.
+    Documents are read from the document catalog, so the cost depends on the
+    number of documents, not on the number of chunks.
 
     Returns:
         List of DocumentInfo objects with document summaries
@@ -31,64 +88,35 @@ def get_indexed_documents() -> List[DocumentInfo]:
         ...     print(f"{doc.name}: {doc.num_chunks} chunks")
     """
     try:
-        collection = get_or_create_collection("tech_docs")
-
-        # Get all data from collection
-        results = collection.get(include=["metadatas"])
-
-        if not results["ids"]:
-            return []
-
-        # Group by document (using filename or source_url as identifier)
-        doc_groups: Dict[str, Dict[str, Any]] = {}
-
-        for chunk_id, metadata in zip(results["ids"], results["metadatas"]):
-            # Determine document identifier (original_filename > filename > source_url)
-            doc_name = (
-                metadata.get("original_filename")
-                or metadata.get("filename")
-                or metadata.get("source_url", "Unknown")
-            )
-
-            if doc_name not in doc_groups:
-                doc_groups[doc_name] = {
-                    "name": doc_name,
-                    "doc_type": metadata.get("source_type", "unknown"),
-                    "stack": metadata.get("stack", ""),
-                    "indexed_at": metadata.get("indexed_at", ""),
-                    "chunks": [],
-                    "doc_id": hashlib.sha256(doc_name.encode()).hexdigest()[:16],
-                }
-
-            doc_groups[doc_name]["chunks"].append(chunk_id)
-
-        # Convert to DocumentInfo objects
-        documents = [
+        # Catalog rows are already sorted by indexed_at (most recent first)
+        return [
             DocumentInfo(
-                name=info["name"],
-                doc_type=info["doc_type"],
-                stack=info["stack"],
-                indexed_at=info["indexed_at"],
-                num_chunks=len(info["chunks"]),
-                doc_id=info["doc_id"],
+                name=row["name"],
+                doc_type=row["doc_type"],
+                stack=row["stack"],
+                indexed_at=row["indexed_at"],
+                num_chunks=row["num_chunks"],
+                doc_id=_doc_id(row["name"]),
             )
-            for info in doc_groups.values()
+            for row, _ in _catalog_rows()
         ]
 
-        # Sort by indexed_at (most recent first)
-        documents.sort(key=lambda x: x.indexed_at, reverse=True)
-
-        return documents
-
     except Exception as e:
         raise RuntimeError(f"Failed to retrieve indexed documents: {str(e)}") from e
 
 
-def get_document_chunks(doc_id: str) -> List[ChunkInfo]:
-    """Get all chunks for a specific document.
+def get_document_chunks(
+    doc_id: str, offset: int = 0, limit: Optional[int] = None
+) -> List[ChunkInfo]:
+    """Get the chunks of a specific document, optionally one page at a time.
+
+    The document name is looked up in the document catalog and the chunks are
+    fetched with a ChromaDB where filter, so only this document is read.
 
     Args:
         doc_id: Document identifier (hash of document name)
+        offset: Number of chunks to skip
+        limit: Maximum number of chunks to return (None = all)
 
     Returns:
         List of ChunkInfo objects with chunk details
@@ -100,62 +128,39 @@ def get_document_chunks(doc_id: str) -> List[ChunkInfo]:
     Example:
         >>> docs = get_indexed_documents()
         >>> if docs:
-        ...     chunks = get_document_chunks(docs[0].doc_id)
+        ...     chunks = get_document_chunks(docs[0].doc_id, limit=20)
         ...     print(f"Found {len(chunks)} chunks")
     """
     if not doc_id:
         raise ValueError("Document ID cannot be empty")
 
     try:
-        collection = get_or_create_collection("tech_docs")
-
-        # Get all data from collection in a single query
-        results = collection.get(include=["metadatas", "documents"])
-
-        if not results["ids"]:
+        # Find the document that matches the doc_id in the catalog
+        where, collection = _document_where(lambda row: _doc_id(row["name"]) == doc_id)
+        if where is None:
             return []
 
-        # First pass: find the document name that matches the doc_id
-        doc_name = None
-        for metadata in results["metadatas"]:
-            candidate_name = (
-                metadata.get("original_filename")
-                or metadata.get("filename")
-                or metadata.get("source_url", "")
-            )
-            candidate_id = hashlib.sha256(candidate_name.encode()).hexdigest()[:16]
-
-            if candidate_id == doc_id:
-                doc_name = candidate_name
-                break
+        results = collection.get(
+            where=where,
+            include=["metadatas", "documents"],
+            offset=offset,
+            limit=limit,
+        )
 
-        if not doc_name:
-            return []
-
-        # Second pass: collect chunks for the matched document
         chunks = []
         for chunk_id, metadata, document in zip(
             results["ids"], results["metadatas"], results["documents"]
         ):
-            chunk_doc_name = (
-                metadata.get("original_filename")
-                or metadata.get("filename")
-                or metadata.get("source_url", "")
-            )
-
-            if chunk_doc_name == doc_name:
-                # Handle None or missing document text
-                if document is None or not document:
-                    document = ""
+            # Handle None or missing document text
+            if document is None or not document:
+                document = ""
 
-                # Truncate text to 200 characters
-                text = document[:200] if len(document) > 200 else document
-                if len(document) > 200:
-                    text += "..."
+            # Truncate text to 200 characters
+            text = document[:200] if len(document) > 200 else document
+            if len(document) > 200:
+                text += "..."
 
-                chunks.append(
-                    ChunkInfo(chunk_id=chunk_id, text=text, metadata=metadata)
-                )
+            chunks.append(ChunkInfo(chunk_id=chunk_id, text=text, metadata=metadata))
 
         return chunks
 
@@ -166,9 +171,9 @@ def get_document_chunks(doc_id: str) -> List[ChunkInfo]:
 def get_all_documents_summary() -> List[DocumentSummary]:
     """Get summary information of all indexed documents for explorer view.
 
-    This function retrieves all documents from ChromaDB and groups them
-    by document name, returning simplified summary information optimized
-    for the explorer UI.
+    Documents are read from the document catalog (one row per document)
+    instead of grouping the metadata of every chunk, so listing stays fast
+    on large collections.
 
     Returns:
         List of DocumentSummary objects sorted by indexed_at (newest first)
@@ -182,72 +187,48 @@ def get_all_documents_summary() -> List[DocumentSummary]:
         ...     print(f"{doc.name} ({doc.doc_type}): {doc.num_chunks} chunks")
     """
     try:
-        collection = get_or_create_collection("tech_docs")
-
-        # Get all metadata from collection
-        results = collection.get(include=["metadatas"])
-
-        if not results["ids"]:
-            return []
-
-        # Group chunks by document identifier
-        doc_groups: Dict[str, Dict[str, Any]] = {}
-
-        for metadata in results["metadatas"]:
-            # Determine document identifier (original_filename > filename > source_url)
-            doc_name = (
-                metadata.get("original_filename")
-                or metadata.get("filename")
-                or metadata.get("source_url", "Unknown")
-            )
-
-            if doc_name not in doc_groups:
-                doc_groups[doc_name] = {
-                    "name": doc_name,
-                    "doc_type": metadata.get("source_type", "unknown"),
-                    "stack": metadata.get("stack", ""),
-                    "indexed_at": metadata.get("indexed_at", ""),
-                    "num_chunks": 0,
-                }
-
-            doc_groups[doc_name]["num_chunks"] += 1
-
-        # Convert to DocumentSummary objects
-        summaries = [
+        return [
             DocumentSummary(
-                name=info["name"],
-                doc_type=info["doc_type"],
-                stack=info["stack"],
-                indexed_at=info["indexed_at"],
-                num_chunks=info["num_chunks"],
+                name=row["name"],
+                doc_type=row["doc_type"],
+                stack=row["stack"],
+                indexed_at=row["indexed_at"],
+                num_chunks=row["num_chunks"],
             )
-            for info in doc_groups.values()
+            for row, _ in _catalog_rows()
         ]
 
-        # Sort by indexed_at (most recent first)
-        summaries.sort(key=lambda x: x.indexed_at, reverse=True)
-
-        return summaries
-
     except Exception as e:
         raise RuntimeError(f"Failed to retrieve document summaries: {str(e)}") from e
 
 
-def get_chunks_for_document(doc_identifier: str) -> List[ChunkDetail]:
-    """Get all chunks for a specific document by its name/URL identifier.
+def get_chunks_for_document(
+    doc_identifier: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    include_embeddings: bool = False,
+) -> List[ChunkDetail]:
+    """Get the chunks of a document by its name/URL identifier, one page at a time.
+
+    The document filter is pushed down to ChromaDB, so only the requested
+    page of this document is read. Embeddings are only loaded on request.
 
     Args:
-        doc_identifier: Document name (filename or source_url)
+        doc_identifier: Document name (original_filename, filename or source_url)
+        offset: Number of chunks to skip
+        limit: Maximum number of chunks to return (None = all)
+        include_embeddings: Whether to load the embedding vector of each chunk
 
     Returns:
-        List of ChunkDetail objects with chunk text and metadata
+        List of ChunkDetail objects with chunk text and metadata (and
+        embedding, if requested)
 
     Raises:
         ValueError: If doc_identifier is empty
         RuntimeError: If database query fails
 
     Example:
-        >>> chunks = get_chunks_for_document("https://example.com/docs")
+        >>> chunks = get_chunks_for_document("https://example.com/docs", limit=5)
         >>> for chunk in chunks:
         ...     print(f"Chunk {chunk.chunk_id[:8]}: {chunk.text[:50]}...")
     """
@@ -255,46 +236,39 @@ def get_chunks_for_document(doc_identifier: str) -> List[ChunkDetail]:
         raise ValueError("Document identifier cannot be empty")
 
     try:
-        collection = get_or_create_collection("tech_docs")
+        where, collection = _document_where(lambda row: row["name"] == doc_identifier)
+        if where is None:
+            return []
 
-        # Get all data from collection including embeddings
-        results = collection.get(include=["metadatas", "documents", "embeddings"])
+        include = ["metadatas", "documents"]
+        if include_embeddings:
+            include.append("embeddings")
 
-        if not results["ids"]:
-            return []
+        results = collection.get(
+            where=where,
+            include=include,
+            offset=offset,
+            limit=limit,
+        )
 
-        # Filter chunks that belong to this document
+        embeddings = results.get("embeddings") if include_embeddings else None
         chunks = []
-        embeddings = results.get("embeddings", [])
         for idx, (chunk_id, metadata, document) in enumerate(
             zip(results["ids"], results["metadatas"], results["documents"])
         ):
-            # Check if this chunk belongs to the target document
-            chunk_doc_name = (
-                metadata.get("original_filename")
-                or metadata.get("filename")
-                or metadata.get("source_url", "")
-            )
-
-            if chunk_doc_name == doc_identifier:
-                # Handle None or missing document text
-                text = document if document else ""
-
-                # Get embedding for this chunk (check bounds properly)
-                embedding = (
-                    embeddings[idx]
-                    if embeddings is not None and idx < len(embeddings)
-                    else None
-                )
-
-                chunks.append(
-                    ChunkDetail(
-                        chunk_id=chunk_id,
-                        text=text,
-                        metadata=metadata,
-                        embedding=embedding,
-                    )
+            chunks.append(
+                ChunkDetail(
+                    chunk_id=chunk_id,
+                    # Handle None or missing document text
+                    text=document if document else "",
+                    metadata=metadata,
+                    embedding=(
+                        [float(value) for value in embeddings[idx]]
+                        if embeddings is not None
+                        else None
+                    ),
                 )
+            )
 
         return chunks
 
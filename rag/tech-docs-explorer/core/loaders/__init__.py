@@ -3,7 +3,9 @@ Document loaders for various file types and sources.
 
 This module provides loaders for different document types:
 - WebLoader: Load content from URLs
+- CrawlerLoader: Crawl same-domain pages from a start URL with HTTP caching
 - PDFLoader: Load content from PDF files
+- MarkdownLoader: Load Markdown and HTML files, keeping their section structure
 - BaseLoader: Abstract base class for custom loaders
 """
 
@@ -11,7 +13,13 @@ from pathlib import Path
 from typing import Union
 
 from core.loaders.base import BaseLoader
-from core.loaders.pdf_loader import PDFLoader
+from core.loaders.crawler_loader import CrawlerLoader
+from core.loaders.markdown_loader import (
+    HTML_EXTENSIONS,
+    MARKDOWN_EXTENSIONS,
+    MarkdownLoader,
+)
+from core.loaders.pdf_loader import PageTiming, PDFLoader
 from core.loaders.web_loader import WebLoader
 
 
@@ -23,7 +31,7 @@ def get_loader(source: Union[str, Path]) -> BaseLoader:
         source: URL string or file path to load from.
 
     Returns:
-        Appropriate loader instance (WebLoader or PDFLoader).
+        Appropriate loader instance (WebLoader, PDFLoader or MarkdownLoader).
 
     Raises:
         ValueError: If source type cannot be determined.
@@ -36,6 +44,10 @@ def get_loader(source: Union[str, Path]) -> BaseLoader:
         >>> loader = get_loader("/path/to/doc.pdf")
         >>> isinstance(loader, PDFLoader)
         True
+
+        >>> loader = get_loader("/path/to/runbook.md")
+        >>> isinstance(loader, MarkdownLoader)
+        True
     """
     source_str = str(source)
 
@@ -45,18 +57,29 @@ def get_loader(source: Union[str, Path]) -> BaseLoader:
 
     # Check if it's a PDF file
     path = Path(source_str)
-    if path.suffix.lower() == ".pdf":
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
         return PDFLoader()
 
+    # Check if it's a Markdown or HTML file
+    if suffix in MARKDOWN_EXTENSIONS or suffix in HTML_EXTENSIONS:
+        return MarkdownLoader()
+
     raise ValueError(
         f"Cannot determine loader type for source: {source_str}. "
-        "Supported types: URLs (http/https) and PDF files (.pdf)"
+        "Supported types: URLs (http/https), PDF files (.pdf), "
+        "Markdown files (.md, .markdown) and HTML files (.html, .htm)"
     )
 
 
 __all__ = [
     "BaseLoader",
     "WebLoader",
+    "CrawlerLoader",
     "PDFLoader",
+    "PageTiming",
+    "MarkdownLoader",
+    "MARKDOWN_EXTENSIONS",
+    "HTML_EXTENSIONS",
     "get_loader",
 ]
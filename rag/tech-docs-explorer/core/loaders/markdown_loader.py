@@ -0,0 +1,134 @@
+"""
+Markdown document loader for loading Markdown and HTML files.
+
+Markdown files are read as-is; HTML files are converted to Markdown with
+html2text so both keep their heading and code block structure for the
+section-aware chunker (MarkdownSectionSplitter).
+"""
+
+import re
+import textwrap
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import html2text
+from llama_index.core.schema import Document
+
+from core.loaders.base import BaseLoader
+
+
+MARKDOWN_EXTENSIONS = {".md": "text/markdown", ".markdown": "text/markdown"}
+HTML_EXTENSIONS = {".html": "text/html", ".htm": "text/html"}
+# File metadata kept for filtering but excluded from embeddings and LLM prompts
+_EXCLUDED_FILE_METADATA = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "creation_date",
+    "last_modified_date",
+]
+_CODE_MARKER_PATTERN = re.compile(r"\[code\]\n(.*?)\n?\[/code\]", re.DOTALL)
+
+
+def _html_to_markdown(html: str) -> str:
+    """Convert HTML to Markdown, keeping long lines and code blocks intact."""
+    converter = html2text.HTML2Text()
+    converter.body_width = 0  # Don't hard-wrap paragraphs
+    converter.mark_code = True
+    converter.ignore_images = True
+    markdown = converter.handle(html)
+    # html2text marks <pre> blocks as indented [code]...[/code]; use fences
+    # so the chunker can recognize them
+    return _CODE_MARKER_PATTERN.sub(
+        lambda m: f"```\n{textwrap.dedent(m.group(1))}\n```", markdown
+    )
+
+
+class MarkdownLoader(BaseLoader):
+    """
+    Loader for Markdown (.md, .markdown) and HTML (.html, .htm) files.
+
+    Produces one Document per file. Documents get source_type "markdown",
+    which makes the indexing pipeline chunk them by section instead of by
+    sentence.
+    """
+
+    def load(self, file_path: str) -> List[Document]:
+        """
+        Load a document from a Markdown or HTML file.
+
+        Args:
+            file_path: Path to the file to load.
+
+        Returns:
+            List with one Document holding the Markdown text and metadata.
+
+        Raises:
+            ValueError: If file path is empty, doesn't exist or has an
+                        unsupported extension.
+            Exception: If loading fails (encoding error, permission error, etc.).
+
+        Examples:
+            >>> loader = MarkdownLoader()
+            >>> docs = loader.load("/path/to/runbook.md")
+            >>> print(docs[0].metadata["filename"])
+            runbook.md
+        """
+        if not file_path or not file_path.strip():
+            raise ValueError("File path cannot be empty")
+
+        path = Path(file_path)
+
+        if not path.exists():
+            raise ValueError(f"File not found: {file_path}")
+
+        if not path.is_file():
+            raise ValueError(f"Path is not a file: {file_path}")
+
+        suffix = path.suffix.lower()
+        if suffix not in MARKDOWN_EXTENSIONS and suffix not in HTML_EXTENSIONS:
+            raise ValueError(f"File is not Markdown or HTML: {file_path}")
+
+        try:
+            content = path.read_text(encoding="utf-8")
+            if suffix in HTML_EXTENSIONS:
+                content = _html_to_markdown(content)
+
+            stat = path.stat()
+            return [
+                Document(
+                    text=content,
+                    metadata={
+                        "file_name": path.name,
+                        "file_path": str(path.absolute()),
+                        "file_type": MARKDOWN_EXTENSIONS.get(suffix)
+                        or HTML_EXTENSIONS[suffix],
+                        "file_size": stat.st_size,
+                        "creation_date": datetime.fromtimestamp(stat.st_ctime).strftime(
+                            "%Y-%m-%d"
+                        ),
+                        "last_modified_date": datetime.fromtimestamp(
+                            stat.st_mtime
+                        ).strftime("%Y-%m-%d"),
+                        "source_type": self.get_source_type(),
+                        "filename": path.name,
+                    },
+                    excluded_embed_metadata_keys=list(_EXCLUDED_FILE_METADATA),
+                    excluded_llm_metadata_keys=list(_EXCLUDED_FILE_METADATA),
+                )
+            ]
+
+        except Exception as e:
+            raise Exception(
+                f"Failed to load document from '{file_path}': {str(e)}"
+            ) from e
+
+    def get_source_type(self) -> str:
+        """
+        Get the source type identifier.
+
+        Returns:
+            String "markdown" identifying this as a Markdown source.
+        """
+        return "markdown"
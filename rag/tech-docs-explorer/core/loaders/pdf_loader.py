@@ -1,31 +1,118 @@
 """
 PDF document loader for loading content from PDF files.
 
-Uses LlamaIndex's SimpleDirectoryReader to parse PDF files.
+Extracts text page by page with pypdf, spreading pages across a process pool
+for large files, and caches the extracted text keyed by the file's content
+hash so re-indexing an unchanged PDF skips parsing entirely.
 """
 
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
-from llama_index.core import SimpleDirectoryReader
+import pypdf
 from llama_index.core.schema import Document
 
+from config import get_settings
 from core.loaders.base import BaseLoader
 
 
+# Below this page count, spawning workers costs more than extracting serially
+_PARALLEL_MIN_PAGES = 32
+# Bump when the cached page format or extraction logic changes
+_CACHE_VERSION = 1
+# File metadata kept for filtering but excluded from embeddings and LLM prompts
+# (same keys SimpleDirectoryReader excludes)
+_EXCLUDED_FILE_METADATA = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "creation_date",
+    "last_modified_date",
+    "last_accessed_date",
+]
+
+
+@dataclass
+class PageTiming:
+    """
+    Text extraction timing for a single PDF page.
+
+    Attributes:
+        page_index: Zero-based page index
+        page_label: Page label as printed in the PDF (e.g. "iv", "12")
+        seconds: Time spent extracting the page text
+        chars: Number of characters extracted
+    """
+
+    page_index: int
+    page_label: str
+    seconds: float
+    chars: int
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Extract text for pages [start, end) of a PDF (runs inside a worker process)."""
+    reader = pypdf.PdfReader(file_path)
+    # page_labels builds the whole label list on every access
+    labels = reader.page_labels
+    pages = []
+    for index in range(start, end):
+        page_start = time.perf_counter()
+        text = reader.pages[index].extract_text()
+        pages.append(
+            {
+                "index": index,
+                "label": labels[index],
+                "text": text,
+                "seconds": time.perf_counter() - page_start,
+            }
+        )
+    return pages
+
+
+def _file_hash(path: Path) -> str:
+    """Compute the SHA-256 of a file's content in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class PDFLoader(BaseLoader):
     """
     Loader for PDF documents.
 
-    Uses SimpleDirectoryReader with PDF filtering to extract text content
-    from PDF files. Automatically adds metadata for source tracking.
+    Produces one Document per page (like SimpleDirectoryReader) with metadata
+    for source tracking. After each load, page_timings holds the extraction
+    time of every page and cache_hit tells whether parsing was skipped.
     """
 
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None, use_cache: bool = True):
         """
         Initialize the PDF loader.
+
+        Args:
+            workers: Worker processes for page extraction. None uses
+                     pdf.workers from settings (0 = all CPU cores, 1 = serial).
+            use_cache: Whether to reuse text extracted from identical files.
         """
-        pass
+        settings = get_settings()
+        self.workers = settings.pdf_workers if workers is None else workers
+        self.use_cache = use_cache
+        self.cache_dir = settings.get_pdf_cache_path()
+        self.slow_page_seconds = settings.pdf_slow_page_seconds
+        self.page_timings: List[PageTiming] = []
+        self.cache_hit = False
 
     def load(self, file_path: str) -> List[Document]:
         """
@@ -35,7 +122,7 @@ class PDFLoader(BaseLoader):
             file_path: Path to the PDF file to load.
 
         Returns:
-            List of Document objects with content and metadata.
+            List of Document objects (one per page) with content and metadata.
 
         Raises:
             ValueError: If file path is empty or file doesn't exist.
@@ -61,24 +148,129 @@ class PDFLoader(BaseLoader):
             raise ValueError(f"File is not a PDF: {file_path}")
 
         try:
-            # Load PDF using SimpleDirectoryReader
-            reader = SimpleDirectoryReader(
-                input_files=[str(path)],
-                required_exts=[".pdf"],
-            )
-            documents = reader.load_data()
+            start_time = time.perf_counter()
+            content_hash = _file_hash(path)
 
-            # Add metadata to each document
-            for doc in documents:
-                doc.metadata["source_type"] = self.get_source_type()
-                doc.metadata["filename"] = path.name
-                doc.metadata["file_path"] = str(path.absolute())
+            pages = self._read_cache(content_hash) if self.use_cache else None
+            self.cache_hit = pages is not None
+            if pages is None:
+                pages = self._extract_pages(path)
+                if self.use_cache:
+                    self._write_cache(content_hash, pages)
 
-            return documents
+            self.page_timings = [
+                PageTiming(
+                    page_index=page["index"],
+                    page_label=page["label"],
+                    seconds=page["seconds"],
+                    chars=len(page["text"]),
+                )
+                for page in pages
+            ]
+            self._report(path, time.perf_counter() - start_time)
+
+            return [self._to_document(path, page) for page in pages]
 
         except Exception as e:
             raise Exception(f"Failed to load PDF from '{file_path}': {str(e)}") from e
 
+    def _extract_pages(self, path: Path) -> List[Dict[str, Any]]:
+        """Extract every page, in parallel page ranges for large files."""
+        num_pages = len(pypdf.PdfReader(str(path)).pages)
+        workers = min(self.workers or os.cpu_count() or 1, num_pages)
+
+        if workers <= 1 or num_pages < _PARALLEL_MIN_PAGES:
+            return _extract_page_range(str(path), 0, num_pages)
+
+        # Several ranges per worker so one slow range doesn't stall the pool
+        range_size = math.ceil(num_pages / (workers * 4))
+        ranges: List[Tuple[int, int]] = [
+            (start, min(start + range_size, num_pages))
+            for start in range(0, num_pages, range_size)
+        ]
+        # spawn avoids forking the parent's ChromaDB/Streamlit threads
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results = executor.map(
+                _extract_page_range,
+                [str(path)] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+            )
+            return [page for range_pages in results for page in range_pages]
+
+    def _cache_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}.json"
+
+    def _read_cache(self, content_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """Read cached pages for a content hash, or None on a miss."""
+        try:
+            with open(self._cache_path(content_hash), "r") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if entry.get("version") != _CACHE_VERSION:
+            return None
+        return entry["pages"]
+
+    def _write_cache(self, content_hash: str, pages: List[Dict[str, Any]]) -> None:
+        """Write extracted pages to the cache (atomic replace)."""
+        path = self._cache_path(content_hash)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": _CACHE_VERSION, "pages": pages}, f)
+        tmp_path.replace(path)
+
+    def _report(self, path: Path, elapsed: float) -> None:
+        """Print a one-line summary with the slowest pages."""
+        if self.cache_hit:
+            print(
+                f"[PDF_LOADER] {path.name}: {len(self.page_timings)} pages from cache"
+            )
+            return
+
+        slow_pages = sorted(
+            (t for t in self.page_timings if t.seconds >= self.slow_page_seconds),
+            key=lambda t: t.seconds,
+            reverse=True,
+        )
+        message = (
+            f"[PDF_LOADER] {path.name}: {len(self.page_timings)} pages "
+            f"extracted in {elapsed:.2f}s"
+        )
+        if slow_pages:
+            slowest = ", ".join(
+                f"p{t.page_label} {t.seconds:.2f}s" for t in slow_pages[:5]
+            )
+            message += f" (slow pages: {slowest})"
+        print(message)
+
+    def _to_document(self, path: Path, page: Dict[str, Any]) -> Document:
+        """Build a page Document with the same metadata SimpleDirectoryReader sets."""
+        stat = path.stat()
+        return Document(
+            text=page["text"],
+            metadata={
+                "page_label": page["label"],
+                "file_name": path.name,
+                "file_path": str(path.absolute()),
+                "file_type": "application/pdf",
+                "file_size": stat.st_size,
+                "creation_date": datetime.fromtimestamp(stat.st_ctime).strftime(
+                    "%Y-%m-%d"
+                ),
+                "last_modified_date": datetime.fromtimestamp(stat.st_mtime).strftime(
+                    "%Y-%m-%d"
+                ),
+                "source_type": self.get_source_type(),
+                "filename": path.name,
+            },
+            excluded_embed_metadata_keys=list(_EXCLUDED_FILE_METADATA),
+            excluded_llm_metadata_keys=list(_EXCLUDED_FILE_METADATA),
+        )
+
     def get_source_type(self) -> str:
         """
         Get the source type identifier.
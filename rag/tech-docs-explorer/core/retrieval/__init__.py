@@ -1,7 +1,11 @@
 """RAG retrieval module for Tech Docs Explorer."""
 
+from .conversation import ChatTurn, Conversation
 from .engine import query
+from .expansion import EXPANSION_MODES, ContextExpansionPostprocessor
 from .models import ChunkInfo, RAGConfig, RAGResponse, ResponseMetrics
+from .quantized import QuantizedVectorStore
+from .sharded import ShardedRetriever
 from .transforms import apply_reranking
 
 __all__ = [
@@ -9,6 +13,12 @@ __all__ = [
     "ChunkInfo",
     "ResponseMetrics",
     "RAGResponse",
+    "ChatTurn",
+    "Conversation",
     "query",
     "apply_reranking",
+    "ContextExpansionPostprocessor",
+    "EXPANSION_MODES",
+    "ShardedRetriever",
+    "QuantizedVectorStore",
 ]
@@ -0,0 +1,175 @@
+"""Multi-turn conversation state for chat queries.
+
+A Conversation keeps the turns of one chat session so follow-up questions
+can be answered in context:
+- Follow-ups are condensed with the history into a standalone question
+  (cached per history and question, so repeats don't call the LLM)
+- The history sent to the LLM is truncated to a token budget, most recent
+  turns first
+- The chunks retrieved for a question are reused by follow-ups that stay on
+  the same topic (similar query embedding, same search settings and data)
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from llama_index.core.chat_engine.condense_question import DEFAULT_PROMPT
+from llama_index.core.llms import LLM
+from llama_index.core.schema import NodeWithScore
+
+from config import get_settings
+
+
+@dataclass
+class ChatTurn:
+    """One question and answer of a conversation.
+
+    Attributes:
+        question: Question as asked by the user
+        standalone_question: Question condensed with the history (used for retrieval)
+        answer: Generated answer
+    """
+
+    question: str
+    standalone_question: str
+    answer: str
+
+
+@dataclass
+class _RetrievalCache:
+    """Chunks retrieved for a question, with what they depend on."""
+
+    key: Hashable
+    embedding: List[float]
+    nodes: List[NodeWithScore]
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class Conversation:
+    """State of a multi-turn chat session.
+
+    Example:
+        >>> conversation = Conversation()
+        >>> query("How does dependency injection work in FastAPI?", config, conversation)
+        >>> query("And how do I override it in tests?", config, conversation)
+        >>> conversation.turns[-1].standalone_question
+        'How do I override FastAPI dependencies in tests?'
+    """
+
+    def __init__(
+        self,
+        history_max_tokens: Optional[int] = None,
+        reuse_similarity: Optional[float] = None,
+    ):
+        """
+        Initialize an empty conversation.
+
+        Args:
+            history_max_tokens: Token budget of the history sent to condense
+                follow-ups. Default is chat.history_max_tokens from config.yaml.
+            reuse_similarity: Minimum cosine similarity between a follow-up and
+                the question whose chunks were retrieved to reuse them. Default
+                is chat.reuse_similarity from config.yaml.
+        """
+        settings = get_settings()
+        self.history_max_tokens = history_max_tokens or settings.chat_history_max_tokens
+        self.reuse_similarity = reuse_similarity or settings.chat_reuse_similarity
+        self.turns: List[ChatTurn] = []
+        self._condensed: Dict[str, str] = {}
+        self._retrieval: Optional[_RetrievalCache] = None
+
+    def history(self, tokenizer: Callable[[str], Sequence[Any]]) -> List[ChatTurn]:
+        """Get the most recent turns that fit the token budget, oldest first."""
+        recent: List[ChatTurn] = []
+        used = 0
+        for turn in reversed(self.turns):
+            used += len(tokenizer(turn.question)) + len(tokenizer(turn.answer))
+            if used > self.history_max_tokens and recent:
+                break
+            recent.append(turn)
+        return recent[::-1]
+
+    def condense(
+        self,
+        question: str,
+        llm: LLM,
+        tokenizer: Callable[[str], Sequence[Any]],
+    ) -> Tuple[str, bool]:
+        """
+        Rewrite a follow-up as a standalone question using the history.
+
+        The first question of a conversation is returned unchanged.
+
+        Args:
+            question: Question as asked by the user.
+            llm: LLM that rewrites the question.
+            tokenizer: Counts tokens for the history budget.
+
+        Returns:
+            Tuple of (standalone question, whether it came from the cache).
+        """
+        if not self.turns:
+            return question, False
+
+        chat_history = "\n".join(
+            f"Human: {turn.question}\nAssistant: {turn.answer}"
+            for turn in self.history(tokenizer)
+        )
+        key = hashlib.sha256(f"{chat_history}\x00{question}".encode()).hexdigest()
+        if key in self._condensed:
+            return self._condensed[key], True
+
+        standalone = llm.predict(
+            DEFAULT_PROMPT, chat_history=chat_history, question=question
+        ).strip()
+        self._condensed[key] = standalone or question
+        return self._condensed[key], False
+
+    def reusable_nodes(
+        self, embedding: List[float], key: Hashable
+    ) -> Optional[List[NodeWithScore]]:
+        """
+        Get the chunks of an earlier turn if the question is on the same topic.
+
+        Args:
+            embedding: Embedding of the standalone question.
+            key: Search settings and data version the chunks must match.
+
+        Returns:
+            The earlier retrieved chunks, or None if they can't be reused.
+        """
+        cache = self._retrieval
+        if cache is None or cache.key != key:
+            return None
+        if _cosine(embedding, cache.embedding) < self.reuse_similarity:
+            return None
+        return list(cache.nodes)
+
+    def remember_retrieval(
+        self, embedding: List[float], key: Hashable, nodes: List[NodeWithScore]
+    ) -> None:
+        """Keep freshly retrieved chunks for reuse by follow-up questions."""
+        self._retrieval = _RetrievalCache(
+            key=key, embedding=embedding, nodes=list(nodes)
+        )
+
+    def add_turn(self, question: str, standalone_question: str, answer: str) -> None:
+        """Append a completed turn to the history."""
+        self.turns.append(ChatTurn(question, standalone_question, answer))
+
+    def reset(self) -> None:
+        """Forget every turn, condensed question and retrieval."""
+        self.turns.clear()
+        self._condensed.clear()
+        self._retrieval = None
+
+
+__all__ = ["ChatTurn", "Conversation"]
@@ -1,48 +1,61 @@
 """RAG retrieval engine implementation."""
 
 import time
+from typing import Optional
 
-import tiktoken
-from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core import Settings, get_response_synthesizer
+from llama_index.core.base.embeddings.base import mean_agg
 from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
 from llama_index.core.indices.query.query_transform import HyDEQueryTransform
 from llama_index.core.postprocessor import SimilarityPostprocessor
-from llama_index.core.query_engine import TransformQueryEngine
-from llama_index.vector_stores.chroma import ChromaVectorStore
+from llama_index.core.schema import QueryBundle
 
 from config.settings import Settings as AppSettings
 from core.helpers.pricing import estimate_embedding_cost, estimate_llm_cost
-from core.storage import get_or_create_collection
-from llm import get_llm_provider
+from core.helpers.usage import UsageRecord, check_budget, record_usage
+from core.storage import get_data_version, get_or_create_collection, search_targets
+from llm import INTERACTIVE, CachedLLM, get_llm_provider, llm_priority
 
+from .conversation import Conversation
+from .expansion import ContextExpansionPostprocessor
 from .models import ChunkInfo, RAGConfig, RAGResponse, ResponseMetrics
+from .quantized import QuantizedVectorStore
+from .sharded import ShardedRetriever
 from .transforms import apply_reranking
 
 
-def query(query_str: str, config: RAGConfig) -> RAGResponse:
+def query(
+    query_str: str, config: RAGConfig, conversation: Optional[Conversation] = None
+) -> RAGResponse:
     """Execute a RAG query against the indexed documents.
 
+    With a conversation, the question is condensed with the history into a
+    standalone question first, chunks retrieved for an earlier question on
+    the same topic are reused, and the turn is appended to the history.
+
     Args:
         query_str: User's query string
         config: RAG configuration (top_k, threshold, etc.)
+        conversation: Chat session the question belongs to (optional)
 
     Returns:
         RAGResponse with answer, source chunks, and metrics
 
     Raises:
-        ValueError: If database is empty
+        ValueError: If database is empty or the daily budget is spent
     """
     start_time = time.time()
     app_settings = AppSettings()
+    check_budget()
+
+    # Get LLM provider
+    llm_provider = get_llm_provider(app_settings.llm_provider)
 
     # Create token counter for tracking all operations
-    token_counter = TokenCountingHandler(
-        tokenizer=tiktoken.encoding_for_model(app_settings.llm_model).encode
-    )
+    tokenizer = llm_provider.get_tokenizer(app_settings.llm_model)
+    token_counter = TokenCountingHandler(tokenizer=tokenizer)
     callback_manager = CallbackManager([token_counter])
 
-    # Get LLM provider
-    llm_provider = get_llm_provider(app_settings.llm_provider)
     llm = llm_provider.get_llm()
     llm.callback_manager = callback_manager
 
@@ -58,65 +71,129 @@ def query(query_str: str, config: RAGConfig) -> RAGResponse:
     Settings.embed_model = embed_model
     Settings.callback_manager = callback_manager
 
-    # Load index
-    collection = get_or_create_collection("tech_docs")
-    count = collection.count()
-    if count == 0:
+    # Load the collections to search: the base collection plus the shards
+    # of the selected stacks (every shard when no stack is selected)
+    targets = []
+    for name, where in search_targets("tech_docs", config.stacks):
+        collection = get_or_create_collection(name)
+        if collection.count() > 0:
+            targets.append((collection, where))
+    if not targets:
+        if config.stacks:
+            raise ValueError(
+                "No hay documentos indexados para los stacks seleccionados: "
+                f"{', '.join(config.stacks)}."
+            )
         raise ValueError(
             "La base de datos está vacía. Por favor, indexa algunos documentos primero "
             "usando la pestaña de Indexación."
         )
 
-    vector_store = ChromaVectorStore(chroma_collection=collection)
-    index = VectorStoreIndex.from_vector_store(vector_store=vector_store)
-
-    # Execute query with timing
-    query_start = time.time()
-
-    # Phase 1: Create base query engine (will use Settings.llm and Settings.callback_manager)
+    retriever = ShardedRetriever(
+        targets,
+        embed_model,
+        similarity_top_k=config.top_k,
+        max_workers=app_settings.shard_search_workers,
+        vector_store_factory=(
+            QuantizedVectorStore if app_settings.retrieval_mode == "quantized" else None
+        ),
+    )
     postprocessor = SimilarityPostprocessor(
         similarity_cutoff=config.similarity_threshold
     )
-
-    base_query_engine = index.as_query_engine(
-        similarity_top_k=config.top_k,
-        node_postprocessors=[postprocessor],
+    expander = ContextExpansionPostprocessor(
+        [collection for collection, _ in targets],
+        mode=config.context_expansion,
+        window=app_settings.expansion_window,
+        max_chunks=app_settings.expansion_max_chunks,
     )
 
-    # Phase 2: Apply HyDE transformation if enabled
-    hyde_query = None
-    if config.use_hyde:
-        hyde_transform = HyDEQueryTransform(include_original=True)  # Uses Settings.llm
-
-        # Generate hypothetical document for debug visibility
-        hypothetical_doc = hyde_transform._llm.predict(
-            hyde_transform._hyde_prompt, context_str=query_str
+    # LLM API calls of this query are served before background indexing
+    with llm_priority(INTERACTIVE) as llm_usage:
+        # Phase 0: Condense a follow-up with the conversation history
+        standalone_query = query_str
+        condense_cached = False
+        condense_start = time.time()
+        if conversation is not None:
+            standalone_query, condense_cached = conversation.condense(
+                query_str, llm, tokenizer
+            )
+        condense_time = time.time() - condense_start
+
+        # Reuse the chunks of an earlier turn if the topic hasn't changed (same
+        # search settings and indexed data, similar standalone question)
+        query_bundle = QueryBundle(standalone_query)
+        reused_nodes = None
+        retrieval_key = (
+            tuple(sorted(config.stacks)),
+            config.top_k,
+            config.use_hyde,
+            app_settings.retrieval_mode,
+            get_data_version(),
         )
-        hyde_query = str(hypothetical_doc).strip()
-
-        query_engine = TransformQueryEngine(
-            query_engine=base_query_engine,
-            query_transform=hyde_transform,
+        if conversation is not None:
+            query_bundle.embedding = embed_model.get_query_embedding(standalone_query)
+            reused_nodes = conversation.reusable_nodes(
+                query_bundle.embedding, retrieval_key
+            )
+        standalone_embedding = query_bundle.embedding
+
+        # Phase 1: Apply HyDE transformation if enabled (uses Settings.llm). The
+        # hypothetical document is embedded together with the original query.
+        hyde_query = None
+        hyde_start = time.time()
+        if config.use_hyde and reused_nodes is None:
+            hyde_transform = HyDEQueryTransform(include_original=True)
+            query_bundle = hyde_transform.run(QueryBundle(standalone_query))
+            hyde_query = query_bundle.custom_embedding_strs[0].strip()
+            if standalone_embedding is not None:
+                # The query is already embedded: only embed the hypothetical
+                # document and average them, as the retriever would
+                query_bundle.embedding = mean_agg(
+                    [
+                        embed_model.get_query_embedding(
+                            query_bundle.custom_embedding_strs[0]
+                        ),
+                        standalone_embedding,
+                    ]
+                )
+        hyde_time = time.time() - hyde_start
+
+        # Phase 2: Retrieve once across all collections and filter by similarity
+        retrieval_start = time.time()
+        if reused_nodes is not None:
+            retrieved_nodes = reused_nodes
+        else:
+            retrieved_nodes = retriever.retrieve(query_bundle)
+            if conversation is not None:
+                conversation.remember_retrieval(
+                    standalone_embedding, retrieval_key, retrieved_nodes
+                )
+        chunks_retrieved = len(retrieved_nodes)
+        filtered_nodes = postprocessor.postprocess_nodes(retrieved_nodes)
+
+        # Expand the filtered chunks to their neighbours or section (small-to-big)
+        context_nodes = expander.postprocess_nodes(filtered_nodes)
+        retrieval_time = time.time() - retrieval_start
+
+        # Phase 3: Generate the answer from the expanded chunks, to the
+        # standalone question, so a follow-up keeps the context it was
+        # condensed with (HyDE only changes the embedding, not the question)
+        llm_start = time.time()
+        response = get_response_synthesizer().synthesize(
+            QueryBundle(standalone_query, embedding=query_bundle.embedding),
+            nodes=context_nodes,
         )
-    else:
-        query_engine = base_query_engine
-
-    # Phase 3: Execute query
-    response = query_engine.query(query_str)
-
-    # Phase 4: Get retrieved nodes for analysis
-    retriever = index.as_retriever(similarity_top_k=config.top_k)
-    retrieved_nodes = retriever.retrieve(query_str)
-    chunks_retrieved = len(retrieved_nodes)
-
-    # Apply same filtering to understand what was used
-    filtered_nodes = postprocessor.postprocess_nodes(retrieved_nodes)
 
-    # Phase 5: Apply reranking if enabled (for demo purposes, on filtered nodes)
-    if config.use_reranking:
-        filtered_nodes = apply_reranking(filtered_nodes, query_str, rerank_llm, top_n=5)
+        # Phase 4: Apply reranking if enabled (for demo purposes, on filtered nodes)
+        if config.use_reranking:
+            filtered_nodes = apply_reranking(
+                filtered_nodes, standalone_query, rerank_llm, top_n=5
+            )
+        llm_time = time.time() - llm_start + hyde_time + condense_time
 
-    query_end = time.time()
+    if conversation is not None:
+        conversation.add_turn(query_str, standalone_query, str(response))
 
     # Get IDs of filtered nodes to mark which were used
     filtered_ids = {node.node_id for node in filtered_nodes}
@@ -139,12 +216,6 @@ def query(query_str: str, config: RAGConfig) -> RAGResponse:
 
     # Calculate metrics
     total_time = time.time() - start_time
-    query_time = query_end - query_start
-
-    # Approximate split: ~30% retrieval, ~70% LLM (rough estimate)
-    # In reality, these happen sequentially but we can't easily separate them
-    retrieval_time = query_time * 0.3
-    llm_time = query_time * 0.7
 
     # Get real token usage from callback
     query_tokens = token_counter.total_embedding_token_count
@@ -162,12 +233,28 @@ def query(query_str: str, config: RAGConfig) -> RAGResponse:
     # Total cost
     total_cost = embedding_cost + llm_cost
 
+    # Cache hits emit no LLM events (no tokens counted); report what they saved
+    cache_hits = 0
+    cache_saved_cost = 0.0
+    for model, pricing in (
+        (llm, app_settings.llm_pricing),
+        (rerank_llm, app_settings.rerank_pricing),
+    ):
+        if isinstance(model, CachedLLM):
+            cache_hits += model.cache_stats.hits
+            cache_saved_cost += estimate_llm_cost(
+                model.cache_stats.saved_prompt_tokens,
+                model.cache_stats.saved_completion_tokens,
+                pricing,
+            )
+
     metrics = ResponseMetrics(
         retrieval_time_ms=retrieval_time * 1000,
         llm_time_ms=llm_time * 1000,
         total_time_ms=total_time * 1000,
         chunks_retrieved=chunks_retrieved,
         chunks_after_filter=len(source_chunks),
+        collections_searched=len(targets),
         debug_mode=config.debug_mode,
         use_hyde=config.use_hyde,
         use_reranking=config.use_reranking,
@@ -175,6 +262,27 @@ def query(query_str: str, config: RAGConfig) -> RAGResponse:
         llm_input_tokens=llm_input_tokens,
         llm_output_tokens=llm_output_tokens,
         estimated_cost=total_cost,
+        llm_cache_hits=cache_hits,
+        llm_cache_saved_cost=cache_saved_cost,
+        llm_queue_time_ms=llm_usage.wait_seconds * 1000,
+        llm_retries=llm_usage.retries,
+        retrieval_reused=reused_nodes is not None,
+        condense_cached=condense_cached,
+        context_chunks_added=expander.chunks_added,
+    )
+
+    record_usage(
+        UsageRecord(
+            operation="query",
+            model=llm.metadata.model_name,
+            input_tokens=llm_input_tokens,
+            output_tokens=llm_output_tokens,
+            embedding_tokens=query_tokens,
+            cost=total_cost,
+            latency_ms=metrics.total_time_ms,
+            cache_hits=cache_hits,
+            query=query_str,
+        )
     )
 
     # Build RAG response
@@ -184,6 +292,7 @@ def query(query_str: str, config: RAGConfig) -> RAGResponse:
         all_chunks=all_chunks,
         metrics=metrics,
         hyde_query=hyde_query,
+        standalone_query=standalone_query if standalone_query != query_str else None,
     )
 
     return rag_response
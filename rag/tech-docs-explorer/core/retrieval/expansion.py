@@ -0,0 +1,225 @@
+"""Small-to-big expansion of retrieved chunks before synthesis.
+
+Retrieval searches small, precise chunks; this postprocessor then replaces
+each chunk that passed the filters with the text around it, read from
+ChromaDB by the links recorded at indexing time (core/indexing/neighbours.py):
+- "neighbours": the previous and next chunks of the same document, up to a
+  window on each side
+- "parent": the whole section (Markdown heading or PDF page), falling back
+  to the neighbours window when the section doesn't fit the chunk budget
+
+Nothing is embedded or scored again, so a lower top_k gives the LLM the
+same context with fewer vector hits to filter and rerank.
+"""
+
+from typing import Dict, List, Optional, Sequence, Set
+
+from chromadb.api.models.Collection import Collection
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+
+from core.indexing import NEXT_CHUNK_KEY, PARENT_KEY, PREV_CHUNK_KEY
+
+
+EXPANSION_MODES = ("none", "neighbours", "parent")
+# Start of a chunk searched for in the previous one to drop the splitter overlap
+_OVERLAP_PROBE_CHARS = 32
+
+
+def _merge_texts(left: str, right: str) -> str:
+    """Join consecutive chunks, dropping the text they overlap on."""
+    probe = right[:_OVERLAP_PROBE_CHARS]
+    if len(probe) == _OVERLAP_PROBE_CHARS:
+        start = left.find(probe)
+        while start != -1:
+            if right.startswith(left[start:]):
+                return left + right[len(left) - start :]
+            start = left.find(probe, start + 1)
+    return f"{left}\n\n{right}"
+
+
+class ContextExpansionPostprocessor(BaseNodePostprocessor):
+    """Expand retrieved chunks to their neighbours or parent section.
+
+    Chunks are expanded best score first. Every chunk that passed the filters
+    is kept; max_chunks caps how many chunks the expanded context may hold in
+    total, so the neighbours of low-scoring chunks are the first to go. A
+    chunk already included in the context of a better one is not repeated.
+    Chunks indexed without links are passed through unchanged.
+
+    Example:
+        >>> expander = ContextExpansionPostprocessor(
+        ...     [collection], mode="neighbours", window=1, max_chunks=10
+        ... )
+        >>> context_nodes = expander.postprocess_nodes(filtered_nodes)
+        >>> expander.chunks_added
+        4
+    """
+
+    mode: str = Field(
+        default="neighbours", description="Expansion mode: none, neighbours or parent."
+    )
+    window: int = Field(
+        default=1, ge=0, description="Neighbour chunks added on each side."
+    )
+    max_chunks: int = Field(
+        default=10, ge=1, description="Maximum chunks in the expanded context."
+    )
+
+    _collections: List[Collection] = PrivateAttr()
+    _chunks_added: int = PrivateAttr(default=0)
+
+    def __init__(self, collections: Sequence[Collection], **kwargs):
+        """
+        Initialize the postprocessor.
+
+        Args:
+            collections: Collections the chunks were retrieved from; their
+                neighbours are stored in the same collections.
+            **kwargs: mode, window and max_chunks.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        super().__init__(**kwargs)
+        if self.mode not in EXPANSION_MODES:
+            raise ValueError(
+                f"Unknown context expansion mode: '{self.mode}'. "
+                f"Available modes: {EXPANSION_MODES}"
+            )
+        self._collections = list(collections)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextExpansionPostprocessor"
+
+    @property
+    def chunks_added(self) -> int:
+        """Neighbour or section chunks added by the last call."""
+        return self._chunks_added
+
+    def _fetch(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict] = None
+    ) -> Dict[str, BaseNode]:
+        """Read chunks by ID or metadata filter from every collection."""
+        nodes: Dict[str, BaseNode] = {}
+        for collection in self._collections:
+            result = collection.get(
+                ids=ids, where=where, include=["documents", "metadatas"]
+            )
+            for node_id, text, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            ):
+                nodes[node_id] = metadata_dict_to_node(metadata, text=text)
+        return nodes
+
+    def _window(self, node: BaseNode, budget: int, covered: Set[str]) -> List[BaseNode]:
+        """Get a chunk with up to window neighbours on each side, in order.
+
+        Stops at the document edges, at chunks already in the context and
+        when budget extra chunks have been added.
+        """
+        before: List[BaseNode] = []
+        after: List[BaseNode] = []
+        prev_id = node.metadata.get(PREV_CHUNK_KEY, "")
+        next_id = node.metadata.get(NEXT_CHUNK_KEY, "")
+        for _ in range(self.window):
+            wanted = [i for i in (prev_id, next_id) if i and i not in covered]
+            if not wanted or len(before) + len(after) >= budget:
+                break
+            fetched = self._fetch(ids=wanted)
+
+            prev_node = fetched.get(prev_id) if prev_id not in covered else None
+            if prev_node is not None and len(before) + len(after) < budget:
+                before.insert(0, prev_node)
+                prev_id = prev_node.metadata.get(PREV_CHUNK_KEY, "")
+            else:
+                prev_id = ""
+
+            next_node = fetched.get(next_id) if next_id not in covered else None
+            if next_node is not None and len(before) + len(after) < budget:
+                after.append(next_node)
+                next_id = next_node.metadata.get(NEXT_CHUNK_KEY, "")
+            else:
+                next_id = ""
+        return [*before, node, *after]
+
+    def _section(self, node: BaseNode, covered: Set[str]) -> Optional[List[BaseNode]]:
+        """Get the chunks of a chunk's parent section in document order.
+
+        Returns:
+            The section chunks not yet in the context (always including the
+            chunk itself), or None if the chunk has no parent section.
+        """
+        parent_id = node.metadata.get(PARENT_KEY, "")
+        if not parent_id:
+            return None
+        members = self._fetch(where={PARENT_KEY: parent_id})
+        members[node.node_id] = node
+
+        # Walk the next links from the chunk whose previous one is outside
+        ordered: List[BaseNode] = []
+        seen: Set[str] = set()
+        current = next(
+            (
+                m
+                for m in members.values()
+                if m.metadata.get(PREV_CHUNK_KEY, "") not in members
+            ),
+            None,
+        )
+        while current is not None and current.node_id not in seen:
+            ordered.append(current)
+            seen.add(current.node_id)
+            current = members.get(current.metadata.get(NEXT_CHUNK_KEY, ""))
+        ordered.extend(m for node_id, m in members.items() if node_id not in seen)
+        return [
+            m for m in ordered if m.node_id == node.node_id or m.node_id not in covered
+        ]
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        """Replace each chunk with its expanded context, best score first."""
+        self._chunks_added = 0
+        if self.mode == "none" or not nodes:
+            return nodes
+
+        budget = max(0, self.max_chunks - len(nodes))
+        covered: Set[str] = set()
+        expanded: List[NodeWithScore] = []
+        for node_with_score in sorted(
+            nodes, key=lambda n: n.score or 0.0, reverse=True
+        ):
+            node = node_with_score.node
+            if node.node_id in covered:
+                continue
+
+            span = None
+            if self.mode == "parent":
+                section = self._section(node, covered)
+                if section is not None and len(section) - 1 <= budget:
+                    span = section
+            if span is None:
+                span = self._window(node, budget, covered)
+
+            budget -= len(span) - 1
+            self._chunks_added += len(span) - 1
+            covered.update(member.node_id for member in span)
+
+            text = span[0].get_content()
+            for member in span[1:]:
+                text = _merge_texts(text, member.get_content())
+            context_node = node.model_copy()
+            context_node.set_content(text)
+            expanded.append(
+                NodeWithScore(node=context_node, score=node_with_score.score)
+            )
+        return expanded
+
+
+__all__ = ["EXPANSION_MODES", "ContextExpansionPostprocessor"]
@@ -14,6 +14,9 @@ class RAGConfig:
         use_hyde: Enable HyDE (Hypothetical Document Embeddings) query transformation
         use_reranking: Enable LLM-based reranking of retrieved chunks
         debug_mode: Enable debug information in response
+        stacks: Stacks to search (empty = all stacks)
+        context_expansion: Context sent to the LLM for each retrieved chunk:
+            "neighbours", "parent" or "none"
     """
 
     similarity_threshold: float = 0.45
@@ -21,6 +24,8 @@ class RAGConfig:
     use_hyde: bool = False
     use_reranking: bool = False
     debug_mode: bool = False
+    stacks: list[str] = field(default_factory=list)
+    context_expansion: str = "neighbours"
 
 
 @dataclass
@@ -50,6 +55,7 @@ class ResponseMetrics:
         total_time_ms: Total query execution time (milliseconds)
         chunks_retrieved: Number of chunks retrieved before filtering
         chunks_after_filter: Number of chunks after similarity filtering
+        collections_searched: Number of collections (stack shards) searched
         debug_mode: Whether debug mode was enabled for this query
         use_hyde: Whether HyDE was enabled for this query
         use_reranking: Whether reranking was enabled for this query
@@ -57,6 +63,13 @@ class ResponseMetrics:
         llm_input_tokens: Tokens in LLM input (estimated)
         llm_output_tokens: Tokens in LLM output (estimated)
         estimated_cost: Estimated total cost in USD
+        llm_cache_hits: LLM calls served from the completion cache
+        llm_cache_saved_cost: Estimated cost in USD avoided by cache hits
+        llm_queue_time_ms: Time LLM API calls waited in the rate limiter
+        llm_retries: LLM API calls retried after a 429/5xx or connection error
+        retrieval_reused: Whether the chunks of an earlier turn were reused
+        condense_cached: Whether the standalone question came from the cache
+        context_chunks_added: Neighbour or section chunks added to the context
     """
 
     retrieval_time_ms: float
@@ -64,6 +77,7 @@ class ResponseMetrics:
     total_time_ms: float
     chunks_retrieved: int
     chunks_after_filter: int
+    collections_searched: int = 1
     debug_mode: bool = False
     use_hyde: bool = False
     use_reranking: bool = False
@@ -71,6 +85,13 @@ class ResponseMetrics:
     llm_input_tokens: int = 0
     llm_output_tokens: int = 0
     estimated_cost: float = 0.0
+    llm_cache_hits: int = 0
+    llm_cache_saved_cost: float = 0.0
+    llm_queue_time_ms: float = 0.0
+    llm_retries: int = 0
+    retrieval_reused: bool = False
+    condense_cached: bool = False
+    context_chunks_added: int = 0
 
 
 @dataclass
@@ -83,6 +104,8 @@ class RAGResponse:
         all_chunks: List of all retrieved chunks with used flag
         metrics: Performance metrics for the query
         hyde_query: Transformed query if HyDE was used
+        standalone_query: Follow-up rewritten with the conversation history
+            (None if the question was used as asked)
     """
 
     answer: str
@@ -90,3 +113,4 @@ class RAGResponse:
     all_chunks: list[ChunkInfo]
     metrics: ResponseMetrics
     hyde_query: Optional[str] = None
+    standalone_query: Optional[str] = None
@@ -0,0 +1,96 @@
+"""Vector store adapter for two-stage quantized search."""
+
+from typing import Any, Dict, List, Optional
+
+from chromadb.api.models.Collection import Collection
+from llama_index.core.vector_stores.types import (
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from config import get_settings
+from core.storage import load_quantized_index
+
+
+def _stack_filter(where: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """Get the stacks of a {"stack": {"$in": [...]}} filter (None = no filter).
+
+    Raises:
+        ValueError: If the filter is on anything other than the stack
+    """
+    if not where:
+        return None
+    try:
+        return list(where["stack"]["$in"])
+    except (KeyError, TypeError):
+        raise ValueError(f"Quantized search only supports stack filters, got {where}")
+
+
+class QuantizedVectorStore:
+    """Query a collection through its quantized index.
+
+    Candidates are found on the 1-bit or int8 codes, the best top_k *
+    rescore_factor are rescored with the float32 vectors, and only the
+    final top_k chunks are read from ChromaDB. Drop-in for
+    ChromaVectorStore.query() in ShardedRetriever; until the collection's
+    first quantized index is built, queries go to its HNSW index.
+
+    Example:
+        >>> store = QuantizedVectorStore(collection)
+        >>> store.query(VectorStoreQuery(query_embedding=embedding, similarity_top_k=5))
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        bits: Optional[int] = None,
+        rescore_factor: Optional[int] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            collection: ChromaDB collection to search.
+            bits: 1 or 8. Default is rag.quantization.bits from config.yaml.
+            rescore_factor: Candidates rescored per requested chunk. Default
+                is rag.quantization.rescore_factor from config.yaml.
+        """
+        settings = get_settings()
+        self._collection = collection
+        self._bits = bits or settings.quantization_bits
+        self._rescore_factor = rescore_factor or settings.quantization_rescore_factor
+        self._chroma_store = ChromaVectorStore(chroma_collection=collection)
+
+    def query(
+        self,
+        query: VectorStoreQuery,
+        where: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> VectorStoreQueryResult:
+        """Run a quantized search and return the top-k nodes with their scores."""
+        index = load_quantized_index(self._collection, self._bits)
+        if index is None:
+            # The first index is being built in the background: use HNSW meanwhile
+            return self._chroma_store.query(query, where=where, **kwargs)
+        hits = index.search(
+            query.query_embedding,
+            top_k=query.similarity_top_k,
+            rescore_k=query.similarity_top_k * self._rescore_factor,
+            stacks=_stack_filter(where),
+        )
+        if not hits:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        ids = [node_id for node_id, _ in hits]
+        nodes = {node.node_id: node for node in self._chroma_store.get_nodes(ids)}
+        # Chunks deleted since the index was built are skipped
+        found = [(node_id, score) for node_id, score in hits if node_id in nodes]
+        return VectorStoreQueryResult(
+            nodes=[nodes[node_id] for node_id, _ in found],
+            similarities=[score for _, score in found],
+            ids=[node_id for node_id, _ in found],
+        )
+
+
+__all__ = ["QuantizedVectorStore"]
@@ -0,0 +1,115 @@
+"""Fan-out retrieval over per-stack collection shards."""
+
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from chromadb.api.models.Collection import Collection
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+
+class ShardedRetriever(BaseRetriever):
+    """Retrieve the top-k chunks across several collections.
+
+    The query is embedded once and every collection is searched in parallel
+    with the same embedding; the per-collection results are merged by score.
+    All collections must use the same distance space so scores are
+    comparable. With a single collection no thread is started.
+
+    Example:
+        >>> retriever = ShardedRetriever(
+        ...     [(collection, None)], embed_model, similarity_top_k=5
+        ... )
+        >>> nodes = retriever.retrieve("How do I configure an ingress?")
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[Tuple[Collection, Optional[Dict[str, Any]]]],
+        embed_model: BaseEmbedding,
+        similarity_top_k: int = 5,
+        max_workers: int = 8,
+        vector_store_factory: Optional[Callable[[Collection], Any]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the retriever.
+
+        Args:
+            targets: (collection, where filter) pairs to search.
+            embed_model: Model used to embed the query.
+            similarity_top_k: Number of chunks to return after merging.
+            max_workers: Maximum number of collections searched concurrently.
+            vector_store_factory: Builds the store that searches a collection
+                (e.g. QuantizedVectorStore). Default is ChromaVectorStore.
+        """
+        factory = vector_store_factory or (
+            lambda collection: ChromaVectorStore(chroma_collection=collection)
+        )
+        self._vector_stores = [
+            (collection.name, factory(collection), where)
+            for collection, where in targets
+        ]
+        self._embed_model = embed_model
+        self._similarity_top_k = similarity_top_k
+        self._max_workers = max(1, max_workers)
+        # Seconds spent searching each collection in the last retrieval
+        self.shard_times: Dict[str, float] = {}
+        super().__init__(**kwargs)
+
+    def _search(
+        self,
+        name: str,
+        vector_store: Any,
+        where: Optional[Dict[str, Any]],
+        embedding: List[float],
+    ) -> Tuple[str, float, List[NodeWithScore]]:
+        """Search one collection and return its name, duration and scored nodes."""
+        start = time.perf_counter()
+        result = vector_store.query(
+            VectorStoreQuery(
+                query_embedding=embedding, similarity_top_k=self._similarity_top_k
+            ),
+            where=where,
+        )
+        nodes = [
+            NodeWithScore(node=node, score=score)
+            for node, score in zip(result.nodes or [], result.similarities or [])
+        ]
+        return name, time.perf_counter() - start, nodes
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """Embed the query once, search every collection and merge the top-k."""
+        embedding = query_bundle.embedding
+        if embedding is None:
+            # Same as VectorIndexRetriever (HyDE adds hypothetical documents)
+            embedding = self._embed_model.get_agg_embedding_from_queries(
+                query_bundle.embedding_strs
+            )
+
+        if len(self._vector_stores) == 1:
+            results = [self._search(*self._vector_stores[0], embedding)]
+        else:
+            workers = min(self._max_workers, len(self._vector_stores))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        lambda target: self._search(*target, embedding),
+                        self._vector_stores,
+                    )
+                )
+
+        self.shard_times = {name: seconds for name, seconds, _ in results}
+        return heapq.nlargest(
+            self._similarity_top_k,
+            (node for _, _, nodes in results for node in nodes),
+            key=lambda node: node.score or 0.0,
+        )
+
+
+__all__ = ["ShardedRetriever"]
@@ -1,19 +1,105 @@
 """ChromaDB storage management.
 
 This module provides functions to interact with ChromaDB for vector storage and retrieval:
-- Client management (get_chroma_client, invalidate_client)
-- Collection operations (get_or_create_collection, clear_database, get_collection_stats)
+- Client management (get_chroma_client, invalidate_client, get_client_metrics)
+- Collection operations (get_or_create_collection, clear_database,
+  drop_retired_collections, get_collection_stats)
+- Blue-green rebuilds (blue_green_rebuild, rebuild_stacks, garbage_collect_versions,
+  resolve_collection, index_settings)
+- Per-stack shards (route_by_stack, search_targets, collection_names)
+- Document catalog (list_documents, get_document, record_chunks, remove_document,
+  document_name, document_filter, get_data_version, get_collection_version,
+  record_signatures, find_signatures)
+- Snapshots (export_snapshot, import_snapshot, read_manifest)
+- HNSW index configuration and tuning (get_hnsw_config, hnsw_metadata, tune_hnsw)
+- Quantized indexes for two-stage search (QuantizedIndex, load_quantized_index,
+  refresh_quantized_index, drop_quantized_index)
 """
 
-from .client import get_chroma_client, invalidate_client
-from .collections import clear_database, get_collection_stats, get_or_create_collection
+from .catalog import (
+    bump_data_version,
+    copy_signatures,
+    document_filter,
+    document_name,
+    document_name_field,
+    drop_catalog,
+    find_signatures,
+    get_collection_version,
+    get_data_version,
+    get_document,
+    list_documents,
+    record_chunks,
+    record_signatures,
+    remove_document,
+)
+from .client import get_chroma_client, get_client_metrics, invalidate_client
+from .collections import (
+    blue_green_rebuild,
+    clear_database,
+    drop_retired_collections,
+    garbage_collect_versions,
+    get_collection_stats,
+    get_or_create_collection,
+    index_settings,
+    rebuild_stacks,
+)
+from .hnsw import get_hnsw_config, hnsw_metadata, tune_hnsw
+from .quantized import (
+    QuantizedIndex,
+    drop_quantized_index,
+    load_quantized_index,
+    refresh_quantized_index,
+)
+from .registry import resolve_collection
+from .shards import collection_names, route_by_stack, search_targets
+from .snapshot import export_snapshot, import_snapshot, read_manifest
 
 __all__ = [
     # Client
     "get_chroma_client",
     "invalidate_client",
+    "get_client_metrics",
     # Collections
     "get_or_create_collection",
     "clear_database",
+    "drop_retired_collections",
     "get_collection_stats",
+    # Blue-green rebuilds
+    "blue_green_rebuild",
+    "rebuild_stacks",
+    "garbage_collect_versions",
+    "resolve_collection",
+    "index_settings",
+    # Shards
+    "route_by_stack",
+    "search_targets",
+    "collection_names",
+    # Document catalog
+    "document_name",
+    "document_name_field",
+    "document_filter",
+    "record_chunks",
+    "remove_document",
+    "list_documents",
+    "get_document",
+    "drop_catalog",
+    "get_data_version",
+    "get_collection_version",
+    "record_signatures",
+    "find_signatures",
+    "copy_signatures",
+    "bump_data_version",
+    # Snapshots
+    "export_snapshot",
+    "import_snapshot",
+    "read_manifest",
+    # HNSW
+    "get_hnsw_config",
+    "hnsw_metadata",
+    "tune_hnsw",
+    # Quantized search
+    "QuantizedIndex",
+    "load_quantized_index",
+    "refresh_quantized_index",
+    "drop_quantized_index",
 ]
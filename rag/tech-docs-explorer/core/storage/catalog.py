@@ -0,0 +1,653 @@
+"""Document catalog.
+
+This module keeps one row per indexed document (name, type, stack,
+indexed_at and chunk count) in a SQLite database next to the ChromaDB data,
+so listing documents doesn't require reading the metadata of every chunk:
+- Recording chunks as they are indexed
+- Removing documents and whole collections
+- Listing the documents of a collection
+- Keeping the MinHash signatures of indexed chunks, so near-duplicates are
+  detected across indexing runs and not only within one
+
+Rows are keyed by the physical collection name, so each blue-green version
+has its own catalog. Collections indexed before the catalog existed are
+backfilled from their chunk metadata the first time they are accessed.
+
+A data version counter is bumped in the same transaction as every change
+(indexing, deleting, clearing, alias swaps), so readers can cache documents
+and chunks keyed on get_data_version() and never serve stale data. Each
+physical collection also has its own version, bumped only when its chunks
+change, for caches of a single collection (get_collection_version()).
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from chromadb.api.models.Collection import Collection
+
+from config import get_settings
+
+
+_CATALOG_FILENAME = "document_catalog.sqlite3"
+# Chunks read per request when backfilling from an existing collection
+_BACKFILL_PAGE_SIZE = 5000
+# Serializes writes within this process
+_catalog_lock = threading.Lock()
+# Databases whose schema is known to be current in this process
+_schema_ready: Set[Path] = set()
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    name TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    stack TEXT NOT NULL,
+    indexed_at TEXT NOT NULL,
+    num_chunks INTEGER NOT NULL,
+    name_field TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (collection, name)
+);
+CREATE INDEX IF NOT EXISTS documents_by_date ON documents (collection, indexed_at);
+CREATE TABLE IF NOT EXISTS collections (
+    collection TEXT PRIMARY KEY,
+    backfilled_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS collection_versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunk_signatures (
+    collection TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    document TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+);
+CREATE INDEX IF NOT EXISTS signatures_by_document
+    ON chunk_signatures (collection, document);
+CREATE TABLE IF NOT EXISTS signature_buckets (
+    collection TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    bucket BLOB NOT NULL,
+    chunk_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_by_key
+    ON signature_buckets (collection, scheme, bucket);
+CREATE INDEX IF NOT EXISTS buckets_by_chunk ON signature_buckets (collection, chunk_id);
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO data_version (id, version) VALUES (0, 0);
+"""
+# Metadata fields a document can be named by, in order of precedence
+_NAME_FIELDS = ("original_filename", "filename", "source_url")
+# Bucket keys looked up per query (below SQLite's limit on bound parameters)
+_BUCKET_QUERY_SIZE = 500
+
+
+def _catalog_path() -> Path:
+    """Get the path of the catalog database inside the ChromaDB directory."""
+    return get_settings().get_chroma_path() / _CATALOG_FILENAME
+
+
+@contextmanager
+def _connect() -> Generator[sqlite3.Connection, None, None]:
+    """Open the catalog database, committing on success and rolling back on error.
+
+    The schema is created (and migrated) on the first connection of the
+    process. Connections that only run SELECTs never take the write lock,
+    and in WAL mode they are not blocked by a write in progress.
+    """
+    path = _catalog_path()
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        if path not in _schema_ready:
+            with _schema_lock:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                _migrate(conn)
+                conn.commit()
+                _schema_ready.add(path)
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _connect_read_only() -> Generator[sqlite3.Connection, None, None]:
+    """Open the catalog database read-only (creating it first if needed)."""
+    path = _catalog_path()
+    if path not in _schema_ready:
+        with _connect():
+            pass
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, timeout=30)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns missing from catalogs created by older versions."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+    if "name_field" not in columns:
+        conn.execute(
+            "ALTER TABLE documents ADD COLUMN name_field TEXT NOT NULL DEFAULT ''"
+        )
+        # Rebuild every catalog from its chunks to fill the new column
+        conn.execute("DELETE FROM collections")
+        print("[CATALOG] Catalog schema upgraded, documents will be re-read")
+
+
+def _bump_version(
+    conn: sqlite3.Connection, collection_name: Optional[str] = None
+) -> None:
+    """Increment the data version (committed with the change that caused it).
+
+    Args:
+        conn: Connection of the transaction making the change.
+        collection_name: Physical collection whose chunks changed, to also
+            increment its own version.
+    """
+    conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 0")
+    if collection_name is not None:
+        conn.execute(
+            """
+            INSERT INTO collection_versions (collection, version) VALUES (?, 1)
+            ON CONFLICT (collection) DO UPDATE SET version = version + 1
+            """,
+            (collection_name,),
+        )
+
+
+def get_data_version() -> int:
+    """Get the data version, incremented on every change to the indexed data.
+
+    Read over a read-only connection, so it is cheap enough to key caches
+    on and never waits for an indexing run to commit.
+
+    Returns:
+        Counter shared by every process using this ChromaDB directory.
+
+    Examples:
+        >>> version = get_data_version()
+        >>> index_documents(documents, metadata)
+        >>> get_data_version() > version
+        True
+    """
+    with _connect_read_only() as conn:
+        return conn.execute("SELECT version FROM data_version WHERE id = 0").fetchone()[
+            0
+        ]
+
+
+def get_collection_version(collection_name: str) -> int:
+    """Get the version of one physical collection, incremented when its chunks change.
+
+    Unlike get_data_version(), writes to other collections and alias swaps
+    leave it unchanged, so caches of a single collection (e.g. its quantized
+    index) are only invalidated by changes to that collection.
+
+    Args:
+        collection_name: Physical collection name.
+
+    Returns:
+        Counter shared by every process (0 if the collection never changed).
+    """
+    with _connect_read_only() as conn:
+        row = conn.execute(
+            "SELECT version FROM collection_versions WHERE collection = ?",
+            (collection_name,),
+        ).fetchone()
+    return row[0] if row else 0
+
+
+def bump_data_version() -> None:
+    """Mark the indexed data as changed (for changes outside the catalog)."""
+    with _catalog_lock, _connect() as conn:
+        _bump_version(conn)
+
+
+def document_name_field(metadata: Dict[str, Any]) -> str:
+    """Get the metadata field a chunk's document name is read from.
+
+    Returns:
+        original_filename, filename or source_url, whichever is the first
+        one set, or "" if none is.
+    """
+    return next((field for field in _NAME_FIELDS if metadata.get(field)), "")
+
+
+def document_name(metadata: Dict[str, Any]) -> str:
+    """Get the document a chunk belongs to from its metadata.
+
+    Uses original_filename, then filename, then source_url, the same
+    precedence the explorer has always used to group chunks.
+    """
+    field = document_name_field(metadata)
+    return metadata[field] if field else "Unknown"
+
+
+def document_filter(name: str, field: str) -> Dict[str, Any]:
+    """Build a ChromaDB where filter matching the chunks of a document.
+
+    Only the field the name was resolved from is matched, so a document
+    named after the filename of another one doesn't pick up its chunks.
+
+    Args:
+        name: Document name.
+        field: Field the name comes from (name_field of its catalog row).
+
+    Returns:
+        Where clause usable with collection.get() and collection.delete().
+
+    Raises:
+        ValueError: If the field is not a document name field.
+    """
+    if field not in _NAME_FIELDS:
+        raise ValueError(
+            f"Unknown document name field: '{field}'. Available fields: {_NAME_FIELDS}"
+        )
+    return {field: name}
+
+
+def _aggregate(metadatas: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Group chunk metadata into one catalog row per document."""
+    documents: Dict[str, Dict[str, Any]] = {}
+    for metadata in metadatas:
+        name = document_name(metadata)
+        row = documents.get(name)
+        if row is None:
+            documents[name] = {
+                "name": name,
+                "doc_type": metadata.get("source_type", "unknown"),
+                "stack": metadata.get("stack", ""),
+                "indexed_at": str(metadata.get("indexed_at", "")),
+                "num_chunks": 1,
+                "name_field": document_name_field(metadata),
+            }
+        else:
+            row["num_chunks"] += 1
+            row["indexed_at"] = max(
+                row["indexed_at"], str(metadata.get("indexed_at", ""))
+            )
+    return documents
+
+
+def _upsert(
+    conn: sqlite3.Connection,
+    collection_name: str,
+    rows: Dict[str, Dict[str, Any]],
+    replace: bool = False,
+) -> None:
+    """Insert documents, or replace or add to the chunks of existing ones."""
+    num_chunks = (
+        "excluded.num_chunks" if replace else "num_chunks + excluded.num_chunks"
+    )
+    conn.executemany(
+        f"""
+        INSERT INTO documents
+            (collection, name, doc_type, stack, indexed_at, num_chunks, name_field)
+        VALUES
+            (:collection, :name, :doc_type, :stack, :indexed_at, :num_chunks, :name_field)
+        ON CONFLICT (collection, name) DO UPDATE SET
+            name_field = excluded.name_field,
+            doc_type = excluded.doc_type,
+            stack = excluded.stack,
+            indexed_at = MAX(indexed_at, excluded.indexed_at),
+            num_chunks = {num_chunks}
+        """,
+        [{"collection": collection_name, **row} for row in rows.values()],
+    )
+
+
+def _ensure_backfilled(collection: Collection) -> bool:
+    """Build the catalog of a collection from its chunks if it was never built.
+
+    The chunks are read before the write transaction opens, so a backfill of
+    a large collection doesn't block other readers or writers.
+
+    Returns:
+        True if the collection was backfilled now (its current chunks are
+        already counted), False if it was already in the catalog.
+    """
+    query = "SELECT 1 FROM collections WHERE collection = ?"
+    with _connect() as conn:
+        if conn.execute(query, (collection.name,)).fetchone():
+            return False
+
+    metadatas: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = collection.get(
+            include=["metadatas"], limit=_BACKFILL_PAGE_SIZE, offset=offset
+        )
+        metadatas.extend(page["metadatas"] or [])
+        if len(page["ids"]) < _BACKFILL_PAGE_SIZE:
+            break
+        offset += _BACKFILL_PAGE_SIZE
+
+    with _catalog_lock, _connect() as conn:
+        if conn.execute(query, (collection.name,)).fetchone():
+            return False  # Another process backfilled it meanwhile
+        _bump_version(conn, collection.name)
+        conn.execute("DELETE FROM documents WHERE collection = ?", (collection.name,))
+        _upsert(conn, collection.name, _aggregate(metadatas))
+        conn.execute(
+            "INSERT INTO collections (collection, backfilled_at) "
+            "VALUES (?, datetime('now'))",
+            (collection.name,),
+        )
+    if metadatas:
+        print(f"[CATALOG] Backfilled '{collection.name}' from {len(metadatas)} chunks")
+    return True
+
+
+def record_chunks(
+    collection: Collection,
+    metadatas: Sequence[Dict[str, Any]],
+    replace: bool = False,
+) -> None:
+    """Add written chunks to the catalog of a collection.
+
+    Call after the chunks have been written to the collection.
+
+    Args:
+        collection: Collection the chunks were written to.
+        metadatas: Metadata of each written chunk.
+        replace: The chunks are all the chunks of their documents, so their
+            counts replace the catalog rows. False adds them to the rows
+            (for documents written a page at a time).
+    """
+    if _ensure_backfilled(collection):
+        return  # The backfill already counted the new chunks
+    with _catalog_lock, _connect() as conn:
+        _bump_version(conn, collection.name)
+        _upsert(conn, collection.name, _aggregate(metadatas), replace=replace)
+
+
+def remove_document(collection: Collection, name: str) -> None:
+    """Remove a document from the catalog of a collection.
+
+    Call after its chunks have been deleted from the collection.
+
+    Args:
+        collection: Collection the document was deleted from.
+        name: Document name (original_filename, filename or source_url).
+    """
+    if _ensure_backfilled(collection):
+        with _catalog_lock, _connect() as conn:
+            _delete_signatures(conn, collection.name, [name])
+        return
+    with _catalog_lock, _connect() as conn:
+        _bump_version(conn, collection.name)
+        conn.execute(
+            "DELETE FROM documents WHERE collection = ? AND name = ?",
+            (collection.name, name),
+        )
+        _delete_signatures(conn, collection.name, [name])
+
+
+def list_documents(collection: Collection) -> List[Dict[str, Any]]:
+    """List the documents of a collection, most recently indexed first.
+
+    Args:
+        collection: Collection to list.
+
+    Returns:
+        List of dicts with name, doc_type, stack, indexed_at, num_chunks and
+        name_field (the metadata field the name comes from).
+
+    Examples:
+        >>> for doc in list_documents(get_or_create_collection("tech_docs")):
+        ...     print(doc["name"], doc["num_chunks"])
+    """
+    _ensure_backfilled(collection)
+    with _connect() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT name, doc_type, stack, indexed_at, num_chunks, name_field
+            FROM documents WHERE collection = ? ORDER BY indexed_at DESC
+            """,
+            (collection.name,),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_document(collection: Collection, name: str) -> Optional[Dict[str, Any]]:
+    """Get the catalog row of one document of a collection.
+
+    Args:
+        collection: Collection to look in.
+        name: Document name.
+
+    Returns:
+        Dict like the ones from list_documents(), or None if the document
+        is not in the collection.
+    """
+    _ensure_backfilled(collection)
+    with _connect() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            """
+            SELECT name, doc_type, stack, indexed_at, num_chunks, name_field
+            FROM documents WHERE collection = ? AND name = ?
+            """,
+            (collection.name, name),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def _delete_signatures(
+    conn: sqlite3.Connection, collection_name: str, documents: Iterable[str]
+) -> None:
+    """Forget the chunk signatures of some documents of a collection."""
+    for document in documents:
+        conn.execute(
+            """
+            DELETE FROM signature_buckets WHERE collection = ? AND chunk_id IN (
+                SELECT chunk_id FROM chunk_signatures
+                WHERE collection = ? AND document = ?
+            )
+            """,
+            (collection_name, collection_name, document),
+        )
+        conn.execute(
+            "DELETE FROM chunk_signatures WHERE collection = ? AND document = ?",
+            (collection_name, document),
+        )
+
+
+def record_signatures(
+    collection_name: str,
+    scheme: str,
+    signatures: Sequence[Tuple[str, str, bytes, Sequence[bytes]]],
+) -> None:
+    """Store the near-duplicate signatures of the chunks written to a collection.
+
+    The signatures replace every stored signature of the same documents, so
+    chunks a re-indexed document no longer produces are forgotten with it.
+
+    Args:
+        collection_name: Physical collection the chunks were written to.
+        scheme: Identifier of the signature parameters; only signatures of
+            the same scheme are compared.
+        signatures: (chunk id, document name, signature, LSH bucket keys)
+            of each chunk.
+    """
+    with _catalog_lock, _connect() as conn:
+        _delete_signatures(conn, collection_name, {row[1] for row in signatures})
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO chunk_signatures
+                (collection, chunk_id, document, scheme, signature)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (collection_name, chunk_id, document, scheme, signature)
+                for chunk_id, document, signature, _ in signatures
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT INTO signature_buckets (collection, scheme, bucket, chunk_id)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (collection_name, scheme, bucket, chunk_id)
+                for chunk_id, _, _, buckets in signatures
+                for bucket in buckets
+            ],
+        )
+
+
+def find_signatures(
+    collection_name: str,
+    scheme: str,
+    buckets: Iterable[bytes],
+    exclude_documents: Iterable[str] = (),
+) -> Dict[str, bytes]:
+    """Get the stored signatures of the chunks sharing an LSH bucket.
+
+    Args:
+        collection_name: Physical collection to look in.
+        scheme: Signature scheme of the buckets.
+        buckets: LSH bucket keys of the chunks being indexed.
+        exclude_documents: Documents whose stored chunks are left out (the
+            ones being re-indexed, which must not match their old chunks).
+
+    Returns:
+        Dictionary of {chunk id: signature}.
+    """
+    buckets = list(set(buckets))
+    excluded = set(exclude_documents)
+    found: Dict[str, bytes] = {}
+    with _connect_read_only() as conn:
+        for start in range(0, len(buckets), _BUCKET_QUERY_SIZE):
+            batch = buckets[start : start + _BUCKET_QUERY_SIZE]
+            rows = conn.execute(
+                f"""
+                SELECT DISTINCT s.chunk_id, s.document, s.signature
+                FROM signature_buckets b JOIN chunk_signatures s
+                    ON s.collection = b.collection AND s.chunk_id = b.chunk_id
+                WHERE b.collection = ? AND b.scheme = ?
+                    AND b.bucket IN ({", ".join("?" * len(batch))})
+                """,
+                (collection_name, scheme, *batch),
+            )
+            found.update(
+                (chunk_id, signature)
+                for chunk_id, document, signature in rows
+                if document not in excluded
+            )
+    return found
+
+
+def copy_signatures(
+    source_name: str, target_name: str, exclude_documents: Iterable[str] = ()
+) -> None:
+    """Copy the stored signatures of a collection's documents to another one.
+
+    Args:
+        source_name: Physical collection the chunks were copied from.
+        target_name: Physical collection they were copied to.
+        exclude_documents: Documents that were not copied.
+    """
+    excluded = list(set(exclude_documents))
+    with _catalog_lock, _connect() as conn:
+        conn.execute("CREATE TEMP TABLE excluded_documents (document TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT INTO excluded_documents (document) VALUES (?)",
+            [(document,) for document in excluded],
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO chunk_signatures
+                (collection, chunk_id, document, scheme, signature)
+            SELECT ?, chunk_id, document, scheme, signature FROM chunk_signatures
+            WHERE collection = ?
+                AND document NOT IN (SELECT document FROM excluded_documents)
+            """,
+            (target_name, source_name),
+        )
+        conn.execute(
+            """
+            INSERT INTO signature_buckets (collection, scheme, bucket, chunk_id)
+            SELECT ?, b.scheme, b.bucket, b.chunk_id
+            FROM signature_buckets b JOIN chunk_signatures s
+                ON s.collection = b.collection AND s.chunk_id = b.chunk_id
+            WHERE b.collection = ?
+                AND s.document NOT IN (SELECT document FROM excluded_documents)
+            """,
+            (target_name, source_name),
+        )
+
+
+def drop_catalog(collection_name: Optional[str] = None) -> None:
+    """Forget the catalog of one physical collection, or of all collections.
+
+    Args:
+        collection_name: Physical collection name, or None to clear everything.
+    """
+    with _catalog_lock, _connect() as conn:
+        _bump_version(conn)
+        if collection_name is None:
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM collections")
+            conn.execute("DELETE FROM collection_versions")
+            conn.execute("DELETE FROM chunk_signatures")
+            conn.execute("DELETE FROM signature_buckets")
+        else:
+            conn.execute(
+                "DELETE FROM documents WHERE collection = ?", (collection_name,)
+            )
+            conn.execute(
+                "DELETE FROM collections WHERE collection = ?", (collection_name,)
+            )
+            for table in (
+                "collection_versions",
+                "chunk_signatures",
+                "signature_buckets",
+            ):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE collection = ?", (collection_name,)
+                )
+
+
+__all__ = [
+    "get_data_version",
+    "get_collection_version",
+    "bump_data_version",
+    "document_name",
+    "document_name_field",
+    "document_filter",
+    "record_chunks",
+    "remove_document",
+    "list_documents",
+    "get_document",
+    "record_signatures",
+    "find_signatures",
+    "copy_signatures",
+    "drop_catalog",
+]
@@ -1,119 +1,254 @@
 """ChromaDB client management.
 
-This module provides the ChromaDB persistent client with singleton pattern.
+This module provides the ChromaDB client with singleton pattern. Depending on
+chroma.mode in config.yaml the client is either embedded (a PersistentClient
+that owns CHROMA_PERSIST_DIR, single process) or an HTTP client to a Chroma
+server with a pooled, keep-alive connection shared by all threads, so several
+worker processes can serve one index.
+
+Once the client exists, get_chroma_client() returns it without taking any
+lock; the lock only guards creation and invalidation. Creation churn and
+lock waits are counted (get_client_metrics) and reported through the
+"core.storage.client" logger as structured events.
 """
 
+import logging
 import threading
-from typing import Optional
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
 
 import chromadb
+from chromadb.api import ClientAPI
 
-from config import get_settings
+from config import Settings, get_settings
 
 
-# Global client instance (singleton pattern)
-_chroma_client: Optional[chromadb.PersistentClient] = None
-# Flag to track if client was invalidated (e.g., after database clear)
-_client_invalidated: bool = False
-# Thread lock for safe singleton creation
+logger = logging.getLogger(__name__)
+
+# Global client instance (singleton pattern). Readers access it without the
+# lock: assigning a reference is atomic, so they see either the old client,
+# None or the new client, never a partial object.
+_chroma_client: Optional[ClientAPI] = None
+# Thread lock for safe singleton creation and invalidation
 _chroma_client_lock = threading.Lock()
 
 
+@dataclass
+class ClientMetrics:
+    """Counters for the ChromaDB client singleton.
+
+    Attributes:
+        creations: Number of clients created
+        invalidations: Number of times the client was invalidated
+        slow_path_calls: Calls that found no client and took the lock
+        lock_wait_seconds: Total time spent waiting to acquire the lock
+        max_lock_wait_seconds: Longest single wait to acquire the lock
+    """
+
+    creations: int = 0
+    invalidations: int = 0
+    slow_path_calls: int = 0
+    lock_wait_seconds: float = 0.0
+    max_lock_wait_seconds: float = 0.0
+
+
+# Only mutated while holding _chroma_client_lock
+_metrics = ClientMetrics()
+
+
+def _log_event(level: int, event: str, **fields: Any) -> None:
+    """Log an event as "event key=value ..." with the fields attached to the record."""
+    message = " ".join([event, *(f"{key}={value}" for key, value in fields.items())])
+    logger.log(level, message, extra={"event": event, **fields})
+
+
+def _acquire_lock() -> float:
+    """Acquire the client lock and record how long the wait took.
+
+    Returns:
+        Seconds spent waiting for the lock.
+    """
+    start = time.perf_counter()
+    _chroma_client_lock.acquire()
+    waited = time.perf_counter() - start
+    _metrics.lock_wait_seconds += waited
+    _metrics.max_lock_wait_seconds = max(_metrics.max_lock_wait_seconds, waited)
+    return waited
+
+
+def get_client_metrics() -> Dict[str, Any]:
+    """Get a snapshot of the client singleton counters.
+
+    Returns:
+        Dictionary with creations, invalidations, slow_path_calls,
+        lock_wait_seconds and max_lock_wait_seconds.
+
+    Examples:
+        >>> metrics = get_client_metrics()
+        >>> print(f"Clients created: {metrics['creations']}")
+    """
+    with _chroma_client_lock:
+        return asdict(_metrics)
+
+
 def invalidate_client() -> None:
-    """Mark the current client as invalidated and clear the reference.
+    """Close the current client and clear the reference.
 
     This should be called when the database is cleared to ensure
     a fresh client is created on the next access.
 
-    Thread-safe: Uses the same lock as get_chroma_client() to prevent
-    race conditions during invalidation.
+    Thread-safe: Uses the same lock as client creation, so a client being
+    created concurrently is either invalidated too or created afterwards.
     """
-    global _chroma_client, _client_invalidated
+    global _chroma_client
 
-    print("[CHROMA_CLIENT] Invalidating client...")
+    waited = _acquire_lock()
+    try:
+        client = _chroma_client
+        _chroma_client = None
+        _metrics.invalidations += 1
 
-    # Thread-safe invalidation using the same lock
-    with _chroma_client_lock:
         # Try to close the client properly if it exists
-        if _chroma_client is not None:
+        if client is not None:
             try:
                 # Clear system cache first (before closing)
-                if hasattr(_chroma_client, "clear_system_cache"):
-                    _chroma_client.clear_system_cache()
-                    print("[CHROMA_CLIENT] System cache cleared")
+                if hasattr(client, "clear_system_cache"):
+                    client.clear_system_cache()
 
                 # Then close the client if available
-                if hasattr(_chroma_client, "close"):
-                    _chroma_client.close()
-                    print("[CHROMA_CLIENT] Client closed explicitly")
+                if hasattr(client, "close"):
+                    client.close()
             except Exception as e:
-                print(f"[CHROMA_CLIENT] Warning during cleanup: {e}")
-
-        _chroma_client = None
-        _client_invalidated = True
-        print("[CHROMA_CLIENT] Client invalidated and cleared")
-
-
-def get_chroma_client() -> chromadb.PersistentClient:
-    """Get or create the ChromaDB persistent client.
-
-    Uses a singleton pattern with thread-safe locking to ensure only one
-    client instance exists. All access is synchronized to prevent TOCTOU
-    race conditions with invalidate_client().
-
-    The client persists data to the directory specified in settings (CHROMA_PERSIST_DIR).
+                _log_event(logging.WARNING, "chroma_client.close_failed", error=e)
+
+        _log_event(
+            logging.INFO,
+            "chroma_client.invalidated",
+            had_client=client is not None,
+            invalidations=_metrics.invalidations,
+            wait_ms=round(waited * 1000, 3),
+        )
+    finally:
+        _chroma_client_lock.release()
+
+
+def _create_client(settings: Settings) -> ClientAPI:
+    """Create a client for the configured chroma.mode (not yet heartbeat-checked)."""
+    if settings.chroma_mode == "http":
+        return chromadb.HttpClient(
+            host=settings.chroma_host,
+            port=settings.chroma_port,
+            ssl=settings.chroma_ssl,
+            settings=chromadb.Settings(
+                anonymized_telemetry=False,
+                chroma_http_max_connections=settings.chroma_max_connections,
+                chroma_http_max_keepalive_connections=(
+                    settings.chroma_max_keepalive_connections
+                ),
+                chroma_http_keepalive_secs=settings.chroma_keepalive_seconds,
+            ),
+        )
+
+    persist_path = settings.get_chroma_path()
+    # Ensure the directory exists
+    persist_path.mkdir(parents=True, exist_ok=True)
+
+    # Create client with explicit settings to handle SQLite properly
+    return chromadb.PersistentClient(
+        path=str(persist_path),
+        settings=chromadb.Settings(
+            allow_reset=True,
+            anonymized_telemetry=False,
+            is_persistent=True,
+            persist_directory=str(persist_path),
+        ),
+    )
+
+
+def get_chroma_client() -> ClientAPI:
+    """Get or create the ChromaDB client.
+
+    Uses a singleton pattern with double-checked locking: when the client
+    already exists it is returned without taking the lock, so concurrent
+    queries never contend. Only creating the client (first call, or first
+    call after invalidate_client()) is synchronized.
+
+    In embedded mode the client persists data to the directory specified in
+    settings (CHROMA_PERSIST_DIR). In http mode it connects to the Chroma
+    server at chroma.host:chroma.port, reusing pooled keep-alive connections.
 
     Returns:
-        ChromaDB PersistentClient instance.
+        ChromaDB client instance.
+
+    Raises:
+        RuntimeError: If the new client fails its heartbeat (in http mode,
+            usually because the server is not running).
 
     Examples:
         >>> client = get_chroma_client()
         >>> collections = client.list_collections()
     """
-    global _chroma_client, _client_invalidated
+    global _chroma_client
 
-    # Always acquire lock to prevent TOCTOU races with invalidate_client()
-    with _chroma_client_lock:
-        # Check if client needs recreation due to invalidation
-        if _client_invalidated:
-            _chroma_client = None
-            _client_invalidated = False
-            print("[CHROMA_CLIENT] Forcing client recreation after invalidation")
-
-        # Check if client needs to be created
-        if _chroma_client is None:
-            settings = get_settings()
-            persist_path = settings.get_chroma_path()
-
-            # Ensure the directory exists
-            persist_path.mkdir(parents=True, exist_ok=True)
-
-            print(f"[CHROMA_CLIENT] Creating new ChromaDB client at: {persist_path}")
-
-            # Create client with explicit settings to handle SQLite properly
-            _chroma_client = chromadb.PersistentClient(
-                path=str(persist_path),
-                settings=chromadb.Settings(
-                    allow_reset=True,
-                    anonymized_telemetry=False,
-                    is_persistent=True,
-                    persist_directory=str(persist_path),
-                ),
-            )
+    # Fast path: a single read of the reference, no lock
+    client = _chroma_client
+    if client is not None:
+        return client
 
-            print("[CHROMA_CLIENT] Client created successfully")
+    waited = _acquire_lock()
+    try:
+        _metrics.slow_path_calls += 1
 
-            # Force a simple operation to ensure client is fully initialized
-            try:
-                _chroma_client.heartbeat()
-                print("[CHROMA_CLIENT] Client heartbeat successful")
-            except Exception as e:
-                print(f"[CHROMA_CLIENT] Error: heartbeat failed: {e}")
-                _chroma_client = None
-                raise RuntimeError(f"ChromaDB client initialization failed: {e}") from e
-
-        # Return client while still holding lock to prevent TOCTOU
-        return _chroma_client
-
-
-__all__ = ["get_chroma_client", "invalidate_client"]
+        # Another thread may have created the client while we waited
+        if _chroma_client is not None:
+            return _chroma_client
+
+        settings = get_settings()
+        if settings.chroma_mode == "http":
+            target = f"{settings.chroma_host}:{settings.chroma_port}"
+        else:
+            target = str(settings.get_chroma_path())
+
+        start = time.perf_counter()
+        # Force a simple operation to ensure client is fully initialized
+        # (the HTTP client already contacts the server when it is created)
+        try:
+            client = _create_client(settings)
+            client.heartbeat()
+        except Exception as e:
+            _log_event(
+                logging.ERROR,
+                "chroma_client.heartbeat_failed",
+                mode=settings.chroma_mode,
+                target=target,
+                error=e,
+            )
+            raise RuntimeError(
+                f"ChromaDB client initialization failed ({settings.chroma_mode} "
+                f"mode, {target}): {e}"
+            ) from e
+
+        # Publish only a fully initialized client to lock-free readers
+        _chroma_client = client
+        _metrics.creations += 1
+        _log_event(
+            logging.INFO,
+            "chroma_client.created",
+            mode=settings.chroma_mode,
+            target=target,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+            creations=_metrics.creations,
+            wait_ms=round(waited * 1000, 3),
+        )
+        return client
+    finally:
+        _chroma_client_lock.release()
+
+
+__all__ = [
+    "ClientMetrics",
+    "get_chroma_client",
+    "get_client_metrics",
+    "invalidate_client",
+]
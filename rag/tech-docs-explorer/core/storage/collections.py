@@ -2,25 +2,115 @@
 
 This module provides functions for:
 - Getting or creating collections
-- Clearing the database
+- Blue-green rebuilds of versioned collections (with their document catalogs),
+  whole or one stack shard at a time
+- Clearing the database (a logical reset that never blocks readers)
 - Getting collection statistics
 """
 
-import gc
-import shutil
+import threading
 import time
-from typing import Any, Dict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
 
+from chromadb.api import ClientAPI
 from chromadb.api.models.Collection import Collection
 
 from config import get_settings
 
-from .client import get_chroma_client, invalidate_client
+from .catalog import (
+    copy_signatures,
+    document_name,
+    drop_catalog,
+    list_documents,
+    record_chunks,
+)
+from .client import get_chroma_client
+from .hnsw import hnsw_metadata, sync_search_params
+from .quantized import drop_quantized_index
+from .registry import (
+    clear_registry,
+    forget_retired,
+    get_alias,
+    get_building,
+    get_retired,
+    is_version_of,
+    logical_name,
+    mark_building,
+    new_version_name,
+    resolve_collection,
+    swap_alias,
+    unmark_building,
+)
+from .shards import route_by_stack
+
+
+# Chunks copied per request when carrying documents over to a new version
+_COPY_PAGE_SIZE = 1000
+
+# Collection metadata keys recording how a collection's chunks were produced;
+# chunks can only be carried over between collections where they all match
+INDEX_SETTINGS_KEYS = (
+    "index:embedding_provider",
+    "index:embedding_model",
+    "index:embedding_dim",
+    "index:chunk_size",
+    "index:chunk_overlap",
+)
+
+# Dimension of the OpenAI embedding models, which can't be read from settings
+_OPENAI_EMBEDDING_DIMS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+def index_settings() -> Dict[str, Any]:
+    """Describe how the current settings embed and chunk documents.
+
+    Stored in the metadata of every new collection, so a rebuild can tell
+    whether the chunks of an older version are compatible with new ones.
+
+    Returns:
+        Dictionary with the INDEX_SETTINGS_KEYS. The embedding dimension is
+        0 when it depends on a model that has to be loaded to know it.
+
+    Examples:
+        >>> index_settings()["index:chunk_size"]
+        1000
+    """
+    settings = get_settings()
+    provider = settings.llm_provider
+    if provider == "local":
+        model = settings.local_embedding_model or "hashed"
+        dimension = 0 if settings.local_embedding_model else settings.local_embed_dim
+    else:
+        model = settings.embedding_model
+        dimension = _OPENAI_EMBEDDING_DIMS.get(model, 0)
+    return {
+        "index:embedding_provider": provider,
+        "index:embedding_model": model,
+        "index:embedding_dim": dimension,
+        "index:chunk_size": settings.chunk_size,
+        "index:chunk_overlap": settings.chunk_overlap,
+    }
+
+
+def _collection_metadata(name: str) -> Dict[str, Any]:
+    """Metadata of a new collection: configured HNSW index and index settings."""
+    return {**hnsw_metadata(name), **index_settings()}
 
 
 def get_or_create_collection(name: str = "tech_docs") -> Collection:
     """Get an existing collection or create it if it doesn't exist.
 
+    Logical names are resolved through the collection registry, so callers
+    always get the currently active version of a blue-green collection.
+    New collections are created with the HNSW parameters in config.yaml and
+    record the embedding and chunking settings (see index_settings()).
+
     Args:
         name: Name of the collection. Default is "tech_docs".
 
@@ -35,21 +125,366 @@ def get_or_create_collection(name: str = "tech_docs") -> Collection:
         >>> collection = get_or_create_collection("custom_collection")
     """
     client = get_chroma_client()
+    physical_name = resolve_collection(name)
 
-    return client.get_or_create_collection(
-        name=name,
-        metadata={"hnsw:space": "cosine"},  # Use cosine similarity for retrieval
+    # The HNSW parameters from config.yaml only apply when the collection is
+    # created; search-time ones are also synced on existing collections
+    collection = client.get_or_create_collection(
+        name=physical_name, metadata=_collection_metadata(physical_name)
     )
+    sync_search_params(collection, physical_name)
+    return collection
+
+
+def _drop_collection(client: ClientAPI, physical_name: str) -> None:
+    """Delete a physical collection with its document catalog and quantized index."""
+    client.delete_collection(physical_name)
+    drop_catalog(physical_name)
+    drop_quantized_index(physical_name)
+
+
+def _embedding_dim(collection: Collection) -> int:
+    """Dimension of the embeddings stored in a collection (0 if it's empty)."""
+    page = collection.get(include=["embeddings"], limit=1)
+    return len(page["embeddings"][0]) if len(page["ids"]) else 0
+
+
+def _check_carry_over(source: Collection) -> None:
+    """Refuse to carry chunks over from a collection indexed differently.
+
+    Raises:
+        ValueError: If the embedding model, its dimension or the chunking
+            recorded in the source collection differ from the current settings.
+    """
+    current = index_settings()
+    recorded = source.metadata or {}
+    mismatched = [
+        f"{key.split(':', 1)[1]}={recorded[key]} (now: {current[key]})"
+        for key in INDEX_SETTINGS_KEYS
+        if key in recorded
+        and recorded[key] != current[key]
+        # An unknown dimension on either side is checked on the vectors
+        and not (key == "index:embedding_dim" and 0 in (recorded[key], current[key]))
+    ]
+    if mismatched:
+        raise ValueError(
+            f"Can't keep the documents of '{source.name}': it was indexed with "
+            f"{', '.join(mismatched)}. Rebuild without keeping documents to "
+            f"re-index everything"
+        )
+    if not any(key in recorded for key in INDEX_SETTINGS_KEYS):
+        print(
+            f"[BLUE_GREEN] Warning: '{source.name}' doesn't record its index "
+            f"settings; only the embedding dimension is checked"
+        )
+
+
+def _carry_over_documents(
+    client: ClientAPI, source_name: str, target: Collection
+) -> int:
+    """Copy the documents a rebuild didn't re-index from the previous version.
+
+    Chunks are copied with their embeddings, so nothing is embedded again.
+
+    Returns:
+        Number of chunks copied.
+
+    Raises:
+        ValueError: If the previous version was embedded or chunked
+            differently from the new one.
+    """
+    try:
+        source = client.get_collection(source_name)
+    except Exception:
+        return 0  # First build of this collection: nothing to keep
+
+    _check_carry_over(source)
+    source_dim = _embedding_dim(source)
+    target_dim = _embedding_dim(target)
+    if source_dim and target_dim and source_dim != target_dim:
+        raise ValueError(
+            f"Can't keep the documents of '{source_name}': its embeddings have "
+            f"{source_dim} dimensions and the re-indexed ones {target_dim}"
+        )
+
+    reindexed = {doc["name"] for doc in list_documents(target)}
+    copied = 0
+    offset = 0
+    while True:
+        page = source.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=_COPY_PAGE_SIZE,
+            offset=offset,
+        )
+        keep = [
+            idx
+            for idx, metadata in enumerate(page["metadatas"])
+            if document_name(metadata) not in reindexed
+        ]
+        if keep:
+            metadatas = [page["metadatas"][idx] for idx in keep]
+            target.add(
+                ids=[page["ids"][idx] for idx in keep],
+                embeddings=[page["embeddings"][idx] for idx in keep],
+                documents=[page["documents"][idx] for idx in keep],
+                metadatas=metadatas,
+            )
+            record_chunks(target, metadatas)
+            copied += len(keep)
+        if len(page["ids"]) < _COPY_PAGE_SIZE:
+            break
+        offset += _COPY_PAGE_SIZE
+    # Near-duplicates of the copied chunks are still detected in the new version
+    copy_signatures(source_name, target.name, exclude_documents=reindexed)
+    return copied
+
+
+@contextmanager
+def blue_green_rebuild(
+    name: str = "tech_docs",
+    keep_documents: bool = False,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Generator[str, None, None]:
+    """Rebuild a collection into a new version while readers keep using the old one.
+
+    Creates a new versioned physical collection and yields its name so the
+    caller can index into it. When the block exits successfully the logical
+    name is atomically switched to it and the previous versions are
+    garbage-collected in the background, so the new version replaces the
+    whole collection. If the block raises, the new version is dropped and
+    the active collection is left untouched.
+
+    Args:
+        name: Logical collection name. Default is "tech_docs".
+        keep_documents: Partial rebuild: copy the documents the block didn't
+            re-index from the active version before switching, so
+            re-indexing a few documents doesn't drop the rest. Only allowed
+            when the active version was embedded and chunked with the
+            current settings.
+        metadata: Collection metadata (HNSW space and build parameters,
+            index settings) of the new version. None uses the current
+            configuration.
+
+    Yields:
+        Name of the new physical collection to index into.
+
+    Raises:
+        ValueError: If keep_documents is set and the active version was
+            indexed with other settings (checked before anything is built).
+
+    Examples:
+        >>> with blue_green_rebuild("tech_docs") as physical_name:
+        ...     index_documents(documents, metadata, collection_name=physical_name)
+    """
+    client = get_chroma_client()
+    if keep_documents:
+        try:
+            active = client.get_collection(resolve_collection(name))
+        except Exception:
+            active = None  # First build of this collection: nothing to keep
+        if active is not None:
+            _check_carry_over(active)
+    physical_name = new_version_name(name)
+    # Registered before it exists, so a concurrent GC never sees it unmarked
+    mark_building(physical_name)
+    try:
+        collection = client.create_collection(
+            name=physical_name, metadata=metadata or _collection_metadata(name)
+        )
+        print(f"[BLUE_GREEN] Building new version '{physical_name}' for '{name}'")
+
+        try:
+            yield physical_name
+            if keep_documents:
+                copied = _carry_over_documents(
+                    client, resolve_collection(name), collection
+                )
+                if copied:
+                    print(
+                        f"[BLUE_GREEN] Kept {copied} chunks of documents not "
+                        f"re-indexed in '{physical_name}'"
+                    )
+        except BaseException:
+            print(f"[BLUE_GREEN] Rebuild failed, dropping '{physical_name}'")
+            try:
+                _drop_collection(client, physical_name)
+            except Exception as e:
+                print(f"[BLUE_GREEN] Warning: could not drop '{physical_name}': {e}")
+            raise
+
+        swap_alias(name, physical_name)
+    finally:
+        unmark_building(physical_name)
+    schedule_version_gc(name)
+
+
+@contextmanager
+def rebuild_stacks(
+    name: str, stacks: Iterable[str], keep_documents: bool = False
+) -> Generator[Dict[str, str], None, None]:
+    """Rebuild the collections holding some stacks, blue-green.
+
+    With sharding enabled only the shards of the given stacks are rebuilt
+    and every other stack keeps serving untouched; otherwise this is a
+    blue_green_rebuild() of the whole collection. The new versions are
+    activated when the block exits successfully and all of them are dropped
+    if it raises.
+
+    Args:
+        name: Logical collection name (e.g. "tech_docs").
+        stacks: Stacks being re-indexed.
+        keep_documents: Partial rebuild: carry over the documents the block
+            doesn't re-index (see blue_green_rebuild()).
+
+    Yields:
+        Dictionary of {stack: physical collection name}, to pass to
+        index_documents() as shard_targets.
+
+    Examples:
+        >>> with rebuild_stacks("tech_docs", ["fastapi"]) as targets:
+        ...     index_documents(documents, metadata, shard_targets=targets)
+    """
+    routes = route_by_stack(name, stacks)
+    with ExitStack() as rebuilds:
+        physical_names = {
+            target: rebuilds.enter_context(
+                blue_green_rebuild(target, keep_documents=keep_documents)
+            )
+            for target in sorted(set(routes.values()))
+        }
+        yield {stack: physical_names[target] for stack, target in routes.items()}
+
+
+def garbage_collect_versions(name: str = "tech_docs") -> List[str]:
+    """Delete every physical version of a collection except the active one.
+
+    Versions that a live process is still building are skipped. Collections
+    retired by clear_database() whose grace period is over are deleted too.
+
+    Args:
+        name: Logical collection name. Default is "tech_docs".
+
+    Returns:
+        Names of the physical collections that were deleted.
+    """
+    deleted = drop_retired_collections()
+    active = get_alias(name)
+    if active is None:
+        # Nothing has been swapped yet: the unversioned collection is the live one
+        return deleted
+
+    client = get_chroma_client()
+    building = set(get_building())
+    for collection in client.list_collections():
+        if collection.name == active or collection.name in building:
+            continue
+        if is_version_of(collection.name, name):
+            try:
+                _drop_collection(client, collection.name)
+                deleted.append(collection.name)
+            except Exception as e:
+                print(
+                    f"[BLUE_GREEN] Warning: could not delete '{collection.name}': {e}"
+                )
+
+    if deleted:
+        print(f"[BLUE_GREEN] Garbage-collected versions of '{name}': {deleted}")
+    return deleted
+
+
+def _run_after_grace(task: Callable[[], Any], thread_name: str) -> threading.Thread:
+    """Run a cleanup task in a daemon thread after storage.gc_grace_seconds."""
+    grace_seconds = get_settings().gc_grace_seconds
+
+    def _run() -> None:
+        time.sleep(grace_seconds)
+        try:
+            task()
+        except Exception as e:
+            print(f"[BLUE_GREEN] Warning: background garbage collection failed: {e}")
+
+    thread = threading.Thread(target=_run, name=thread_name, daemon=True)
+    thread.start()
+    return thread
+
+
+def schedule_version_gc(name: str = "tech_docs") -> threading.Thread:
+    """Garbage-collect old versions in a background thread after a grace period.
+
+    The grace period (storage.gc_grace_seconds) lets queries that resolved the
+    previous version before the swap finish before it is deleted.
+
+    Args:
+        name: Logical collection name. Default is "tech_docs".
+
+    Returns:
+        The started daemon thread.
+    """
+    return _run_after_grace(lambda: garbage_collect_versions(name), f"gc-{name}")
+
+
+def drop_retired_collections() -> List[str]:
+    """Delete the collections retired by clear_database() once their grace is over.
+
+    The retired collections are recorded in the registry, so the ones left
+    behind by a process that exited during the grace period are deleted by
+    the next one (on startup and on every version garbage collection).
+    Collections are matched by id: a collection re-created under the same
+    name after the reset is left alone.
+
+    Returns:
+        Names of the physical collections that were deleted.
+    """
+    retired = get_retired()
+    if not retired:
+        return []
+
+    grace = timedelta(seconds=get_settings().gc_grace_seconds)
+    due = {
+        name: entry
+        for name, entry in retired.items()
+        if datetime.fromisoformat(entry["retired_at"]) + grace <= datetime.now()
+    }
+    if not due:
+        return []
+
+    client = get_chroma_client()
+    existing = {
+        collection.name: str(collection.id) for collection in client.list_collections()
+    }
+    deleted = []
+    forgotten = []
+    for name, entry in due.items():
+        if existing.get(name) != entry["id"]:
+            forgotten.append(name)  # Already gone or re-created
+            continue
+        try:
+            _drop_collection(client, name)
+            deleted.append(name)
+            forgotten.append(name)
+            print(f"[CLEAR_DB] Deleted collection: {name}")
+        except Exception as e:
+            print(f"[CLEAR_DB] Warning: could not delete '{name}': {e}")
+    forget_retired(forgotten)
+    return deleted
 
 
 def clear_database() -> Dict[str, Any]:
-    """Clear all data from ChromaDB using proper client invalidation and directory cleanup.
+    """Clear all indexed documents without blocking or breaking readers.
 
-    This will:
-    1. Use ChromaDB's reset() method if client exists
-    2. Invalidate the client completely
-    3. Delete the entire ChromaDB persistence directory
-    4. Recreate the directory structure
+    The reset is logical and returns in milliseconds:
+    1. Every logical collection is pointed at a new, empty version (created
+       on first use) and every shard is forgotten, so new queries see an
+       empty index right away
+    2. The document catalog is cleared
+    3. The previous collections are deleted in the background after
+       storage.gc_grace_seconds, so queries that already opened them finish
+       (or by the next process to start, if this one exits first)
+
+    Versions that a rebuild is still building are not retired: the rebuild
+    activates its version when it finishes.
+
+    The same steps work in embedded and http mode, through the client API.
 
     WARNING: This operation is irreversible and will delete ALL indexed documents.
 
@@ -62,68 +497,55 @@ def clear_database() -> Dict[str, Any]:
         "Base de datos limpiada exitosamente. Todos los documentos indexados fueron eliminados."
     """
     settings = get_settings()
-    persist_path = settings.get_chroma_path()
+    if settings.chroma_mode == "http":
+        target = f"{settings.chroma_host}:{settings.chroma_port}"
+    else:
+        target = str(settings.get_chroma_path())
 
     try:
-        print(f"[CLEAR_DB] Starting database cleanup at: {persist_path}")
-
-        # Step 1: Invalidate the client (handles reset and cleanup internally)
-        invalidate_client()
-
-        # Step 2: Force garbage collection
-        gc.collect()
-        print("[CLEAR_DB] Garbage collection completed")
-
-        # Step 3: Wait for file handles to be fully released
-        time.sleep(1.5)
-
-        # Step 4: Delete persistence directory if it exists
-        if persist_path.exists():
-            print(f"[CLEAR_DB] Deleting directory: {persist_path}")
-            try:
-                shutil.rmtree(persist_path)
-                print("[CLEAR_DB] Directory deleted successfully")
-            except Exception as rm_error:
-                print(f"[CLEAR_DB] Warning during directory deletion: {rm_error}")
-                # Try again after a short wait
-                time.sleep(0.5)
-                shutil.rmtree(persist_path, ignore_errors=True)
-
-                # Verify deletion succeeded after retry
-                if persist_path.exists():
-                    error_msg = (
-                        f"Failed to delete ChromaDB directory after retry. "
-                        f"Path: {persist_path}, Original error: {rm_error}"
-                    )
-                    print(f"[CLEAR_DB ERROR] {error_msg}")
-                    raise RuntimeError(error_msg) from rm_error
-        else:
-            print(f"[CLEAR_DB] Directory does not exist: {persist_path}")
-
-        # Step 5: Wait before recreating
-        time.sleep(0.5)
-
-        # Step 6: Recreate the directory
-        persist_path.mkdir(parents=True, exist_ok=True)
-        print(f"[CLEAR_DB] Directory recreated: {persist_path}")
+        print(f"[CLEAR_DB] Starting database reset at: {target}")
+        client = get_chroma_client()
+        collections = client.list_collections()
+        # Versions are marked as building before they are created, so reading
+        # the builds after listing catches every listed one; a running rebuild
+        # keeps its version and swaps it in when done
+        building = set(get_building())
+        retired = {
+            collection.name: collection.id
+            for collection in collections
+            if collection.name not in building
+        }
 
-        # Step 7: Final wait to ensure filesystem is ready
-        time.sleep(0.3)
+        # Every logical name in use gets a fresh version, created on first use;
+        # re-indexing a stack during the grace period must not write into
+        # (and then lose) a retired collection with the same name
+        logical_names = {
+            logical_name(collection.name) for collection in collections
+        } | {"tech_docs"}
+        clear_registry(
+            aliases={name: new_version_name(name) for name in logical_names},
+            retired=retired,
+        )
+        for name in retired:
+            drop_catalog(name)
+
+        if retired:
+            _run_after_grace(drop_retired_collections, "gc-clear-database")
+            print(
+                f"[CLEAR_DB] {len(retired)} collection(s) scheduled for deletion "
+                f"in {settings.gc_grace_seconds}s"
+            )
 
         return {
             "success": True,
             "message": "Base de datos limpiada exitosamente. Todos los documentos indexados fueron eliminados.",
-            "path": str(persist_path),
+            "path": target,
         }
 
     except Exception as e:
         error_msg = f"Error al limpiar base de datos: {str(e)}"
         print(f"[CLEAR_DB ERROR] {error_msg}")
-        return {
-            "success": False,
-            "message": error_msg,
-            "path": str(persist_path),
-        }
+        return {"success": False, "message": error_msg, "path": target}
 
 
 def get_collection_stats(collection_name: str = "tech_docs") -> Dict[str, Any]:
@@ -147,7 +569,7 @@ def get_collection_stats(collection_name: str = "tech_docs") -> Dict[str, Any]:
 
         # Check if collection exists without creating it
         try:
-            collection = client.get_collection(collection_name)
+            collection = client.get_collection(resolve_collection(collection_name))
             count = collection.count()
             return {"name": collection_name, "count": count, "exists": True}
         except Exception:
@@ -158,4 +580,15 @@ def get_collection_stats(collection_name: str = "tech_docs") -> Dict[str, Any]:
         return {"name": collection_name, "count": 0, "exists": False, "error": str(e)}
 
 
-__all__ = ["get_or_create_collection", "clear_database", "get_collection_stats"]
+__all__ = [
+    "INDEX_SETTINGS_KEYS",
+    "index_settings",
+    "get_or_create_collection",
+    "blue_green_rebuild",
+    "rebuild_stacks",
+    "garbage_collect_versions",
+    "schedule_version_gc",
+    "drop_retired_collections",
+    "clear_database",
+    "get_collection_stats",
+]
@@ -0,0 +1,361 @@
+"""HNSW index configuration and tuning.
+
+This module maps the hnsw section of config.yaml onto ChromaDB collections
+and measures how the parameters trade recall for speed on a real corpus:
+- Building the collection metadata that configures a new HNSW index
+- Updating the search-time parameters of existing collections
+- Sweeping M, construction_ef and search_ef against exact search
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import chromadb
+import numpy as np
+from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+
+from config import get_settings
+
+from .client import get_chroma_client
+from .registry import logical_name, resolve_collection
+from .shards import SHARD_SEPARATOR
+
+
+# config.yaml parameter -> (collection metadata key, configuration key)
+HNSW_PARAMETERS = {
+    "space": ("hnsw:space", "space"),
+    "M": ("hnsw:M", "max_neighbors"),
+    "construction_ef": ("hnsw:construction_ef", "ef_construction"),
+    "search_ef": ("hnsw:search_ef", "ef_search"),
+    "batch_size": ("hnsw:batch_size", "batch_size"),
+    "sync_threshold": ("hnsw:sync_threshold", "sync_threshold"),
+    "num_threads": ("hnsw:num_threads", "num_threads"),
+    "resize_factor": ("hnsw:resize_factor", "resize_factor"),
+}
+# Parameters fixed when the index is built; changing them requires a rebuild
+BUILD_PARAMETERS = ("space", "M", "construction_ef")
+# Chunks read per request when loading embeddings for tuning
+_LOAD_PAGE_SIZE = 5000
+# Name of the scratch collection built for each tuning configuration
+_SCRATCH_COLLECTION = "hnsw_tune"
+# Physical collections already warned about build parameter mismatches
+_warned_collections: Set[str] = set()
+
+
+def get_hnsw_config(collection_name: str) -> Dict[str, Any]:
+    """Get the configured HNSW parameters of a logical or physical collection.
+
+    Shards use the parameters of the collection they belong to.
+
+    Raises:
+        ValueError: If config.yaml contains an unknown HNSW parameter.
+    """
+    root_name = logical_name(collection_name).split(SHARD_SEPARATOR, 1)[0]
+    config = get_settings().get_hnsw_config(root_name)
+    unknown = set(config) - set(HNSW_PARAMETERS)
+    if unknown:
+        raise ValueError(
+            f"Unknown HNSW parameters in config.yaml: {sorted(unknown)}. "
+            f"Use: {', '.join(HNSW_PARAMETERS)}"
+        )
+    return config
+
+
+def hnsw_metadata(collection_name: str) -> Dict[str, Any]:
+    """Build the metadata that creates a collection with the configured index.
+
+    Args:
+        collection_name: Logical or physical collection name.
+
+    Returns:
+        ChromaDB collection metadata (hnsw:space, hnsw:M, ...).
+
+    Examples:
+        >>> client.create_collection(name, metadata=hnsw_metadata(name))
+    """
+    return {
+        HNSW_PARAMETERS[param][0]: value
+        for param, value in get_hnsw_config(collection_name).items()
+    }
+
+
+def sync_search_params(collection: Collection, collection_name: str) -> None:
+    """Bring an existing collection's search-time parameters up to date.
+
+    Parameters that can change after the build (search_ef, batch_size, ...)
+    are updated in the collection configuration; ChromaDB applies them the
+    next time it loads the index (e.g. on restart). Build parameters that
+    differ from config.yaml are reported once, since they only take effect
+    on a rebuild.
+
+    Args:
+        collection: Collection to update.
+        collection_name: Logical or physical name used to look up the config.
+    """
+    current = (collection.configuration_json or {}).get("hnsw") or {}
+    if not current:
+        return
+
+    updates: Dict[str, Any] = {}
+    mismatched: List[str] = []
+    for param, value in get_hnsw_config(collection_name).items():
+        key = HNSW_PARAMETERS[param][1]
+        if key not in current or current[key] == value:
+            continue
+        if param in BUILD_PARAMETERS:
+            mismatched.append(f"{param}={current[key]} (config: {value})")
+        else:
+            updates[key] = value
+
+    if updates:
+        collection.modify(configuration={"hnsw": updates})
+        print(f"[HNSW] Updated '{collection.name}': {updates}")
+
+    if mismatched and collection.name not in _warned_collections:
+        _warned_collections.add(collection.name)
+        print(
+            f"[HNSW] Warning: '{collection.name}' was built with "
+            f"{', '.join(mismatched)}; re-index to apply the configured values"
+        )
+
+
+def _load_embeddings(collection: Collection) -> np.ndarray:
+    """Read every embedding of a collection into a float32 matrix."""
+    count = collection.count()
+    pages = []
+    for offset in range(0, count, _LOAD_PAGE_SIZE):
+        page = collection.get(
+            include=["embeddings"], limit=_LOAD_PAGE_SIZE, offset=offset
+        )
+        pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+    return np.concatenate(pages) if pages else np.empty((0, 0), dtype=np.float32)
+
+
+def _exact_top_k(
+    corpus: np.ndarray, queries: np.ndarray, top_k: int, space: str
+) -> np.ndarray:
+    """Exact nearest neighbours (row indices) by brute force in the given space."""
+    if space == "cosine":
+        corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True).clip(1e-12)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True).clip(1e-12)
+    scores = queries @ corpus.T
+    if space == "l2":
+        # Rank by -||q - x||^2; ||q||^2 is constant per query
+        scores = 2 * scores - np.sum(corpus**2, axis=1)
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    return top
+
+
+def _directory_size_mb(path: Path) -> float:
+    """Size of the HNSW segment files under a ChromaDB directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        if Path(root) == path:
+            continue  # Skip chroma.sqlite3, which holds the record log
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1_000_000
+
+
+def _estimated_index_mb(count: int, dimension: int, m: int) -> float:
+    """hnswlib level-0 footprint: vector, 2*M links and a label per element."""
+    return count * (4 * dimension + 4 * (2 * m + 1) + 8) / 1_000_000
+
+
+def _scratch_client(path: str) -> ClientAPI:
+    """Open a private ChromaDB client on a scratch directory."""
+    return chromadb.PersistentClient(
+        path=path, settings=chromadb.Settings(anonymized_telemetry=False)
+    )
+
+
+def _build_scratch_index(
+    path: str, config: Dict[str, Any], ids: List[str], corpus: np.ndarray
+) -> float:
+    """Build a scratch collection with the given HNSW parameters.
+
+    Returns:
+        Seconds taken to insert every vector into the index.
+    """
+    client = _scratch_client(path)
+    try:
+        collection = client.create_collection(
+            name=_SCRATCH_COLLECTION,
+            metadata={
+                HNSW_PARAMETERS[param][0]: value for param, value in config.items()
+            },
+        )
+        batch_size = client.get_max_batch_size()
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), batch_size):
+            collection.add(
+                ids=ids[offset : offset + batch_size],
+                embeddings=corpus[offset : offset + batch_size],
+            )
+        # A first query waits for any pending index work
+        collection.query(query_embeddings=corpus[:1], n_results=1, include=[])
+        return time.perf_counter() - start
+    finally:
+        client.close()
+
+
+def _measure_queries(
+    path: str,
+    search_ef: int,
+    queries: np.ndarray,
+    exact: np.ndarray,
+    top_k: int,
+) -> Tuple[List[float], int]:
+    """Query a scratch index with the given search_ef.
+
+    ChromaDB reads search_ef when it loads the index, so the collection is
+    updated and then reopened from a new client.
+
+    Returns:
+        Tuple of (per-query latencies in seconds, neighbours also found by
+        exact search).
+    """
+    client = _scratch_client(path)
+    try:
+        client.get_collection(_SCRATCH_COLLECTION).modify(
+            configuration={"hnsw": {"ef_search": search_ef}}
+        )
+    finally:
+        client.close()
+
+    client = _scratch_client(path)
+    try:
+        collection = client.get_collection(_SCRATCH_COLLECTION)
+        # Load the index before timing
+        collection.query(query_embeddings=queries[:1], n_results=top_k, include=[])
+
+        latencies: List[float] = []
+        hits = 0
+        for query, expected in zip(queries, exact):
+            start = time.perf_counter()
+            found = collection.query(
+                query_embeddings=[query], n_results=top_k, include=[]
+            )["ids"][0]
+            latencies.append(time.perf_counter() - start)
+            hits += len({int(row) for row in found} & set(expected.tolist()))
+        return latencies, hits
+    finally:
+        client.close()
+
+
+def tune_hnsw(
+    collection_name: str = "tech_docs",
+    m_values: Sequence[int] = (8, 16, 32),
+    construction_ef_values: Sequence[int] = (100, 200),
+    search_ef_values: Sequence[int] = (10, 50, 100, 200),
+    num_queries: int = 200,
+    top_k: int = 10,
+    seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """Sweep HNSW parameters on the embeddings of a collection.
+
+    Each (M, construction_ef) pair is built into a scratch collection in a
+    temporary directory from the collection's own embeddings, minus a random
+    sample held out as queries. Every search_ef is then measured against
+    exact (brute-force) search on the same vectors. The live collection is
+    only read. Note that search_ef values below top_k behave like top_k.
+
+    Args:
+        collection_name: Logical or physical collection to tune.
+        m_values: M values to build.
+        construction_ef_values: construction_ef values to build.
+        search_ef_values: search_ef values to query each build with.
+        num_queries: Embeddings held out and used as queries.
+        top_k: Neighbours retrieved per query (recall@top_k).
+        seed: Random seed for the query sample.
+
+    Returns:
+        One dict per configuration with M, construction_ef, search_ef,
+        build_seconds, index_mb, p50_ms, p95_ms, qps and recall.
+
+    Raises:
+        ValueError: If the collection has too few chunks to tune.
+
+    Examples:
+        >>> results = tune_hnsw(m_values=[16], search_ef_values=[50, 100])
+        >>> best = max(results, key=lambda r: r["recall"])
+    """
+    config = get_hnsw_config(collection_name)
+    space = config.get("space", "cosine")
+    embeddings = _load_embeddings(
+        get_chroma_client().get_collection(resolve_collection(collection_name))
+    )
+    total = len(embeddings)
+    num_queries = min(num_queries, total // 5)
+    if num_queries < 1 or total - num_queries <= top_k:
+        raise ValueError(
+            f"Collection '{collection_name}' has {total} chunks; "
+            f"need more than {top_k + 5} to tune"
+        )
+
+    rng = np.random.default_rng(seed)
+    query_rows = rng.choice(total, size=num_queries, replace=False)
+    corpus_mask = np.ones(total, dtype=bool)
+    corpus_mask[query_rows] = False
+    corpus, queries = embeddings[corpus_mask], embeddings[query_rows]
+    exact = _exact_top_k(corpus, queries, top_k, space)
+    print(
+        f"[HNSW] Tuning on {len(corpus)} vectors (dim {corpus.shape[1]}, {space}) "
+        f"with {num_queries} held-out queries, recall@{top_k}"
+    )
+
+    results: List[Dict[str, Any]] = []
+    ids = [str(row) for row in range(len(corpus))]
+    for m in m_values:
+        for construction_ef in construction_ef_values:
+            with tempfile.TemporaryDirectory(
+                prefix="hnsw_tune_", ignore_cleanup_errors=True
+            ) as tmp_dir:
+                build_seconds = _build_scratch_index(
+                    tmp_dir,
+                    {**config, "M": m, "construction_ef": construction_ef},
+                    ids,
+                    corpus,
+                )
+                # Small corpora may still be unflushed; fall back to an estimate
+                index_mb = _directory_size_mb(Path(tmp_dir)) or _estimated_index_mb(
+                    len(corpus), corpus.shape[1], m
+                )
+
+                for search_ef in search_ef_values:
+                    latencies, hits = _measure_queries(
+                        tmp_dir, search_ef, queries, exact, top_k
+                    )
+                    latencies_ms = np.array(latencies) * 1000
+                    result = {
+                        "M": m,
+                        "construction_ef": construction_ef,
+                        "search_ef": search_ef,
+                        "build_seconds": build_seconds,
+                        "index_mb": index_mb,
+                        "p50_ms": float(np.percentile(latencies_ms, 50)),
+                        "p95_ms": float(np.percentile(latencies_ms, 95)),
+                        "qps": len(latencies) / sum(latencies),
+                        "recall": hits / (num_queries * top_k),
+                    }
+                    results.append(result)
+                    print(
+                        f"[HNSW] M={m} construction_ef={construction_ef} "
+                        f"search_ef={search_ef}: recall={result['recall']:.3f} "
+                        f"p50={result['p50_ms']:.2f}ms"
+                    )
+
+    return results
+
+
+__all__ = [
+    "HNSW_PARAMETERS",
+    "BUILD_PARAMETERS",
+    "get_hnsw_config",
+    "hnsw_metadata",
+    "sync_search_params",
+    "tune_hnsw",
+]
@@ -0,0 +1,585 @@
+"""Quantized copies of collection embeddings for two-stage search.
+
+A quantized index keeps a compact code per chunk in RAM and the full
+float32 vectors in a memory-mapped file next to it:
+- 1 bit per dimension (sign of the centered vector, compared by Hamming
+  distance): 32x smaller than float32
+- 8 bits per dimension (symmetric int8 per dimension, compared by dot
+  product): 4x smaller than float32
+
+A search scans the codes for the best candidates and rescores only those
+against the float32 vectors, which the OS pages in from disk on demand.
+Indexes live under <CHROMA_PERSIST_DIR>/quantized/<physical collection>/
+and are rebuilt from the collection when its chunk IDs change (chunk IDs
+are derived from their content) or the collection was recreated. The IDs
+are only compared after the collection's own catalog version changes.
+Queries never wait for a build: they keep using the previous index while a
+background thread (or the quantize command) refreshes it.
+"""
+
+import hashlib
+import json
+import math
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from chromadb.api.models.Collection import Collection
+
+from config import get_settings
+
+from .catalog import get_collection_version
+from .hnsw import get_hnsw_config
+from .registry import logical_name
+
+
+QUANTIZATION_BITS = (1, 8)
+
+_INDEX_DIRNAME = "quantized"
+_MANIFEST_FILENAME = "manifest.json"
+_LOAD_PAGE_SIZE = 5000
+# Rows quantized or scanned per step (small blocks stay in CPU cache)
+_BLOCK_ROWS = 4096
+# Number of set bits of every byte value, for Hamming distances on numpy < 2
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# Loaded indexes, keyed by (physical collection, bits)
+_indexes: Dict[Tuple[str, int], "QuantizedIndex"] = {}
+_indexes_lock = threading.Lock()
+# One lock per index, so building one doesn't block queries on the others
+_build_locks: Dict[Tuple[str, int], threading.Lock] = {}
+# Indexes being refreshed by a background thread
+_refreshing: Set[Tuple[str, int]] = set()
+
+
+class QuantizedIndex:
+    """Quantized codes of a collection plus its float32 vectors on disk.
+
+    Build one with QuantizedIndex.build() (or load_quantized_index() for a
+    ChromaDB collection) and open an existing one with QuantizedIndex(path).
+
+    Example:
+        >>> index = load_quantized_index(collection, bits=1)
+        >>> index.search(query_embedding, top_k=5, rescore_k=50)
+        [('3f2a...', 0.82), ...]
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open an index directory.
+
+        Args:
+            path: Directory written by QuantizedIndex.build().
+        """
+        self.path = Path(path)
+        with open(self.path / _MANIFEST_FILENAME, "r") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        self.bits: int = self.manifest["bits"]
+        self.space: str = self.manifest["space"]
+        self.count: int = self.manifest["count"]
+        self.source_id: str = self.manifest.get("collection_id", "")
+        self.ids_checksum: str = self.manifest.get("ids_checksum", "")
+        # Collection version the index was last known to match (-1 = never checked)
+        self.collection_version: int = self.manifest.get("collection_version", -1)
+        self.stacks: List[str] = self.manifest["stacks"]
+
+        # Compact arrays stay in RAM; ids and float32 vectors are paged in
+        self._codes = np.load(self.path / "codes.npy")
+        self._stack_codes = np.load(self.path / "stacks.npy")
+        self._transform = np.load(self.path / "transform.npy")
+        self._sq_norms = (
+            np.load(self.path / "sq_norms.npy")
+            if (self.path / "sq_norms.npy").exists()
+            else None
+        )
+        self._ids = np.load(self.path / "ids.npy", mmap_mode="r")
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+
+    def mark_current(self, collection_version: int) -> None:
+        """Record that the index still matches its collection at a version."""
+        self.collection_version = collection_version
+        self.manifest["collection_version"] = collection_version
+        with open(self.path / _MANIFEST_FILENAME, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held in RAM for the candidate pass."""
+        arrays = [self._codes, self._stack_codes, self._transform, self._sq_norms]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    @property
+    def full_precision_bytes(self) -> int:
+        """Bytes the float32 vectors would take in RAM."""
+        return self._vectors.nbytes
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        pages: Iterable[Tuple[Sequence[str], Any, Sequence[str]]],
+        count: int,
+        bits: int,
+        space: str,
+        source: str = "",
+        source_id: str = "",
+        collection_version: int = -1,
+    ) -> "QuantizedIndex":
+        """Write an index from pages of (ids, embeddings, stacks).
+
+        Args:
+            path: Directory to write (replaced if it exists).
+            pages: Chunk ids, embeddings and stacks, a page at a time.
+            count: Total number of rows in the pages.
+            bits: 1 (binary) or 8 (int8).
+            space: Distance space of the collection ("cosine", "l2" or "ip").
+            source: Name of the collection the vectors come from.
+            source_id: Id of that collection, to detect it being recreated.
+            collection_version: Catalog version of the collection, read
+                before the pages.
+
+        Returns:
+            The opened index.
+
+        Raises:
+            ValueError: If bits is not supported or the pages are empty.
+        """
+        if bits not in QUANTIZATION_BITS:
+            raise ValueError(
+                f"Unsupported quantization bits {bits}. "
+                f"Use one of: {', '.join(map(str, QUANTIZATION_BITS))}"
+            )
+        if count == 0:
+            raise ValueError("Cannot build a quantized index of an empty collection")
+
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        # Pass 1: copy the float32 vectors to disk
+        ids: List[str] = []
+        row_stacks: List[str] = []
+        vectors = None
+        for page_ids, page_embeddings, page_stacks in pages:
+            page = np.asarray(page_embeddings, dtype=np.float32)
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(
+                    tmp_path / "vectors.npy",
+                    mode="w+",
+                    dtype=np.float32,
+                    shape=(count, page.shape[1]),
+                )
+            vectors[len(ids) : len(ids) + len(page)] = page
+            ids.extend(page_ids)
+            row_stacks.extend(page_stacks)
+        if vectors is None or len(ids) != count:
+            raise ValueError(f"Expected {count} vectors, got {len(ids)}")
+        vectors.flush()
+
+        stacks = sorted(set(row_stacks))
+        stack_ids = {stack: i for i, stack in enumerate(stacks)}
+        np.save(tmp_path / "ids.npy", np.array(ids, dtype=np.bytes_))
+        np.save(
+            tmp_path / "stacks.npy",
+            np.array([stack_ids[stack] for stack in row_stacks], dtype=np.uint16),
+        )
+
+        # Pass 2: per-dimension statistics (mean for binary, max |x| for int8)
+        dimension = vectors.shape[1]
+        if bits == 1:
+            total = np.zeros(dimension, dtype=np.float64)
+            for block in _blocks(vectors, space):
+                total += block.sum(axis=0)
+            transform = (total / count).astype(np.float32)
+        else:
+            peak = np.zeros(dimension, dtype=np.float32)
+            for block in _blocks(vectors, space):
+                peak = np.maximum(peak, np.abs(block).max(axis=0))
+            transform = (peak / 127).clip(1e-12)
+        np.save(tmp_path / "transform.npy", transform)
+
+        # Pass 3: quantize
+        if bits == 1:
+            # Padded to whole 64-bit words so Hamming distances use uint64 popcounts
+            codes = np.zeros((count, 8 * math.ceil(dimension / 64)), dtype=np.uint8)
+        else:
+            codes = np.empty((count, dimension), dtype=np.int8)
+        start = 0
+        for block in _blocks(vectors, space):
+            code = _quantize(block, bits, transform)
+            codes[start : start + len(block), : code.shape[1]] = code
+            start += len(block)
+        np.save(tmp_path / "codes.npy", codes)
+        if bits == 8 and space == "l2":
+            # Needed to rank candidates by -||q - x||^2 = 2 q.x - ||x||^2 - ||q||^2
+            sq_norms = np.concatenate(
+                [
+                    np.sum((block.astype(np.float32) * transform) ** 2, axis=1)
+                    for block in np.array_split(codes, max(1, count // _BLOCK_ROWS))
+                ]
+            )
+            np.save(tmp_path / "sq_norms.npy", sq_norms.astype(np.float32))
+        del vectors
+
+        with open(tmp_path / _MANIFEST_FILENAME, "w") as f:
+            json.dump(
+                {
+                    "collection": source,
+                    "collection_id": source_id,
+                    "ids_checksum": _ids_checksum(ids),
+                    "collection_version": collection_version,
+                    "count": count,
+                    "dimension": dimension,
+                    "bits": bits,
+                    "space": space,
+                    "stacks": stacks,
+                },
+                f,
+                indent=2,
+            )
+
+        shutil.rmtree(path, ignore_errors=True)
+        tmp_path.rename(path)
+        return cls(path)
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        rescore_k: int,
+        stacks: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Find the nearest chunks with a quantized pass and float32 rescoring.
+
+        Args:
+            embedding: Query embedding.
+            top_k: Number of chunks to return.
+            rescore_k: Candidates from the quantized pass rescored in float32.
+            stacks: Only search chunks of these stacks (None = all).
+
+        Returns:
+            List of (chunk id, similarity) tuples, best first. Similarities
+            are exp(-distance), the same scores ChromaVectorStore returns.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        rows = None
+        if stacks is not None:
+            wanted = [
+                self.stacks.index(stack) for stack in stacks if stack in self.stacks
+            ]
+            rows = np.flatnonzero(np.isin(self._stack_codes, wanted))
+            if rows.size == 0:
+                return []
+
+        candidates = self._candidates(query, max(rescore_k, top_k), rows)
+        return self._rescore(query, candidates, top_k)
+
+    def _candidates(
+        self, query: np.ndarray, limit: int, rows: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Rows with the best approximate scores, ranked on the codes only."""
+        codes = self._codes if rows is None else self._codes[rows]
+        query = _normalize(query[None, :], self.space)[0]
+        if self.bits == 1:
+            query_code = np.zeros(self._codes.shape[1], dtype=np.uint8)
+            code = _quantize(query[None, :], 1, self._transform)[0]
+            query_code[: len(code)] = code
+        else:
+            query_code = query * self._transform
+
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _BLOCK_ROWS):
+            block = codes[start : start + _BLOCK_ROWS]
+            if self.bits == 1:
+                # Fewer differing bits = closer
+                scores[start : start + len(block)] = -_hamming(block, query_code)
+            else:
+                scores[start : start + len(block)] = (
+                    block.astype(np.float32) @ query_code
+                )
+        if self.bits == 8 and self.space == "l2":
+            sq_norms = self._sq_norms if rows is None else self._sq_norms[rows]
+            scores = 2 * scores - sq_norms
+
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        return top if rows is None else rows[top]
+
+    def _rescore(
+        self, query: np.ndarray, candidates: np.ndarray, top_k: int
+    ) -> List[Tuple[str, float]]:
+        """Exact distances of the candidates, read from the float32 vectors."""
+        candidates = np.sort(candidates)  # Sequential reads from the memmap
+        vectors = np.asarray(self._vectors[candidates])
+        if self.space == "l2":
+            distances = np.sum((vectors - query) ** 2, axis=1)
+        else:
+            if self.space == "cosine":
+                vectors = _normalize(vectors, self.space)
+                query = _normalize(query[None, :], self.space)[0]
+            distances = 1 - vectors @ query
+
+        order = np.argsort(distances)[:top_k]
+        return [
+            (self._ids[candidates[i]].decode(), math.exp(-float(distances[i])))
+            for i in order
+        ]
+
+
+def _normalize(vectors: np.ndarray, space: str) -> np.ndarray:
+    """Scale rows to unit length in the cosine space (unchanged otherwise)."""
+    if space != "cosine":
+        return vectors
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(1e-12)
+
+
+def _blocks(vectors: np.ndarray, space: str) -> Iterable[np.ndarray]:
+    """Read the float32 vectors a block of rows at a time."""
+    for start in range(0, len(vectors), _BLOCK_ROWS):
+        yield _normalize(np.asarray(vectors[start : start + _BLOCK_ROWS]), space)
+
+
+def _hamming(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    """Number of differing bits between each row of codes and the query code."""
+    if hasattr(np, "bitwise_count"):
+        words = np.bitwise_xor(codes.view(np.uint64), query_code.view(np.uint64))
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int32)
+
+
+def _quantize(vectors: np.ndarray, bits: int, transform: np.ndarray) -> np.ndarray:
+    """Quantize rows: sign bits around the mean, or int8 with per-dimension scale."""
+    if bits == 1:
+        return np.packbits(vectors > transform, axis=1)
+    return np.clip(np.rint(vectors / transform), -127, 127).astype(np.int8)
+
+
+def _index_path(physical_name: str, bits: int) -> Path:
+    """Get the directory of a collection's quantized index."""
+    return (
+        get_settings().get_chroma_path() / _INDEX_DIRNAME / physical_name / f"b{bits}"
+    )
+
+
+def _collection_pages(
+    collection: Collection,
+) -> Iterable[Tuple[List[str], List[Any], List[str]]]:
+    """Read ids, embeddings and stacks of a collection a page at a time."""
+    count = collection.count()
+    for offset in range(0, count, _LOAD_PAGE_SIZE):
+        page = collection.get(
+            include=["embeddings", "metadatas"], limit=_LOAD_PAGE_SIZE, offset=offset
+        )
+        yield (
+            page["ids"],
+            page["embeddings"],
+            [(metadata or {}).get("stack", "") for metadata in page["metadatas"]],
+        )
+
+
+def _ids_checksum(ids: Iterable[str]) -> str:
+    """Hash a set of chunk IDs (independent of their order)."""
+    digest = hashlib.sha256()
+    for chunk_id in sorted(ids):
+        digest.update(chunk_id.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _collection_ids(collection: Collection) -> List[str]:
+    """Read the chunk IDs of a collection a page at a time."""
+    ids: List[str] = []
+    offset = 0
+    while True:
+        page = collection.get(include=[], limit=_LOAD_PAGE_SIZE, offset=offset)
+        ids.extend(page["ids"])
+        if len(page["ids"]) < _LOAD_PAGE_SIZE:
+            return ids
+        offset += _LOAD_PAGE_SIZE
+
+
+def _remove_old_versions(physical_name: str) -> None:
+    """Delete the indexes of other versions of the same logical collection."""
+    root = get_settings().get_chroma_path() / _INDEX_DIRNAME
+    for path in root.iterdir():
+        if path.name != physical_name and logical_name(path.name) == logical_name(
+            physical_name
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def drop_quantized_index(physical_name: str) -> None:
+    """Delete the quantized indexes of a physical collection (all bit widths)."""
+    with _indexes_lock:
+        for key in [key for key in _indexes if key[0] == physical_name]:
+            del _indexes[key]
+        for key in [key for key in _build_locks if key[0] == physical_name]:
+            del _build_locks[key]
+    shutil.rmtree(
+        get_settings().get_chroma_path() / _INDEX_DIRNAME / physical_name,
+        ignore_errors=True,
+    )
+
+
+def _open_index(path: Path) -> Optional[QuantizedIndex]:
+    """Open an index directory, or None if there is no complete index in it."""
+    try:
+        return QuantizedIndex(path)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def refresh_quantized_index(collection: Collection, bits: int) -> QuantizedIndex:
+    """Bring the quantized index of a collection up to date, building it if needed.
+
+    Once the collection's catalog version has changed, its chunk IDs are
+    compared with the ones the index was built from and the index is
+    rebuilt if they (or the collection id) differ. Blocks until done, while
+    queries keep using the previous index; refreshes of the same index run
+    one at a time.
+
+    Args:
+        collection: ChromaDB collection (a physical version).
+        bits: 1 (binary) or 8 (int8).
+
+    Returns:
+        The up-to-date index.
+
+    Raises:
+        RuntimeError: If the index cannot be built
+    """
+    # Read before the chunks, so a change made meanwhile triggers a new check
+    collection_version = get_collection_version(collection.name)
+    source_id = str(collection.id)
+    key = (collection.name, bits)
+    with _indexes_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        path = _index_path(collection.name, bits)
+        index = _indexes.get(key) or _open_index(path)
+        if index is not None and index.source_id != source_id:
+            index = None  # Built from a previous collection with the same name
+        if index is not None and index.collection_version != collection_version:
+            if index.ids_checksum == _ids_checksum(_collection_ids(collection)):
+                index.mark_current(collection_version)
+            else:
+                index = None
+
+        if index is None:
+            count = collection.count()
+            print(
+                f"[QUANTIZED] Building {bits}-bit index of '{collection.name}' "
+                f"({count} chunks)...",
+                flush=True,
+            )
+            try:
+                index = QuantizedIndex.build(
+                    path,
+                    _collection_pages(collection),
+                    count=count,
+                    bits=bits,
+                    space=get_hnsw_config(collection.name)["space"],
+                    source=collection.name,
+                    source_id=source_id,
+                    collection_version=collection_version,
+                )
+                _remove_old_versions(collection.name)
+            except Exception as e:
+                raise RuntimeError(
+                    f"Failed to build quantized index of '{collection.name}': {str(e)}"
+                ) from e
+            print(
+                f"[QUANTIZED] ✓ {index.memory_bytes / 1_000_000:.1f} MB in memory "
+                f"(float32: {index.full_precision_bytes / 1_000_000:.1f} MB)",
+                flush=True,
+            )
+
+        with _indexes_lock:
+            _indexes[key] = index
+        return index
+
+
+def schedule_quantized_refresh(
+    collection: Collection, bits: int
+) -> Optional[threading.Thread]:
+    """Refresh the quantized index of a collection in a background thread.
+
+    Args:
+        collection: ChromaDB collection (a physical version).
+        bits: 1 (binary) or 8 (int8).
+
+    Returns:
+        The started daemon thread, or None if a refresh of the same index
+        is already running.
+    """
+    key = (collection.name, bits)
+    with _indexes_lock:
+        if key in _refreshing:
+            return None
+        _refreshing.add(key)
+
+    def _run() -> None:
+        try:
+            refresh_quantized_index(collection, bits)
+        except Exception as e:
+            print(f"[QUANTIZED] Warning: background refresh failed: {e}", flush=True)
+        finally:
+            with _indexes_lock:
+                _refreshing.discard(key)
+
+    thread = threading.Thread(
+        target=_run, name=f"quantize-{collection.name}-b{bits}", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def load_quantized_index(collection: Collection, bits: int) -> Optional[QuantizedIndex]:
+    """Get the quantized index of a collection without waiting for a build.
+
+    The index is reused as long as it was built from this collection. When
+    the collection changed since (its catalog version differs), the
+    previous index keeps serving while a background refresh brings it up
+    to date: chunks deleted meanwhile are skipped by the caller and new
+    chunks show up once the refresh is done.
+
+    Args:
+        collection: ChromaDB collection (a physical version).
+        bits: 1 (binary) or 8 (int8).
+
+    Returns:
+        The latest index, or None if none has been built yet (one is being
+        built in the background).
+    """
+    collection_version = get_collection_version(collection.name)
+    source_id = str(collection.id)
+    key = (collection.name, bits)
+    index = _indexes.get(key)
+    if index is None:
+        index = _open_index(_index_path(collection.name, bits))
+        if index is not None:
+            with _indexes_lock:
+                index = _indexes.setdefault(key, index)
+
+    # An index of a previous collection with the same name is of no use
+    if index is not None and index.source_id != source_id:
+        index = None
+    if index is None or index.collection_version != collection_version:
+        schedule_quantized_refresh(collection, bits)
+    return index
+
+
+__all__ = [
+    "QUANTIZATION_BITS",
+    "QuantizedIndex",
+    "load_quantized_index",
+    "refresh_quantized_index",
+    "schedule_quantized_refresh",
+    "drop_quantized_index",
+]
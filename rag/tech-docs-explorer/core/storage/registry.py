@@ -0,0 +1,315 @@
+"""Collection alias registry.
+
+This module maps logical collection names (e.g. "tech_docs") to versioned
+physical ChromaDB collections so the index can be rebuilt blue-green:
+- Resolving a logical name to its active physical collection
+- Generating new versioned physical collection names
+- Atomically swapping an alias to a new physical collection
+- Recording the per-stack shards of a sharded logical collection
+- Tracking versions that are still being built, so they are never
+  garbage-collected mid-rebuild
+- Tracking collections retired by a database reset until they are deleted,
+  so a process exiting during the grace period doesn't leak them
+
+The registry is a small JSON file stored next to the ChromaDB data. Writes go
+through a temporary file plus os.replace(), so readers always see either the
+old or the new mapping, never a partial one. Every read-modify-write holds an
+OS lock on a sidecar file, so processes sharing the directory don't lose each
+other's updates; in http mode every worker must therefore use the same
+CHROMA_PERSIST_DIR (on the same machine). Every write bumps the data version,
+since it changes which chunks are visible.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional
+
+from config import get_settings
+
+from .catalog import bump_data_version
+
+
+_REGISTRY_FILENAME = "collection_registry.json"
+# Separator between the logical name and the version suffix of physical collections
+VERSION_SEPARATOR = "__v"
+# Serializes read-modify-write cycles between the threads of this process
+# (flock() locks belong to the open file, so threads need their own lock)
+_registry_lock = threading.Lock()
+
+
+def _registry_path() -> Path:
+    """Get the path of the registry file inside the ChromaDB directory."""
+    return get_settings().get_chroma_path() / _REGISTRY_FILENAME
+
+
+@contextmanager
+def _locked_registry() -> Generator[None, None, None]:
+    """Hold the registry lock of this process and of every other one.
+
+    The lock is taken on a sidecar file, since the registry file itself is
+    replaced on every write.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        fcntl = None
+
+    lock_path = _registry_path().with_suffix(".lock")
+    with _registry_lock, open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read_registry() -> Dict[str, Any]:
+    """Read the registry file, returning an empty registry if it doesn't exist."""
+    path = _registry_path()
+    try:
+        with open(path, "r") as f:
+            registry = json.load(f)
+    except FileNotFoundError:
+        registry = {}
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Corrupted collection registry at {path}: {e}") from e
+
+    registry.setdefault("aliases", {})
+    registry.setdefault("shards", {})
+    registry.setdefault("building", {})
+    registry.setdefault("retired", {})
+    return registry
+
+
+def _write_registry(registry: Dict[str, Any]) -> None:
+    """Atomically replace the registry file with the given content."""
+    path = _registry_path()
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    bump_data_version()
+
+
+def resolve_collection(name: str) -> str:
+    """Resolve a logical collection name to its active physical collection.
+
+    Names without an alias resolve to themselves, so collections created
+    before versioning existed keep working unchanged.
+
+    Args:
+        name: Logical (or physical) collection name.
+
+    Returns:
+        Name of the physical ChromaDB collection to use.
+
+    Examples:
+        >>> resolve_collection("tech_docs")
+        'tech_docs__v20260101120000000000'
+    """
+    return _read_registry()["aliases"].get(name, name)
+
+
+def get_alias(name: str) -> Optional[str]:
+    """Get the physical collection an alias points to, or None if not aliased."""
+    return _read_registry()["aliases"].get(name)
+
+
+def new_version_name(name: str) -> str:
+    """Generate a new, unique physical collection name for a logical name.
+
+    Args:
+        name: Logical collection name (e.g. "tech_docs").
+
+    Returns:
+        Versioned physical name (e.g. "tech_docs__v20260101120000000000").
+    """
+    return f"{name}{VERSION_SEPARATOR}{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+
+def is_version_of(physical_name: str, name: str) -> bool:
+    """Check whether a physical collection belongs to a logical name.
+
+    Both versioned collections and the legacy unversioned collection (named
+    exactly like the logical name) are considered versions.
+    """
+    return physical_name == name or physical_name.startswith(
+        f"{name}{VERSION_SEPARATOR}"
+    )
+
+
+def logical_name(physical_name: str) -> str:
+    """Get the logical name of a physical collection (itself if unversioned).
+
+    Examples:
+        >>> logical_name("tech_docs__v20260101120000000000")
+        'tech_docs'
+    """
+    return physical_name.split(VERSION_SEPARATOR, 1)[0]
+
+
+def swap_alias(name: str, physical_name: str) -> Optional[str]:
+    """Atomically point a logical name to a new physical collection.
+
+    Args:
+        name: Logical collection name.
+        physical_name: Physical collection that becomes active.
+
+    Returns:
+        The previously active physical collection, or None if there was no alias.
+
+    Raises:
+        RuntimeError: If the collection was retired by a database reset, so
+            it is about to be deleted.
+    """
+    with _locked_registry():
+        registry = _read_registry()
+        if physical_name in registry["retired"]:
+            raise RuntimeError(
+                f"Can't activate '{physical_name}': it was retired by a database reset"
+            )
+        previous = registry["aliases"].get(name)
+        registry["aliases"][name] = physical_name
+        _write_registry(registry)
+
+    print(f"[REGISTRY] Alias '{name}' -> '{physical_name}' (previous: {previous})")
+    return previous
+
+
+def register_shard(name: str, stack: str, shard_name: str) -> None:
+    """Record that a stack of a logical collection lives in its own shard.
+
+    Args:
+        name: Logical collection name (e.g. "tech_docs").
+        stack: Stack stored in the shard.
+        shard_name: Logical name of the shard collection.
+    """
+    with _locked_registry():
+        registry = _read_registry()
+        shards = registry["shards"].setdefault(name, {})
+        if shards.get(stack) == shard_name:
+            return
+        shards[stack] = shard_name
+        _write_registry(registry)
+
+    print(f"[REGISTRY] Shard '{shard_name}' registered for stack '{stack}' of '{name}'")
+
+
+def mark_building(physical_name: str) -> None:
+    """Record that a version is being built by this process."""
+    with _locked_registry():
+        registry = _read_registry()
+        registry["building"][physical_name] = {
+            "pid": os.getpid(),
+            "started_at": datetime.now().isoformat(),
+        }
+        _write_registry(registry)
+
+
+def unmark_building(physical_name: str) -> None:
+    """Record that a version is no longer being built (activated or dropped)."""
+    with _locked_registry():
+        registry = _read_registry()
+        if registry["building"].pop(physical_name, None) is not None:
+            _write_registry(registry)
+
+
+def _is_running(pid: int) -> bool:
+    """Check whether a process of this machine is still alive."""
+    if os.name == "nt":
+        # os.kill() terminates processes on Windows: assume the build is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_building() -> List[str]:
+    """Get the versions still being built by a live process.
+
+    Builds whose process has died are left out, so their abandoned
+    collections can be garbage-collected.
+    """
+    building = _read_registry()["building"]
+    return [name for name, build in building.items() if _is_running(build["pid"])]
+
+
+def get_shards(name: str) -> Dict[str, str]:
+    """Get the shards of a logical collection as a {stack: shard_name} dict."""
+    return dict(_read_registry()["shards"].get(name, {}))
+
+
+def get_retired() -> Dict[str, Dict[str, str]]:
+    """Get the retired collections waiting to be deleted.
+
+    Returns:
+        {physical name: {"id": collection id, "retired_at": ISO timestamp}}.
+    """
+    return dict(_read_registry()["retired"])
+
+
+def forget_retired(physical_names: List[str]) -> None:
+    """Stop tracking retired collections (deleted, or replaced by a new one)."""
+    with _locked_registry():
+        registry = _read_registry()
+        removed = [registry["retired"].pop(name, None) for name in physical_names]
+        if any(entry is not None for entry in removed):
+            _write_registry(registry)
+
+
+def clear_registry(
+    aliases: Optional[Dict[str, str]] = None,
+    retired: Optional[Dict[str, str]] = None,
+) -> None:
+    """Remove every shard and replace every alias in a single write.
+
+    Args:
+        aliases: {logical name: physical collection} aliases to keep. By
+            default none, so logical names resolve to themselves again.
+        retired: {physical name: collection id} of collections to delete
+            once the grace period is over (see get_retired()).
+    """
+    retired_at = datetime.now().isoformat()
+    with _locked_registry():
+        registry = _read_registry()
+        registry["aliases"] = dict(aliases or {})
+        registry["shards"] = {}
+        for name, collection_id in (retired or {}).items():
+            registry["retired"][name] = {
+                "id": str(collection_id),
+                "retired_at": retired_at,
+            }
+        _write_registry(registry)
+
+    print(f"[REGISTRY] Shards cleared, aliases reset to: {aliases or {}}")
+
+
+__all__ = [
+    "VERSION_SEPARATOR",
+    "resolve_collection",
+    "get_alias",
+    "new_version_name",
+    "is_version_of",
+    "logical_name",
+    "swap_alias",
+    "register_shard",
+    "get_shards",
+    "mark_building",
+    "unmark_building",
+    "get_building",
+    "get_retired",
+    "forget_retired",
+    "clear_registry",
+]
@@ -0,0 +1,133 @@
+"""Per-stack collection shards.
+
+With storage.shard_by_stack enabled, the chunks of each stack are written to
+their own logical collection (e.g. "tech_docs__s_fastapi") instead of the
+shared one, so each HNSW graph only holds one stack:
+- Routing chunks to the shard of their stack when indexing
+- Choosing the collections a query has to search for a set of stacks
+- Listing every collection that belongs to a logical collection
+
+Shards are ordinary logical collections: they are versioned through the
+alias registry, so a single stack can be rebuilt blue-green while the other
+shards keep serving. Chunks without a stack, and chunks indexed before
+sharding was enabled, stay in the unsharded base collection, which is still
+searched (filtered by stack).
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import get_settings
+
+from .registry import VERSION_SEPARATOR, get_shards, register_shard
+
+
+# Separator between the logical name and the stack of shard collections
+SHARD_SEPARATOR = "__s_"
+
+
+def shard_name(name: str, stack: str) -> str:
+    """Get the logical collection name of a stack's shard.
+
+    Stacks are lower-cased and reduced to characters ChromaDB accepts in
+    collection names; a short hash keeps altered names (e.g. "C++") unique.
+
+    Examples:
+        >>> shard_name("tech_docs", "FastAPI")
+        'tech_docs__s_fastapi'
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", stack.lower()).strip("-")
+    if slug != stack.lower():
+        slug = f"{slug or 'stack'}-{hashlib.sha1(stack.encode()).hexdigest()[:6]}"
+    return f"{name}{SHARD_SEPARATOR}{slug}"
+
+
+def is_shardable(name: str) -> bool:
+    """Check whether writes to a collection are split into per-stack shards.
+
+    Only root logical names are sharded, and only with storage.shard_by_stack
+    enabled; shards and physical versions are written to as-is.
+    """
+    return (
+        get_settings().shard_by_stack
+        and VERSION_SEPARATOR not in name
+        and SHARD_SEPARATOR not in name
+    )
+
+
+def route_by_stack(
+    name: str,
+    stacks: Iterable[str],
+    shard_targets: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    """Map each stack to the collection its chunks are written to.
+
+    Args:
+        name: Collection the caller is indexing into.
+        stacks: Stacks of the chunks being written ("" for chunks without one).
+        shard_targets: Explicit collection per stack, e.g. the new versions
+            yielded by rebuild_stacks(). Takes precedence over routing.
+
+    Returns:
+        Dictionary of {stack: collection_name}. New shards are registered.
+
+    Raises:
+        ValueError: If shard_targets has no collection for one of the stacks.
+    """
+    routes: Dict[str, str] = {}
+    for stack in set(stacks):
+        if shard_targets is not None:
+            if stack not in shard_targets:
+                raise ValueError(f"No target collection for stack '{stack}'")
+            routes[stack] = shard_targets[stack]
+        elif stack and is_shardable(name):
+            routes[stack] = shard_name(name, stack)
+            register_shard(name, stack, routes[stack])
+        else:
+            routes[stack] = name
+    return routes
+
+
+def collection_names(name: str) -> List[str]:
+    """Get a logical collection and all its shards (the base collection first)."""
+    return [name, *sorted(get_shards(name).values())]
+
+
+def search_targets(
+    name: str, stacks: Optional[Sequence[str]] = None
+) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Get the collections a query has to search, with their where filters.
+
+    Args:
+        name: Logical collection name.
+        stacks: Stacks to search, or None/empty for all of them.
+
+    Returns:
+        List of (collection_name, where) tuples. Shards of the selected
+        stacks need no filter; the base collection is filtered by stack
+        when stacks are given.
+
+    Examples:
+        >>> search_targets("tech_docs", ["fastapi"])
+        [('tech_docs', {'stack': {'$in': ['fastapi']}}), ('tech_docs__s_fastapi', None)]
+    """
+    shards = get_shards(name)
+    if not stacks:
+        return [(name, None)] + [(shard, None) for shard in sorted(shards.values())]
+
+    targets: List[Tuple[str, Optional[Dict[str, Any]]]] = [
+        (name, {"stack": {"$in": list(stacks)}})
+    ]
+    targets.extend((shards[stack], None) for stack in stacks if stack in shards)
+    return targets
+
+
+__all__ = [
+    "SHARD_SEPARATOR",
+    "shard_name",
+    "is_shardable",
+    "route_by_stack",
+    "collection_names",
+    "search_targets",
+]
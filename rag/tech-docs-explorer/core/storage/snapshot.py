@@ -0,0 +1,368 @@
+"""Collection snapshots.
+
+This module exports a collection, with all its per-stack shards, to a
+compact columnar snapshot and loads it back into a fresh store, so a new
+node can start with a full index without re-embedding any document. Each
+collection is written to its own subdirectory:
+- chunks.parquet: chunk ids, texts and metadata (as JSON)
+- embeddings.npy: embedding matrix in float16 or float32, row-aligned
+  with chunks.parquet
+
+plus a top-level manifest.json with the collections, their chunk counts,
+and the embedding provider, model and dimension the vectors were produced
+with.
+
+Imports go through blue-green rebuilds, so the loaded snapshot replaces the
+active collection and its shards once every chunk is in. Progress is
+logged, never printed, so commands can write their result to stdout.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from chromadb.api.models.Collection import Collection
+
+from .catalog import record_chunks
+from .client import get_chroma_client
+from .collections import blue_green_rebuild, get_or_create_collection, index_settings
+from .registry import get_shards, register_shard
+from .shards import collection_names, shard_name
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+_CHUNKS_FILENAME = "chunks.parquet"
+_EMBEDDINGS_FILENAME = "embeddings.npy"
+_MANIFEST_FILENAME = "manifest.json"
+_SUPPORTED_DTYPES = ("float16", "float32")
+# Chunks read per request when exporting
+_EXPORT_PAGE_SIZE = 5000
+
+_CHUNKS_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("document", pa.string()),
+        ("metadata", pa.string()),
+    ]
+)
+
+
+def _export_collection(
+    collection: Collection, output_dir: Path, dtype: str
+) -> Tuple[int, int]:
+    """Write the chunks and embeddings of one collection.
+
+    Returns:
+        Tuple of (chunks exported, embedding dimension). Nothing is written
+        for an empty collection, which returns (0, 0).
+    """
+    count = collection.count()
+    if count == 0:
+        return 0, 0
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    embeddings: np.ndarray = np.empty((0, 0), dtype=dtype)
+    exported = 0
+    with pq.ParquetWriter(
+        output_dir / _CHUNKS_FILENAME, _CHUNKS_SCHEMA, compression="zstd"
+    ) as writer:
+        while exported < count:
+            page = collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=_EXPORT_PAGE_SIZE,
+                offset=exported,
+            )
+            if not page["ids"]:
+                break
+
+            vectors = np.asarray(page["embeddings"], dtype=np.float32)
+            if exported == 0:
+                embeddings = np.empty((count, vectors.shape[1]), dtype=dtype)
+            embeddings[exported : exported + len(vectors)] = vectors
+
+            writer.write_table(
+                pa.table(
+                    {
+                        "id": page["ids"],
+                        "document": [doc or "" for doc in page["documents"]],
+                        "metadata": [
+                            json.dumps(metadata or {}) for metadata in page["metadatas"]
+                        ],
+                    },
+                    schema=_CHUNKS_SCHEMA,
+                )
+            )
+            exported += len(page["ids"])
+
+    np.save(output_dir / _EMBEDDINGS_FILENAME, embeddings[:exported])
+    return exported, int(embeddings.shape[1])
+
+
+def export_snapshot(
+    output_dir: Union[str, Path],
+    collection_name: str = "tech_docs",
+    dtype: str = "float16",
+) -> Dict[str, Any]:
+    """Export a collection and its shards to a snapshot directory.
+
+    Args:
+        output_dir: Directory to write the snapshot into (created if missing).
+        collection_name: Logical collection to export, with all its shards.
+        dtype: Embedding storage type, "float16" (half the size) or "float32".
+
+    Returns:
+        The snapshot manifest.
+
+    Raises:
+        ValueError: If dtype is not supported, the collection and its shards
+            are empty, or they hold embeddings of different dimensions.
+
+    Examples:
+        >>> manifest = export_snapshot("snapshots/2026-01-01")
+        >>> print(f"{manifest['count']} chunks exported")
+    """
+    if dtype not in _SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {_SUPPORTED_DTYPES}")
+
+    start_time = time.time()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stacks = {shard: stack for stack, shard in get_shards(collection_name).items()}
+    entries = []
+    dimensions = set()
+    for name in collection_names(collection_name):
+        collection = get_or_create_collection(name)
+        count, dimension = _export_collection(collection, output_dir / name, dtype)
+        if dimension:
+            dimensions.add(dimension)
+        entries.append(
+            {
+                "name": name,
+                "stack": stacks.get(name),
+                "source_collection": collection.name,
+                "collection_metadata": collection.metadata or {},
+                "count": count,
+            }
+        )
+        logger.info(f"[SNAPSHOT] Exported {count} chunks of '{name}'")
+
+    total = sum(entry["count"] for entry in entries)
+    if total == 0:
+        raise ValueError(f"Collection '{collection_name}' is empty")
+    if len(dimensions) > 1:
+        raise ValueError(
+            f"Collections of '{collection_name}' hold embeddings of different "
+            f"dimensions: {sorted(dimensions)}"
+        )
+
+    settings = index_settings()
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "collection": collection_name,
+        "collections": entries,
+        "count": total,
+        "dimension": dimensions.pop(),
+        "dtype": dtype,
+        "embedding_provider": settings["index:embedding_provider"],
+        "embedding_model": settings["index:embedding_model"],
+        "created_at": datetime.now().isoformat(),
+    }
+    with open(output_dir / _MANIFEST_FILENAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(
+        f"[SNAPSHOT] Exported {total} chunks from {len(entries)} collection(s) "
+        f"to {output_dir} in {time.time() - start_time:.2f}s"
+    )
+    return manifest
+
+
+def read_manifest(snapshot_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Read and validate the manifest of a snapshot directory.
+
+    Raises:
+        ValueError: If the directory is not a snapshot or its format is unsupported.
+    """
+    path = Path(snapshot_dir) / _MANIFEST_FILENAME
+    if not path.is_file():
+        raise ValueError(
+            f"Not a snapshot directory (missing {path.name}): {snapshot_dir}"
+        )
+
+    with open(path, "r") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format version: {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def _check_embeddings(manifest: Dict[str, Any]) -> None:
+    """Refuse a snapshot whose vectors the configured embeddings can't query.
+
+    Raises:
+        ValueError: If the snapshot was embedded with another provider,
+            model or dimension than the configured ones.
+    """
+    settings = index_settings()
+    provider = settings["index:embedding_provider"]
+    model = settings["index:embedding_model"]
+    dimension = settings["index:embedding_dim"]
+    if (manifest["embedding_provider"], manifest["embedding_model"]) != (
+        provider,
+        model,
+    ):
+        raise ValueError(
+            f"Snapshot was embedded with '{manifest['embedding_model']}' "
+            f"({manifest['embedding_provider']}) but the configured model is "
+            f"'{model}' ({provider}); queries would not match"
+        )
+    # The dimension is only known from settings for some models
+    if dimension and manifest["dimension"] != dimension:
+        raise ValueError(
+            f"Snapshot embeddings have {manifest['dimension']} dimensions but the "
+            f"configured model produces {dimension}"
+        )
+
+
+def _load_collection(
+    entry_dir: Path, collection: Collection, count: int, batch_size: int
+) -> int:
+    """Insert the chunks of one exported collection.
+
+    Returns:
+        Number of chunks loaded.
+    """
+    # Memory-mapped so large snapshots are converted one batch at a time
+    embeddings = np.load(entry_dir / _EMBEDDINGS_FILENAME, mmap_mode="r")
+    chunks_file = pq.ParquetFile(entry_dir / _CHUNKS_FILENAME)
+    if embeddings.shape[0] != chunks_file.metadata.num_rows:
+        raise ValueError(
+            f"Snapshot is inconsistent: {chunks_file.metadata.num_rows} chunks but "
+            f"{embeddings.shape[0]} embeddings in {entry_dir.name}"
+        )
+
+    loaded = 0
+    for batch in chunks_file.iter_batches(batch_size=batch_size):
+        columns = batch.to_pydict()
+        metadatas = [json.loads(metadata) for metadata in columns["metadata"]]
+        collection.add(
+            ids=columns["id"],
+            documents=columns["document"],
+            metadatas=[metadata or None for metadata in metadatas],
+            embeddings=np.asarray(
+                embeddings[loaded : loaded + len(columns["id"])], dtype=np.float32
+            ),
+        )
+        record_chunks(collection, metadatas)
+        loaded += len(columns["id"])
+        logger.info(f"[SNAPSHOT] Loaded {loaded}/{count} chunks of '{entry_dir.name}'")
+    return loaded
+
+
+def import_snapshot(
+    snapshot_dir: Union[str, Path],
+    collection_name: str = "tech_docs",
+    batch_size: int = 0,
+) -> Dict[str, Any]:
+    """Bulk-load a snapshot into new versions of a collection and its shards.
+
+    The chunks are inserted in large batches into fresh blue-green versions,
+    which become active only after every chunk of every collection has been
+    loaded. Each version is created with the HNSW parameters of the
+    exported collection. The snapshot replaces the whole collection:
+    documents not in the snapshot are dropped, including the ones of local
+    shards the snapshot doesn't have.
+
+    Args:
+        snapshot_dir: Directory written by export_snapshot().
+        collection_name: Logical collection to replace with the snapshot.
+        batch_size: Chunks per insert. 0 uses the largest batch the ChromaDB
+            client accepts.
+
+    Returns:
+        Dictionary with the loaded count, the new physical collections and
+        the time taken.
+
+    Raises:
+        ValueError: If the snapshot is invalid or was embedded with a
+            different provider, model or dimension than the configured ones.
+
+    Examples:
+        >>> result = import_snapshot("snapshots/2026-01-01")
+        >>> print(f"{result['count']} chunks loaded into {result['collections']}")
+    """
+    start_time = time.time()
+    snapshot_dir = Path(snapshot_dir)
+    manifest = read_manifest(snapshot_dir)
+    _check_embeddings(manifest)
+
+    batch_size = batch_size or get_chroma_client().get_max_batch_size()
+    # Shards are renamed after the collection the snapshot is imported into
+    targets = {
+        entry["name"]: (
+            shard_name(collection_name, entry["stack"])
+            if entry["stack"]
+            else collection_name
+        )
+        for entry in manifest["collections"]
+    }
+    # Local shards missing from the snapshot are replaced by empty versions
+    emptied = [
+        name
+        for name in collection_names(collection_name)[1:]
+        if name not in targets.values()
+    ]
+
+    loaded = 0
+    physical_names: Dict[str, str] = {}
+    with ExitStack() as rebuilds:
+        for entry in manifest["collections"]:
+            target = targets[entry["name"]]
+            # A collection exported without metadata has none to restore: use config.yaml
+            physical_name = rebuilds.enter_context(
+                blue_green_rebuild(
+                    target, metadata=entry["collection_metadata"] or None
+                )
+            )
+            physical_names[target] = physical_name
+            if entry["count"]:
+                loaded += _load_collection(
+                    snapshot_dir / entry["name"],
+                    get_or_create_collection(physical_name),
+                    entry["count"],
+                    batch_size,
+                )
+        for name in emptied:
+            physical_names[name] = rebuilds.enter_context(blue_green_rebuild(name))
+
+    for entry in manifest["collections"]:
+        if entry["stack"]:
+            register_shard(collection_name, entry["stack"], targets[entry["name"]])
+
+    elapsed = time.time() - start_time
+    logger.info(
+        f"[SNAPSHOT] Imported {loaded} chunks into {len(physical_names)} "
+        f"collection(s) in {elapsed:.2f}s"
+    )
+    return {"count": loaded, "collections": physical_names, "time_taken": elapsed}
+
+
+__all__ = [
+    "SNAPSHOT_FORMAT_VERSION",
+    "export_snapshot",
+    "import_snapshot",
+    "read_manifest",
+]
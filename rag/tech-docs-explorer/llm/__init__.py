@@ -2,18 +2,37 @@
 LLM provider module.
 
 Provides a factory function to get LLM providers based on configuration.
+Providers are created once per name and reused.
 """
 
+import threading
+from typing import Dict
+
 from config import get_settings
 from llm.base import BaseLLMProvider
+from llm.cache import CachedLLM, CacheStats, CompletionCache
+from llm.http_client import close_http_clients, get_http_client
+from llm.local_provider import LocalProvider
 from llm.openai_provider import OpenAIProvider
+from llm.rate_limit import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimiter,
+    get_rate_limit_metrics,
+    llm_priority,
+)
 
 
 # Registry of available providers
 _PROVIDERS = {
     "openai": OpenAIProvider,
+    "local": LocalProvider,
 }
 
+# Provider instances by name (memoized, so their clients are reused)
+_instances: Dict[str, BaseLLMProvider] = {}
+_instances_lock = threading.Lock()
+
 
 def get_llm_provider(provider_name: str | None = None) -> BaseLLMProvider:
     """
@@ -21,10 +40,10 @@ def get_llm_provider(provider_name: str | None = None) -> BaseLLMProvider:
 
     Args:
         provider_name: Name of the provider to use. If None, uses llm_provider from settings.
-                      Supported values: "openai"
+                      Supported values: "openai", "local" (offline)
 
     Returns:
-        Instance of the requested provider.
+        Instance of the requested provider (the same one on every call).
 
     Raises:
         ValueError: If the provider name is not recognized.
@@ -45,12 +64,25 @@ def get_llm_provider(provider_name: str | None = None) -> BaseLLMProvider:
             f"Unknown LLM provider: '{provider}'. Available providers: {available}"
         )
 
-    provider_class = _PROVIDERS[provider]
-    return provider_class()
+    with _instances_lock:
+        if provider not in _instances:
+            _instances[provider] = _PROVIDERS[provider]()
+        return _instances[provider]
 
 
 __all__ = [
     "BaseLLMProvider",
+    "CachedLLM",
+    "CacheStats",
+    "CompletionCache",
     "OpenAIProvider",
+    "LocalProvider",
+    "RateLimiter",
+    "BACKGROUND",
+    "INTERACTIVE",
+    "close_http_clients",
+    "get_http_client",
     "get_llm_provider",
+    "get_rate_limit_metrics",
+    "llm_priority",
 ]
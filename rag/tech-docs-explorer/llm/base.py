@@ -6,7 +6,13 @@ Defines the contract for LLM providers to enable easy switching between differen
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Sequence
+
+import tiktoken
+from llama_index.core.llms import LLM
+
+from config import get_settings
+from llm.cache import CachedLLM, CompletionCache
 
 
 class BaseLLMProvider(ABC):
@@ -52,3 +58,44 @@ class BaseLLMProvider(ABC):
             LLM instance for reranking.
         """
         pass
+
+    def get_tokenizer(self, model_name: str) -> Callable[[str], Sequence[Any]]:
+        """
+        Get the tokenizer used to count the tokens of a model.
+
+        Defaults to the tiktoken encoding of the model, falling back to
+        cl100k_base for model names tiktoken doesn't know.
+
+        Args:
+            model_name: Name of the LLM or embedding model.
+
+        Returns:
+            Function that splits text into tokens.
+        """
+        try:
+            return tiktoken.encoding_for_model(model_name).encode
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base").encode
+
+    def with_cache(self, llm: LLM, model_name: str) -> LLM:
+        """
+        Wrap an LLM in the disk completion cache if llm.cache.enabled is set.
+
+        Only calls with temperature 0 are served from the cache.
+
+        Args:
+            llm: LLM returned by get_llm() or get_rerank_llm().
+            model_name: Model name, used to count the tokens hits save.
+
+        Returns:
+            CachedLLM wrapping llm, or llm itself when the cache is disabled.
+        """
+        settings = get_settings()
+        if not settings.llm_cache_enabled:
+            return llm
+        cache = CompletionCache(
+            settings.get_llm_cache_path(),
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            max_size_mb=settings.llm_cache_max_size_mb,
+        )
+        return CachedLLM(llm=llm, cache=cache, tokenizer=self.get_tokenizer(model_name))
@@ -0,0 +1,344 @@
+"""
+Disk-backed LLM completion cache.
+
+Identical prompts (same question and retrieved chunks, or the same LLMRerank
+prompt) sent to the same model with the same parameters return the stored
+completion instead of a new LLM round-trip:
+- CompletionCache: SQLite store with TTL and size-based (LRU) eviction
+- CachedLLM: LLM wrapper that serves chat/complete calls from the cache
+
+Only deterministic calls are cached: an LLM with temperature > 0 bypasses
+the cache. Hits emit no LLM callback event, so they add no tokens (or cost)
+to the TokenCountingHandler; they are reported in CacheStats instead.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Optional, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+    MessageRole,
+)
+from llama_index.core.llms import LLM, CustomLLM
+from pydantic import PrivateAttr
+
+
+_CACHE_FILENAME = "completions.sqlite3"
+# LLM attributes that change the completion, included in the cache key
+_KEY_PARAMETERS = ("temperature", "max_tokens", "top_p", "additional_kwargs")
+# Serializes writes and evictions within this process
+_cache_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_by_use ON completions (last_used_at);
+"""
+
+
+@dataclass
+class CacheStats:
+    """Cache activity of one CachedLLM.
+
+    Attributes:
+        hits: Calls served from the cache
+        misses: Calls sent to the LLM and stored
+        bypassed: Calls sent to the LLM without caching (temperature > 0)
+        saved_prompt_tokens: Prompt tokens not sent thanks to hits
+        saved_completion_tokens: Completion tokens not generated thanks to hits
+    """
+
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    saved_prompt_tokens: int = 0
+    saved_completion_tokens: int = 0
+
+
+class CompletionCache:
+    """SQLite store of LLM completions with TTL and size-based eviction.
+
+    Example:
+        >>> cache = CompletionCache(Path(".data/llm_cache"), ttl_seconds=3600)
+        >>> cache.put("key", "gpt-4o-mini", "answer", 120, 15)
+        >>> cache.get("key")["text"]
+        'answer'
+    """
+
+    def __init__(
+        self, cache_dir: Path, ttl_seconds: float = 604800, max_size_mb: float = 256
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory of the cache database.
+            ttl_seconds: Age after which an entry is no longer returned.
+            max_size_mb: Total size of stored keys and completions above
+                which the least recently used entries are evicted.
+        """
+        self.path = Path(cache_dir) / _CACHE_FILENAME
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = int(max_size_mb * 1_000_000)
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """Open the cache database, committing on success and rolling back on error."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a fresh entry (text and token counts), or None on a miss."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text, prompt_tokens, completion_tokens FROM completions "
+                "WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE completions SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+        return {"text": row[0], "prompt_tokens": row[1], "completion_tokens": row[2]}
+
+    def put(
+        self,
+        key: str,
+        model: str,
+        text: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """Store a completion and evict expired and least recently used entries."""
+        now = time.time()
+        size = len(key) + len(text.encode())
+        with _cache_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, text, prompt_tokens, completion_tokens, size, now, now),
+            )
+            conn.execute(
+                "DELETE FROM completions WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions")
+            excess = total.fetchone()[0] - self.max_size_bytes
+            if excess > 0:
+                self._evict(conn, excess)
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, excess: int) -> None:
+        """Delete least recently used entries until excess bytes are freed."""
+        keys = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM completions ORDER BY last_used_at"
+        ):
+            keys.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM completions WHERE key = ?", [(k,) for k in keys])
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with _cache_lock, self._connect() as conn:
+            conn.execute("DELETE FROM completions")
+
+
+class CachedLLM(CustomLLM):
+    """LLM wrapper that serves repeated chat/complete calls from a cache.
+
+    The key hashes the model, the parameters that change the completion and
+    the full prompt (or messages). Misses are sent to the wrapped LLM, which
+    receives this wrapper's callback manager so their tokens are counted as
+    usual. Streaming and async calls are passed through uncached.
+
+    Example:
+        >>> llm = CachedLLM(llm=OpenAI(model="gpt-4o-mini", temperature=0), cache=cache)
+        >>> llm.complete("What is an ingress?")  # LLM call
+        >>> llm.complete("What is an ingress?")  # served from the cache
+        >>> llm.cache_stats.hits
+        1
+    """
+
+    llm: Any
+    cache: Any
+    tokenizer: Optional[Callable[[str], Sequence[Any]]] = None
+
+    _stats: CacheStats = PrivateAttr(default_factory=CacheStats)
+
+    def __init__(
+        self,
+        llm: LLM,
+        cache: CompletionCache,
+        tokenizer: Optional[Callable[[str], Sequence[Any]]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Wrap an LLM.
+
+        Args:
+            llm: LLM to send cache misses to.
+            cache: Store for the completions.
+            tokenizer: Counts the tokens of stored prompts and completions,
+                reported as saved on hits (optional).
+        """
+        kwargs.setdefault("system_prompt", llm.system_prompt)
+        super().__init__(llm=llm, cache=cache, tokenizer=tokenizer, **kwargs)
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Get the class name."""
+        return "CachedLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        """Get the wrapped LLM's metadata."""
+        return self.llm.metadata
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Get the cache activity of this instance."""
+        return self._stats
+
+    def _cacheable(self) -> bool:
+        """Check whether calls are deterministic (temperature 0 or unset)."""
+        return not getattr(self.llm, "temperature", 0)
+
+    def _key(self, kind: str, prompt: Any, kwargs: Dict[str, Any]) -> str:
+        """Hash the model, parameters and full prompt of a call."""
+        payload = {
+            "kind": kind,
+            "llm": self.llm.class_name(),
+            "model": self.metadata.model_name,
+            "parameters": {
+                name: getattr(self.llm, name)
+                for name in _KEY_PARAMETERS
+                if hasattr(self.llm, name)
+            },
+            "prompt": prompt,
+            "kwargs": kwargs,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _count(self, text: str) -> int:
+        """Count the tokens of a text (0 without tokenizer)."""
+        return len(self.tokenizer(text)) if self.tokenizer else 0
+
+    def _cached_call(
+        self, kind: str, prompt: Any, prompt_text: str, kwargs: Dict[str, Any], call
+    ) -> str:
+        """Serve a call from the cache, or make it and store the result."""
+        if not self._cacheable():
+            self._stats.bypassed += 1
+            return call()
+
+        key = self._key(kind, prompt, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self._stats.hits += 1
+            self._stats.saved_prompt_tokens += entry["prompt_tokens"]
+            self._stats.saved_completion_tokens += entry["completion_tokens"]
+            return entry["text"]
+
+        self._stats.misses += 1
+        text = call()
+        self.cache.put(
+            key,
+            self.metadata.model_name,
+            text,
+            self._count(prompt_text),
+            self._count(text),
+        )
+        return text
+
+    def _inner(self) -> LLM:
+        """Get the wrapped LLM with this wrapper's callback manager."""
+        self.llm.callback_manager = self.callback_manager
+        return self.llm
+
+    def complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        """Complete a prompt, from the cache when possible."""
+        text = self._cached_call(
+            "complete",
+            prompt,
+            prompt,
+            kwargs,
+            lambda: self._inner().complete(prompt, formatted=formatted, **kwargs).text,
+        )
+        return CompletionResponse(text=text)
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        """Answer a conversation, from the cache when possible."""
+        prompt = [(str(m.role), m.content) for m in messages]
+        text = self._cached_call(
+            "chat",
+            prompt,
+            "\n".join(m.content or "" for m in messages),
+            kwargs,
+            lambda: self._inner().chat(messages, **kwargs).message.content or "",
+        )
+        return ChatResponse(
+            message=ChatMessage(role=MessageRole.ASSISTANT, content=text)
+        )
+
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseGen:
+        """Stream a completion from the wrapped LLM (uncached)."""
+        return self._inner().stream_complete(prompt, formatted=formatted, **kwargs)
+
+    def stream_chat(
+        self, messages: Sequence[ChatMessage], **kwargs: Any
+    ) -> ChatResponseGen:
+        """Stream a chat response from the wrapped LLM (uncached)."""
+        return self._inner().stream_chat(messages, **kwargs)
+
+    async def acomplete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        """Complete a prompt asynchronously with the wrapped LLM (uncached)."""
+        return await self._inner().acomplete(prompt, formatted=formatted, **kwargs)
+
+    async def achat(
+        self, messages: Sequence[ChatMessage], **kwargs: Any
+    ) -> ChatResponse:
+        """Answer a conversation asynchronously with the wrapped LLM (uncached)."""
+        return await self._inner().achat(messages, **kwargs)
+
+
+__all__ = ["CacheStats", "CompletionCache", "CachedLLM"]
@@ -0,0 +1,121 @@
+"""
+Shared HTTP connection pool for LLM API calls.
+
+Every OpenAI client the provider builds (answer LLM, embeddings, reranking)
+sends its requests through one keep-alive httpx pool per process, so TCP and
+TLS setup is paid once and reused across calls and queries. The pool limits
+and timeout come from the llm.http section of config.yaml; a different
+configuration gets its own pool.
+
+Requests go through a RateLimitedTransport, which applies the llm.rate_limit
+budgets and retries throttled or failed requests (llm/rate_limit.py).
+"""
+
+import os
+import threading
+from typing import Dict, Tuple
+
+import httpx
+from openai import DefaultHttpxClient
+
+from config import Settings, get_settings
+from llm.rate_limit import RateLimitedTransport, RateLimiter
+
+
+# Pools by (pid, limits, timeout, rate limits). The pid keeps a forked worker
+# from reusing its parent's sockets.
+_http_clients: Dict[Tuple, httpx.Client] = {}
+_http_clients_lock = threading.Lock()
+
+
+def _pool_key(settings: Settings) -> Tuple:
+    """Get the memoization key of the pool for the current configuration."""
+    return (
+        os.getpid(),
+        settings.llm_http_max_connections,
+        settings.llm_http_max_keepalive_connections,
+        settings.llm_http_keepalive_seconds,
+        settings.llm_http_timeout_seconds,
+        settings.llm_http_max_retries,
+        settings.llm_http_backoff_base_seconds,
+        settings.llm_http_backoff_max_seconds,
+        settings.llm_rate_limit_enabled,
+        settings.llm_requests_per_minute,
+        settings.llm_tokens_per_minute,
+        settings.llm_max_concurrent_requests,
+        settings.llm_completion_tokens_estimate,
+    )
+
+
+def _create_transport(settings: Settings) -> RateLimitedTransport:
+    """Create the pooled, rate-limited transport of the LLM HTTP client."""
+    pool = httpx.HTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+            keepalive_expiry=settings.llm_http_keepalive_seconds,
+        )
+    )
+    limiter = None
+    if settings.llm_rate_limit_enabled:
+        limiter = RateLimiter(
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            max_concurrent=settings.llm_max_concurrent_requests,
+        )
+    return RateLimitedTransport(
+        pool,
+        limiter,
+        max_retries=settings.llm_http_max_retries,
+        backoff_base_seconds=settings.llm_http_backoff_base_seconds,
+        backoff_max_seconds=settings.llm_http_backoff_max_seconds,
+        completion_tokens=settings.llm_completion_tokens_estimate,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the pooled HTTP client shared by all LLM API calls.
+
+    Returns:
+        Keep-alive httpx client (with the OpenAI SDK defaults), created on
+        first use and reused while llm.http and llm.rate_limit are unchanged.
+
+    Examples:
+        >>> client = get_http_client()
+        >>> client is get_http_client()
+        True
+    """
+    settings = get_settings()
+    key = _pool_key(settings)
+    client = _http_clients.get(key)
+    if client is not None:
+        return client
+
+    with _http_clients_lock:
+        client = _http_clients.get(key)
+        if client is None:
+            client = DefaultHttpxClient(
+                transport=_create_transport(settings),
+                timeout=settings.llm_http_timeout_seconds,
+            )
+            _http_clients[key] = client
+            print(
+                f"[LLM HTTP] Created connection pool "
+                f"(max_connections={settings.llm_http_max_connections}, "
+                f"keepalive={settings.llm_http_max_keepalive_connections}, "
+                f"rate_limit={settings.llm_rate_limit_enabled})"
+            )
+        return client
+
+
+def close_http_clients() -> None:
+    """Close every pooled HTTP client (the next call creates a new pool)."""
+    with _http_clients_lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+    for client in clients:
+        client.close()
+
+
+__all__ = ["get_http_client", "close_http_clients"]
@@ -0,0 +1,333 @@
+"""
+Local LLM Provider implementation.
+
+Provides offline, deterministic models so the full index-and-query path can run
+without network access or API costs (benchmarks, demos, air-gapped machines):
+- HashedEmbedding: feature-hashed word and bigram vectors (or a local
+  HuggingFace model on CPU, if configured and installed)
+- ExtractiveLLM: answers with the context sentences that best match the
+  question, and scores documents by word overlap for reranking
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, List, Sequence, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.base.llms.types import (
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.llms import LLM, CustomLLM
+from llama_index.core.llms.callbacks import llm_completion_callback
+
+from config import get_settings
+from llm.base import BaseLLMProvider
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# "key: value" lines that LlamaIndex prepends to chunks (file_path, stack...)
+_METADATA_LINE_RE = re.compile(r"^[\w ]{1,40}: \S[^\n]{0,200}$")
+
+# Follow-ups with at most this many meaningful words are completed with context
+_FOLLOW_UP_TERMS = 4
+
+NO_ANSWER = "No encontré información relevante en el contexto para responder."
+
+
+def _words(text: str) -> List[str]:
+    """Lower-cased words of a text."""
+    return _WORD_RE.findall(text.lower())
+
+
+def _terms(text: str) -> set:
+    """Words of a text that carry meaning (ignores very short words)."""
+    return {word for word in _words(text) if len(word) > 2}
+
+
+def local_tokenizer(text: str) -> List[str]:
+    """Split text into word and punctuation tokens (offline token counting)."""
+    return _TOKEN_RE.findall(text)
+
+
+class HashedEmbedding(BaseEmbedding):
+    """Deterministic embeddings from hashed words and word bigrams.
+
+    Each feature is hashed to a dimension with a random sign and weighted by
+    1 + log(count); vectors are L2-normalized. Texts that share words get
+    similar vectors, which is enough to exercise retrieval end to end.
+
+    Example:
+        >>> embed_model = HashedEmbedding(embed_dim=384)
+        >>> len(embed_model.get_text_embedding("FastAPI dependency injection"))
+        384
+    """
+
+    embed_dim: int = 384
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Get the class name."""
+        return "HashedEmbedding"
+
+    def _embed(self, text: str) -> List[float]:
+        """Hash the features of a text into a normalized vector."""
+        words = _words(text)
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+        vector = [0.0] * self.embed_dim
+        for feature, count in features.items():
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.embed_dim] += sign * (1 + math.log(count))
+
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """Embed a query."""
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        """Embed a query (async)."""
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        """Embed a text."""
+        return self._embed(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts."""
+        return [self._embed(text) for text in texts]
+
+
+class ExtractiveLLM(CustomLLM):
+    """Offline "LLM" that answers by extracting sentences from the prompt.
+
+    Understands the prompts LlamaIndex sends during a query:
+    - Question answering and refine: returns the context sentences that share
+      the most words with the question, in their original order
+    - Choice select (LLMRerank): scores each document by word overlap
+    - Condense (multi-turn chat): completes short follow-ups with the
+      previous question
+    - Anything else (e.g. HyDE): echoes the question
+
+    Example:
+        >>> llm = ExtractiveLLM()
+        >>> llm.complete("Context information is below.\\n---...").text
+    """
+
+    max_sentences: int = 3
+    context_window: int = 1_000_000
+    num_output: int = 512
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Get the class name."""
+        return "ExtractiveLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        """Get LLM metadata (a large window avoids refine rounds)."""
+        return LLMMetadata(
+            context_window=self.context_window,
+            num_output=self.num_output,
+            model_name="local-extractive",
+        )
+
+    @llm_completion_callback()
+    def complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        """Answer a prompt deterministically."""
+        return CompletionResponse(text=self._answer(prompt))
+
+    @llm_completion_callback()
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseGen:
+        """Answer a prompt, streamed as a single chunk."""
+        text = self._answer(prompt)
+        yield CompletionResponse(text=text, delta=text)
+
+    def _answer(self, prompt: str) -> str:
+        """Route a prompt to the matching answer strategy."""
+        if "Document 1:" in prompt and "Relevance:" in prompt:
+            return self._select_documents(prompt)
+        if "<Follow Up Message>" in prompt:
+            return self._condense(prompt)
+
+        question, context = self._parse_prompt(prompt)
+        if context is None:
+            return question
+        return self._extract(question, context)
+
+    @staticmethod
+    def _parse_prompt(prompt: str) -> Tuple[str, Any]:
+        """Get the question and context of a QA/refine prompt (context None otherwise)."""
+        qa = re.search(
+            r"-{5,}\n(.*)\n-{5,}\n.*?Query: (.*?)\nAnswer:", prompt, re.DOTALL
+        )
+        if qa:
+            return qa.group(2).strip(), qa.group(1)
+
+        refine = re.search(
+            r"The original query is as follows: (.*?)\n"
+            r"We have provided an existing answer: (.*?)\n"
+            r".*?-{5,}\n(.*)\n-{5,}\n",
+            prompt,
+            re.DOTALL,
+        )
+        if refine:
+            return refine.group(1).strip(), f"{refine.group(2)}\n{refine.group(3)}"
+
+        # Other prompts (e.g. HyDE): the question is the last non-empty block
+        hyde = re.search(r"\n\n\n(.*?)\n\n\n", prompt, re.DOTALL)
+        return (hyde.group(1) if hyde else prompt).strip(), None
+
+    def _extract(self, question: str, context: str) -> str:
+        """Return the context sentences that best match the question."""
+        query_terms = _terms(question)
+        sentences = [
+            sentence.strip()
+            for sentence in _SENTENCE_RE.split(context)
+            if sentence.strip() and not _METADATA_LINE_RE.match(sentence.strip())
+        ]
+        scored = [
+            (len(query_terms & _terms(sentence)), -position, sentence)
+            for position, sentence in enumerate(sentences)
+        ]
+        best = sorted((s for s in scored if s[0] > 0), reverse=True)
+        best = sorted(best[: self.max_sentences], key=lambda s: -s[1])
+        if not best:
+            return NO_ANSWER
+
+        answer: List[str] = []
+        for _, _, sentence in best:
+            if sentence not in answer:
+                answer.append(sentence)
+        return " ".join(answer)
+
+    @staticmethod
+    def _condense(prompt: str) -> str:
+        """Make a follow-up standalone by appending the previous question if short."""
+        match = re.search(
+            r"<Chat History>\n(.*)\n\n<Follow Up Message>\n(.*?)\n\n<Standalone",
+            prompt,
+            re.DOTALL,
+        )
+        if not match:
+            return prompt.strip()
+        history, follow_up = match.group(1), match.group(2).strip()
+        questions = re.findall(r"^Human: (.*)$", history, re.MULTILINE)
+        # Short follow-ups ("and in tests?") lean on the last question that
+        # stands on its own
+        if questions and len(_terms(follow_up)) <= _FOLLOW_UP_TERMS:
+            topics = [q for q in questions if len(_terms(q)) > _FOLLOW_UP_TERMS]
+            return f"{follow_up} ({(topics or questions)[-1].strip()})"
+        return follow_up
+
+    @staticmethod
+    def _select_documents(prompt: str) -> str:
+        """Answer a choice-select prompt with 'Doc: n, Relevance: r' lines."""
+        body = prompt.rsplit("Let's try this now:", 1)[-1]
+        question = body.rsplit("Question:", 1)[-1].split("Answer:", 1)[0]
+        query_terms = _terms(question)
+
+        scores: List[Tuple[float, int]] = []
+        for match in re.finditer(
+            r"Document (\d+):\n(.*?)(?=\nDocument \d+:\n|\nQuestion:)", body, re.DOTALL
+        ):
+            overlap = len(query_terms & _terms(match.group(2)))
+            if overlap:
+                relevance = min(10, 1 + round(9 * overlap / max(len(query_terms), 1)))
+                scores.append((relevance, int(match.group(1))))
+
+        scores.sort(key=lambda s: (-s[0], s[1]))
+        return "\n".join(f"Doc: {doc}, Relevance: {rel}" for rel, doc in scores)
+
+
+class LocalProvider(BaseLLMProvider):
+    """
+    Local implementation of BaseLLMProvider.
+
+    Runs without network access or API key: hashed (or local HuggingFace)
+    embeddings, and an extractive LLM for answers and reranking. Configured
+    in the llm.local section of config.yaml.
+    """
+
+    def __init__(self):
+        """Initialize the provider and load settings."""
+        self.settings = get_settings()
+
+    def get_llm(self, model_name: str | None = None) -> LLM:
+        """
+        Get the extractive LLM for text generation.
+
+        Args:
+            model_name: Ignored (there is a single local model).
+
+        Returns:
+            ExtractiveLLM instance (wrapped in the completion cache if enabled).
+        """
+        llm = ExtractiveLLM(max_sentences=self.settings.local_answer_sentences)
+        return self.with_cache(llm, "local-extractive")
+
+    def get_embedding_model(self) -> BaseEmbedding:
+        """
+        Get the local embedding model.
+
+        Returns:
+            HuggingFaceEmbedding on CPU if llm.local.embedding_model is set,
+            otherwise HashedEmbedding.
+
+        Raises:
+            RuntimeError: If a HuggingFace model is configured but
+                llama-index-embeddings-huggingface is not installed.
+        """
+        model_name = self.settings.local_embedding_model
+        if not model_name:
+            return HashedEmbedding(embed_dim=self.settings.local_embed_dim)
+
+        try:
+            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+        except ImportError as e:
+            raise RuntimeError(
+                f"llm.local.embedding_model is '{model_name}' but "
+                "llama-index-embeddings-huggingface is not installed. Install it "
+                "or leave embedding_model empty to use hashed embeddings."
+            ) from e
+        return HuggingFaceEmbedding(model_name=model_name, device="cpu")
+
+    def get_rerank_llm(self) -> LLM:
+        """
+        Get the extractive LLM for reranking.
+
+        Returns:
+            ExtractiveLLM instance (scores documents by word overlap), wrapped
+            in the completion cache if enabled.
+        """
+        llm = ExtractiveLLM(max_sentences=self.settings.local_answer_sentences)
+        return self.with_cache(llm, "local-extractive")
+
+    def get_tokenizer(self, model_name: str) -> Callable[[str], Sequence[Any]]:
+        """
+        Get an offline tokenizer for token counting.
+
+        Args:
+            model_name: Ignored (tiktoken may need to download encodings).
+
+        Returns:
+            Function splitting text into word and punctuation tokens.
+        """
+        return local_tokenizer
+
+
+__all__ = ["LocalProvider", "HashedEmbedding", "ExtractiveLLM", "local_tokenizer"]
@@ -2,13 +2,19 @@
 OpenAI LLM Provider implementation.
 
 Provides OpenAI-specific implementations for LLM, embeddings, and reranking models.
+All of them send their requests through the shared keep-alive pool of
+llm.http_client.
 """
 
+from typing import Any, Dict
+
+from llama_index.core.llms import LLM
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from config import get_settings
 from llm.base import BaseLLMProvider
+from llm.http_client import get_http_client
 
 
 class OpenAIProvider(BaseLLMProvider):
@@ -17,13 +23,27 @@ class OpenAIProvider(BaseLLMProvider):
 
     Uses OpenAI models for text generation, embeddings, and reranking.
     All configuration is loaded from settings (API key, model names).
+
+    Model objects are cheap and built per call (each query sets its own
+    callback manager on them); the HTTP connections they use are pooled
+    and shared, and rate-limited per llm.rate_limit.
     """
 
     def __init__(self):
         """Initialize the provider and load settings."""
         self.settings = get_settings()
 
-    def get_llm(self, model_name: str | None = None) -> OpenAI:
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Get the API key, pooled HTTP client, timeout and retries of every model."""
+        return {
+            "api_key": self.settings.openai_api_key,
+            "http_client": get_http_client(),
+            "timeout": self.settings.llm_http_timeout_seconds,
+            # Retries happen in the pooled transport, which knows the rate limits
+            "max_retries": 0,
+        }
+
+    def get_llm(self, model_name: str | None = None) -> LLM:
         """
         Get OpenAI LLM instance for text generation.
 
@@ -31,14 +51,17 @@ class OpenAIProvider(BaseLLMProvider):
             model_name: Optional model override. If None, uses llm_model from settings.
 
         Returns:
-            OpenAI LLM instance configured with API key and model.
+            OpenAI LLM instance configured with API key and model (wrapped in
+            the completion cache if enabled).
         """
         model = model_name or self.settings.llm_model
-        return OpenAI(
+        llm = OpenAI(
             model=model,
-            api_key=self.settings.openai_api_key,
-            temperature=0.1,  # Low temperature for consistent, factual responses
+            # Low temperature for consistent, factual responses (0 = cacheable)
+            temperature=self.settings.llm_temperature,
+            **self._client_kwargs(),
         )
+        return self.with_cache(llm, model)
 
     def get_embedding_model(self) -> OpenAIEmbedding:
         """
@@ -48,20 +71,22 @@ class OpenAIProvider(BaseLLMProvider):
             OpenAIEmbedding instance configured with API key and embedding model.
         """
         return OpenAIEmbedding(
-            model=self.settings.embedding_model, api_key=self.settings.openai_api_key
+            model=self.settings.embedding_model, **self._client_kwargs()
         )
 
-    def get_rerank_llm(self) -> OpenAI:
+    def get_rerank_llm(self) -> LLM:
         """
         Get OpenAI LLM for reranking.
 
         Uses the rerank_model from settings (typically same as main LLM or smaller).
 
         Returns:
-            OpenAI LLM instance for reranking.
+            OpenAI LLM instance for reranking (wrapped in the completion cache
+            if enabled).
         """
-        return OpenAI(
+        llm = OpenAI(
             model=self.settings.rerank_model,
-            api_key=self.settings.openai_api_key,
             temperature=0.0,  # Deterministic for consistent reranking
+            **self._client_kwargs(),
         )
+        return self.with_cache(llm, self.settings.rerank_model)
@@ -0,0 +1,378 @@
+"""
+Client-side rate limiting for LLM API calls.
+
+Every request sent through the pooled LLM HTTP client (answers, embeddings
+and reranking) passes through:
+- RateLimiter: token buckets for requests/min and tokens/min plus a cap on
+  concurrent requests, with priority lanes so interactive queries are served
+  before background indexing
+- RateLimitedTransport: httpx transport that waits for the limiter and
+  retries 429/5xx responses and connection errors with jittered exponential
+  backoff (a 429 also pauses every lane for the backoff)
+
+The lane of a call comes from the llm_priority() context it runs in
+(interactive by default). Queueing delay, retries and throttled responses
+are counted per lane (get_rate_limit_metrics) and per llm_priority() block.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, Generator, Optional
+
+import httpx
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+# Lanes in priority order: a lane is served only when higher ones are empty
+LANES = (INTERACTIVE, BACKGROUND)
+
+# Statuses worth retrying: rate limited, or a transient server error
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Rough request size of a token, to estimate tokens before sending
+_BYTES_PER_TOKEN = 4
+
+
+@dataclass
+class LaneMetrics:
+    """Counters of LLM API requests in one lane.
+
+    Attributes:
+        requests: Requests sent (retries included)
+        retries: Requests repeated after a 429/5xx response or connection error
+        throttled: 429 responses received
+        wait_seconds: Total time spent queued in the limiter
+        max_wait_seconds: Longest single wait in the limiter
+    """
+
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record_wait(self, waited: float) -> None:
+        """Count a request and the time it waited in the limiter."""
+        self.requests += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+# Process-wide counters, only mutated while holding _metrics_lock
+_metrics: Dict[str, LaneMetrics] = {lane: LaneMetrics() for lane in LANES}
+_metrics_lock = threading.Lock()
+
+# Lane and usage counters of the current llm_priority() block
+_current_lane: ContextVar[str] = ContextVar("llm_lane", default=INTERACTIVE)
+_current_usage: ContextVar[Optional[LaneMetrics]] = ContextVar(
+    "llm_lane_usage", default=None
+)
+
+
+@contextmanager
+def llm_priority(lane: str) -> Generator[LaneMetrics, None, None]:
+    """
+    Send the LLM API calls made inside the block through a priority lane.
+
+    Args:
+        lane: "interactive" (user queries) or "background" (indexing).
+
+    Yields:
+        Counters of the requests made inside the block.
+
+    Raises:
+        ValueError: If the lane is unknown.
+
+    Examples:
+        >>> with llm_priority(BACKGROUND) as usage:
+        ...     embed_model.get_text_embedding_batch(texts)
+        >>> print(f"Queued {usage.wait_seconds:.1f}s")
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown LLM lane: '{lane}'. Available lanes: {LANES}")
+
+    usage = LaneMetrics()
+    lane_token = _current_lane.set(lane)
+    usage_token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(usage_token)
+        _current_lane.reset(lane_token)
+
+
+def get_rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """Get a snapshot of the per-lane request counters.
+
+    Returns:
+        Dictionary of lane name to requests, retries, throttled,
+        wait_seconds and max_wait_seconds.
+
+    Examples:
+        >>> metrics = get_rate_limit_metrics()
+        >>> print(f"Indexing queued {metrics['background']['wait_seconds']:.1f}s")
+    """
+    with _metrics_lock:
+        return {lane: asdict(metrics) for lane, metrics in _metrics.items()}
+
+
+class _TokenBucket:
+    """Bucket refilled continuously up to one minute's worth of budget."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        """Add the budget accumulated since the last refill."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Consume amount (capped at capacity, so huge requests can pass)."""
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Token-bucket limiter with a concurrency cap and priority lanes.
+
+    A request waits until it is first in its lane, no higher-priority lane
+    has waiting requests, fewer than max_concurrent requests are in flight
+    and both buckets hold enough budget. A limit of 0 disables that bucket.
+
+    Example:
+        >>> limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+        >>> waited = limiter.acquire(tokens=1200, lane=INTERACTIVE)
+        >>> try:
+        ...     send_request()
+        ... finally:
+        ...     limiter.release()
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrent: int = 0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget (0 = unlimited).
+            tokens_per_minute: Token budget (0 = unlimited).
+            max_concurrent: Maximum requests in flight (0 = unlimited).
+        """
+        now = time.monotonic()
+        self._requests = (
+            _TokenBucket(requests_per_minute, now) if requests_per_minute > 0 else None
+        )
+        self._tokens = (
+            _TokenBucket(tokens_per_minute, now) if tokens_per_minute > 0 else None
+        )
+        self._max_concurrent = max_concurrent
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiting: Dict[str, Deque[object]] = {lane: deque() for lane in LANES}
+        self._cond = threading.Condition()
+
+    def _delay(self, ticket: object, lane: str, tokens: int, now: float):
+        """Seconds the ticket must wait (0 = go, None = until notified)."""
+        if self._waiting[lane][0] is not ticket:
+            return None
+        if any(self._waiting[other] for other in LANES[: LANES.index(lane)]):
+            return None
+        if self._max_concurrent and self._in_flight >= self._max_concurrent:
+            return None
+
+        delays = [self._paused_until - now]
+        if self._requests is not None:
+            self._requests.refill(now)
+            delays.append(self._requests.delay(1))
+        if self._tokens is not None:
+            self._tokens.refill(now)
+            delays.append(self._tokens.delay(tokens))
+        return max(0.0, *delays)
+
+    def acquire(self, tokens: int = 0, lane: str = INTERACTIVE) -> float:
+        """
+        Wait for budget and a free slot, then take them.
+
+        Args:
+            tokens: Estimated tokens of the request (prompt + completion).
+            lane: Priority lane of the request.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        start = time.perf_counter()
+        ticket = object()
+        with self._cond:
+            self._waiting[lane].append(ticket)
+            try:
+                while True:
+                    delay = self._delay(ticket, lane, tokens, time.monotonic())
+                    if delay == 0:
+                        break
+                    self._cond.wait(timeout=delay)
+
+                if self._requests is not None:
+                    self._requests.take(1)
+                if self._tokens is not None:
+                    self._tokens.take(tokens)
+                self._in_flight += 1
+            finally:
+                self._waiting[lane].remove(ticket)
+                self._cond.notify_all()
+        return time.perf_counter() - start
+
+    def release(self) -> None:
+        """Free the slot of a finished request."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every lane for seconds (after the API answered 429)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _estimate_tokens(request: httpx.Request, completion_tokens: int) -> int:
+    """Estimate the tokens a request consumes from its body size."""
+    prompt_tokens = len(request.content) // _BYTES_PER_TOKEN
+    if request.url.path.endswith("/embeddings"):
+        return prompt_tokens
+    return prompt_tokens + completion_tokens
+
+
+def _retry_after(response: Optional[httpx.Response]) -> float:
+    """Get the Retry-After delay of a response in seconds (0 if absent)."""
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except ValueError:
+        return 0.0
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport that rate-limits and retries LLM API requests.
+
+    Example:
+        >>> transport = RateLimitedTransport(httpx.HTTPTransport(), limiter)
+        >>> client = httpx.Client(transport=transport)
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0,
+        completion_tokens: int = 512,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            transport: Transport that sends the requests (e.g. the pool).
+            limiter: Limiter every request waits for (None = no limits).
+            max_retries: Retries after a 429/5xx response or connection error.
+            backoff_base_seconds: Backoff before the first retry; doubles on
+                each retry, with full jitter.
+            backoff_max_seconds: Longest backoff between retries.
+            completion_tokens: Completion tokens assumed per LLM request when
+                estimating its token cost.
+        """
+        self._transport = transport
+        self._limiter = limiter
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base_seconds
+        self._backoff_max = backoff_max_seconds
+        self._completion_tokens = completion_tokens
+
+    def _record(self, lane: str, **counts: Any) -> None:
+        """Add to the counters of the lane and of the current llm_priority() block."""
+        usage = _current_usage.get()
+        with _metrics_lock:
+            for metrics in (_metrics[lane], usage):
+                if metrics is None:
+                    continue
+                if "waited" in counts:
+                    metrics.record_wait(counts["waited"])
+                metrics.retries += counts.get("retries", 0)
+                metrics.throttled += counts.get("throttled", 0)
+
+    def _send(self, request: httpx.Request, lane: str, tokens: int) -> httpx.Response:
+        """Send a request once, holding a limiter slot while it is in flight."""
+        waited = self._limiter.acquire(tokens, lane) if self._limiter else 0.0
+        self._record(lane, waited=waited)
+        if waited > 1:
+            print(f"[RATE LIMIT] {lane} request queued {waited:.1f}s")
+        try:
+            return self._transport.handle_request(request)
+        finally:
+            if self._limiter:
+                self._limiter.release()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying throttled and failed attempts."""
+        lane = _current_lane.get()
+        tokens = _estimate_tokens(request, self._completion_tokens)
+
+        for attempt in range(self._max_retries + 1):
+            last_attempt = attempt == self._max_retries
+            try:
+                response = self._send(request, lane, tokens)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                response = None
+            else:
+                if response.status_code not in _RETRY_STATUSES or last_attempt:
+                    return response
+
+            backoff = random.uniform(
+                0, min(self._backoff_max, self._backoff_base * 2**attempt)
+            )
+            delay = max(backoff, _retry_after(response))
+            if response is not None:
+                if response.status_code == 429:
+                    self._record(lane, throttled=1)
+                    if self._limiter:
+                        self._limiter.pause(delay)
+                response.close()
+            self._record(lane, retries=1)
+            print(
+                f"[RATE LIMIT] Retrying {request.url.path} in {delay:.1f}s "
+                f"({response.status_code if response is not None else 'connection error'})"
+            )
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+__all__ = [
+    "BACKGROUND",
+    "INTERACTIVE",
+    "LaneMetrics",
+    "RateLimitedTransport",
+    "RateLimiter",
+    "get_rate_limit_metrics",
+    "llm_priority",
+]
@@ -2,11 +2,13 @@
 
 import streamlit as st
 
-from config import get_settings
+from config import configure_logging, get_settings
+from core.storage import drop_retired_collections
 from ui.pricing_display import render_pricing_table
 from ui.tabs.chat_tab import render_chat_tab
 from ui.tabs.explorer_tab import render_explorer_tab
 from ui.tabs.indexing_tab import render_indexing_tab
+from ui.usage_dashboard import render_usage_dashboard
 
 
 def init_session_state():
@@ -15,6 +17,15 @@ def init_session_state():
         st.session_state.resources = []
 
 
+@st.cache_resource
+def cleanup_retired_collections():
+    """Delete the collections left retired by a previous process (once per server)."""
+    try:
+        drop_retired_collections()
+    except Exception as e:
+        print(f"[CLEAR_DB] Warning: could not delete retired collections: {e}")
+
+
 def main():
     """Run the Tech Docs Explorer Streamlit application."""
     # Configure page
@@ -27,6 +38,8 @@ def main():
 
     # Load settings
     settings = get_settings()
+    configure_logging(settings.debug)
+    cleanup_retired_collections()
 
     # Initialize session state
     init_session_state()
@@ -49,12 +62,21 @@ def main():
 
         with st.expander("📋 Información de la App"):
             st.write(f"**Nombre:** {settings.app_name}")
-            st.write(f"**Ruta ChromaDB:** {settings.get_chroma_path()}")
+            if settings.chroma_mode == "http":
+                st.write(
+                    f"**Servidor ChromaDB:** {settings.chroma_host}:{settings.chroma_port}"
+                )
+            else:
+                st.write(f"**Ruta ChromaDB:** {settings.get_chroma_path()}")
 
         # Pricing table in sidebar (informational, applies to all tabs)
         with st.expander("💰 Precios por Modelo", expanded=False):
             render_pricing_table()
 
+        # Spend and latency recorded in the usage ledger
+        with st.expander("📊 Uso y Costos", expanded=False):
+            render_usage_dashboard()
+
     # Create tabs
     tab1, tab2, tab3 = st.tabs(["📥 Indexación", "💬 Chat", "📂 Explorador"])
 
@@ -0,0 +1,5 @@
+"""Tests for Tech Docs Explorer.
+
+Run from the project directory with:
+    uv run python -m unittest discover tests
+"""
@@ -0,0 +1,170 @@
+"""Tests for the web crawler loader against a local HTTP server."""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from core.loaders.crawler_loader import CrawlerLoader  # noqa: E402
+
+
+_ROBOTS = "User-agent: *\nDisallow: /private/\n"
+_LAST_MODIFIED = "Mon, 05 Jan 2026 10:00:00 GMT"
+
+
+def _page(title: str, links: List[str]) -> str:
+    """Build an HTML page linking to other paths."""
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><body><h1>{title}</h1>{anchors}</body></html>"
+
+
+class _Site(ThreadingHTTPServer):
+    """Small documentation site that records the requests it serves."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SiteHandler)
+        # path -> (body, validator header, validator value)
+        self.pages: Dict[str, Tuple[str, str, str]] = {
+            "/": (_page("Home", ["/a", "/b", "/private/secret"]), "ETag", '"home-1"'),
+            "/a": (_page("A", ["/a/deep"]), "ETag", '"a-1"'),
+            "/b": (_page("B", []), "Last-Modified", _LAST_MODIFIED),
+            "/a/deep": (_page("Deep", ["/a/deeper"]), "ETag", '"deep-1"'),
+            "/a/deeper": (_page("Deeper", []), "ETag", '"deeper-1"'),
+            "/private/secret": (_page("Secret", []), "ETag", '"secret-1"'),
+        }
+        self.requests: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def served(self, status: int) -> List[str]:
+        """Paths answered with a status, robots.txt excluded."""
+        with self._lock:
+            return [
+                path
+                for path, code in self.requests
+                if code == status and path != "/robots.txt"
+            ]
+
+    def record(self, path: str, status: int) -> None:
+        with self._lock:
+            self.requests.append((path, status))
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Serves the site pages with ETag / Last-Modified revalidation."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path == "/robots.txt":
+            self._send(200, _ROBOTS, "text/plain", {})
+            return
+
+        page = self.server.pages.get(self.path)
+        if page is None:
+            self._send(404, "not found", "text/plain", {})
+            return
+
+        body, header, value = page
+        if header == "ETag":
+            unchanged = self.headers.get("If-None-Match") == value
+        else:
+            unchanged = self.headers.get("If-Modified-Since") == value
+        if unchanged:
+            self._send(304, "", "text/html", {header: value})
+        else:
+            self._send(200, body, "text/html; charset=utf-8", {header: value})
+
+    def _send(
+        self, status: int, body: str, content_type: str, headers: Dict[str, str]
+    ) -> None:
+        data = body.encode()
+        self.server.record(self.path, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        """Silence per-request logging."""
+
+
+class CrawlerLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.site = _Site()
+        threading.Thread(target=self.site.serve_forever, daemon=True).start()
+        self.addCleanup(self.site.server_close)
+        self.addCleanup(self.site.shutdown)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+
+    def _loader(self, **kwargs) -> CrawlerLoader:
+        return CrawlerLoader(cache_dir=self.cache_dir, concurrency=4, **kwargs)
+
+    def _urls(self, documents) -> List[str]:
+        return sorted(
+            doc.metadata["source_url"].removeprefix(self.site.url) for doc in documents
+        )
+
+    def test_follows_links_up_to_max_depth(self):
+        documents = self._loader(max_depth=1, max_pages=100).load(self.site.url + "/")
+
+        self.assertEqual(self._urls(documents), ["/", "/a", "/b"])
+        self.assertNotIn("/a/deep", self.site.served(200))
+
+    def test_stops_at_page_budget(self):
+        loader = self._loader(max_depth=5, max_pages=2)
+        documents = loader.load(self.site.url + "/")
+
+        self.assertEqual(self._urls(documents), ["/", "/a"])
+        self.assertEqual(sorted(self.site.served(200)), ["/", "/a"])
+
+    def test_skips_pages_disallowed_by_robots(self):
+        loader = self._loader(max_depth=1, max_pages=100)
+        loader.load(self.site.url + "/")
+
+        self.assertEqual(loader.stats.skipped_robots, 1)
+        self.assertNotIn("/private/secret", self.site.served(200))
+
+    def test_ignores_robots_when_disabled(self):
+        loader = self._loader(max_depth=1, max_pages=100, respect_robots=False)
+        documents = loader.load(self.site.url + "/")
+
+        self.assertIn("/private/secret", self._urls(documents))
+
+    def test_revalidation_skips_unchanged_pages(self):
+        first = self._loader(max_depth=1, max_pages=100, only_changed=True)
+        self.assertEqual(self._urls(first.load(self.site.url + "/")), ["/", "/a", "/b"])
+
+        # Every page answers 304 (by ETag or Last-Modified): nothing to re-index
+        second = self._loader(max_depth=1, max_pages=100, only_changed=True)
+        self.assertEqual(second.load(self.site.url + "/"), [])
+        self.assertEqual(second.stats.not_modified, 3)
+        self.assertEqual(second.stats.fetched, 0)
+        self.assertEqual(sorted(self.site.served(304)), ["/", "/a", "/b"])
+
+        # Only the page whose validator changed is downloaded and returned
+        self.site.pages["/a"] = (_page("A v2", ["/a/deep"]), "ETag", '"a-2"')
+        third = self._loader(max_depth=1, max_pages=100, only_changed=True)
+        self.assertEqual(self._urls(third.load(self.site.url + "/")), ["/a"])
+        self.assertEqual(third.stats.fetched, 1)
+        self.assertEqual(third.stats.not_modified, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
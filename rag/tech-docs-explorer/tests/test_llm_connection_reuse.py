@@ -0,0 +1,168 @@
+"""Tests for LLM API connection reuse.
+
+Runs simulated queries (one embedding, one answer and one rerank call each)
+against a local stub of the OpenAI API and counts the TCP connections the
+stub accepts. The models of OpenAIProvider share one keep-alive pool, so
+the stub must see far fewer connections than requests; models with their
+own clients (the previous behaviour) open new connections on every query.
+"""
+
+import json
+import os
+import threading
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from llama_index.core.base.llms.types import ChatMessage  # noqa: E402
+from llama_index.embeddings.openai import OpenAIEmbedding  # noqa: E402
+from llama_index.llms.openai import OpenAI  # noqa: E402
+
+from llm import close_http_clients, get_llm_provider  # noqa: E402
+
+
+_QUERIES = 20
+_CHAT_RESPONSE = {
+    "id": "stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class _StubServer(ThreadingHTTPServer):
+    """OpenAI API stub that counts accepted connections and requests."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address) -> None:
+        """Count the connection and handle it in a thread."""
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers chat completions and embeddings over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        """Return a canned chat completion or embedding."""
+        self.server.count_request()
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/embeddings"):
+            inputs = body["input"] if isinstance(body["input"], list) else [1]
+            payload = {
+                "object": "list",
+                "model": body["model"],
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [0.1] * 8}
+                    for i in range(len(inputs))
+                ],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        else:
+            payload = _CHAT_RESPONSE
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        """Silence per-request logging."""
+
+
+def _separate_models() -> Tuple[OpenAI, OpenAIEmbedding, OpenAI]:
+    """Models with their own HTTP clients (no shared pool)."""
+    return (
+        OpenAI(model="gpt-4o-mini", api_key="stub"),
+        OpenAIEmbedding(model="text-embedding-3-small", api_key="stub"),
+        OpenAI(model="gpt-4o-mini", api_key="stub", temperature=0.0),
+    )
+
+
+def _pooled_models() -> Tuple[OpenAI, OpenAIEmbedding, OpenAI]:
+    """Models from OpenAIProvider, sharing the pooled HTTP client."""
+    provider = get_llm_provider("openai")
+    return (
+        provider.get_llm(),
+        provider.get_embedding_model(),
+        provider.get_rerank_llm(),
+    )
+
+
+class LLMConnectionReuseTest(unittest.TestCase):
+    def setUp(self):
+        self.server = _StubServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        previous_base = os.environ.get("OPENAI_API_BASE")
+        os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{self.server.server_port}/v1"
+        self.addCleanup(self._restore_env, previous_base)
+        # Start from an empty pool, and don't leave sockets to a dead stub behind
+        close_http_clients()
+        self.addCleanup(close_http_clients)
+
+    @staticmethod
+    def _restore_env(previous_base) -> None:
+        if previous_base is None:
+            os.environ.pop("OPENAI_API_BASE", None)
+        else:
+            os.environ["OPENAI_API_BASE"] = previous_base
+
+    def _run(
+        self, make_models: Callable[[], Tuple[OpenAI, OpenAIEmbedding, OpenAI]]
+    ) -> Tuple[int, int]:
+        """Run the queries and return (connections opened, requests served)."""
+        for _ in range(_QUERIES):
+            # A query builds its models, then embeds, answers and reranks;
+            # unique prompts keep the completion cache (if enabled) out of it
+            question = f"What is an ingress? {uuid.uuid4()}"
+            llm, embed_model, rerank_llm = make_models()
+            embed_model.get_query_embedding(question)
+            llm.chat([ChatMessage(role="user", content=question)])
+            rerank_llm.chat([ChatMessage(role="user", content=f"Rank: {question}")])
+        return self.server.connections, self.server.requests
+
+    def test_pooled_models_reuse_connections(self):
+        connections, requests = self._run(_pooled_models)
+
+        self.assertEqual(requests, 3 * _QUERIES)
+        self.assertGreaterEqual(connections, 1)
+        self.assertLessEqual(connections * 10, requests)
+
+    def test_separate_clients_open_connections_per_query(self):
+        connections, requests = self._run(_separate_models)
+
+        self.assertEqual(requests, 3 * _QUERIES)
+        self.assertGreaterEqual(connections, _QUERIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
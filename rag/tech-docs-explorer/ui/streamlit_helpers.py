@@ -4,16 +4,24 @@ import re
 import tempfile
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, Tuple
+from typing import Generator, List, Optional, Tuple
 
 import streamlit as st
-from chromadb import PersistentClient
+from chromadb.api import ClientAPI
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 from config import get_settings
 from core.helpers.pricing import format_cost
-from core.indexing import IndexStats
-from core.storage import get_chroma_client
+from core.indexing import (
+    ChunkDetail,
+    DocumentInfo,
+    DocumentSummary,
+    IndexStats,
+    get_all_documents_summary,
+    get_chunks_for_document,
+    get_indexed_documents,
+)
+from core.storage import get_chroma_client, get_data_version
 from llm import get_llm_provider
 
 
@@ -87,7 +95,14 @@ def display_index_stats(stats: IndexStats) -> None:
         st.metric(label="📄 Documentos Indexados", value=stats.documents_processed)
 
     with col2:
-        st.metric(label="📦 Chunks Creados", value=stats.num_chunks)
+        st.metric(
+            label="📦 Chunks Creados",
+            value=stats.num_chunks,
+            help=(
+                f"{stats.duplicates_removed:,} chunks casi duplicados descartados "
+                f"({stats.dedup_ratio:.1%})"
+            ),
+        )
 
     with col3:
         st.metric(label="⏱️ Tiempo de Procesamiento", value=f"{stats.time_taken:.2f}s")
@@ -99,9 +114,50 @@ def display_index_stats(stats: IndexStats) -> None:
             help=f"Basado en {stats.embedding_tokens:,} tokens de embeddings",
         )
 
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric(label="🚀 Chunks/s", value=f"{stats.chunks_per_second:,.1f}")
+
+    with col2:
+        st.metric(
+            label="🔤 Tokens/s",
+            value=f"{stats.tokens_per_second:,.0f}",
+            help="Tokens de embeddings por segundo de generación de embeddings",
+        )
+
+    with col3:
+        st.metric(
+            label="📏 Datos Procesados",
+            value=f"{stats.bytes_processed / (1024 * 1024):,.2f} MB",
+        )
+
+    with col4:
+        st.metric(
+            label="🧮 Memoria Pico (RSS)",
+            value=f"{stats.peak_rss_mb:,.0f} MB",
+            help="Pico de memoria residente del proceso",
+        )
+
+    # Per-stage breakdown
+    stage_labels = {
+        "load": "📥 Carga",
+        "split": "✂️ División",
+        "dedup": "🧬 Deduplicación",
+        "embed": "🧠 Embeddings",
+        "store": "💾 Escritura en ChromaDB",
+    }
+    total = sum(stats.stage_times.values())
+    with st.expander("⏱️ Tiempo por etapa", expanded=False):
+        for stage, seconds in stats.stage_times.items():
+            share = seconds / total if total else 0.0
+            st.progress(
+                share, text=f"{stage_labels[stage]}: {seconds:.2f}s ({share:.0%})"
+            )
+
 
 @st.cache_resource
-def init_cached_resources() -> Tuple[PersistentClient, object]:
+def init_cached_resources() -> Tuple[ClientAPI, object]:
     """
     Initialize and cache ChromaDB client and LLM provider.
 
@@ -120,3 +176,81 @@ def init_cached_resources() -> Tuple[PersistentClient, object]:
     llm_provider = get_llm_provider(settings.llm_provider)
 
     return chroma_client, llm_provider
+
+
+# Cached reads of the indexed data. Each cached function takes the data
+# version as its first argument, so any indexing, delete or clear (which bumps
+# the version) makes the next rerun read fresh data; until then reruns are
+# served from memory without touching ChromaDB.
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _documents_summary(version: int) -> List[DocumentSummary]:
+    """Read the document summaries of a data version."""
+    return get_all_documents_summary()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _indexed_documents(version: int) -> List[DocumentInfo]:
+    """Read the indexed documents of a data version."""
+    return get_indexed_documents()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _document_chunks(
+    version: int,
+    doc_identifier: str,
+    offset: int,
+    limit: Optional[int],
+    include_embeddings: bool,
+) -> List[ChunkDetail]:
+    """Read one page of chunks of a document for a data version."""
+    return get_chunks_for_document(
+        doc_identifier,
+        offset=offset,
+        limit=limit,
+        include_embeddings=include_embeddings,
+    )
+
+
+def cached_documents_summary() -> List[DocumentSummary]:
+    """
+    Get the summaries of all indexed documents, cached until the data changes.
+
+    Returns:
+        List of DocumentSummary objects (see get_all_documents_summary)
+    """
+    return _documents_summary(get_data_version())
+
+
+def cached_indexed_documents() -> List[DocumentInfo]:
+    """
+    Get all indexed documents, cached until the data changes.
+
+    Returns:
+        List of DocumentInfo objects (see get_indexed_documents)
+    """
+    return _indexed_documents(get_data_version())
+
+
+def cached_chunks_for_document(
+    doc_identifier: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    include_embeddings: bool = False,
+) -> List[ChunkDetail]:
+    """
+    Get one page of chunks of a document, cached until the data changes.
+
+    Args:
+        doc_identifier: Document name (original_filename, filename or source_url)
+        offset: Number of chunks to skip
+        limit: Maximum number of chunks to return (None = all)
+        include_embeddings: Whether to load the embedding vector of each chunk
+
+    Returns:
+        List of ChunkDetail objects (see get_chunks_for_document)
+    """
+    return _document_chunks(
+        get_data_version(), doc_identifier, offset, limit, include_embeddings
+    )
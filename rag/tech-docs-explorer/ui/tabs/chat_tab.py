@@ -6,7 +6,8 @@ import streamlit as st
 
 from config import get_settings
 from core.helpers.pricing import format_cost
-from core.retrieval import RAGConfig, query
+from core.retrieval import Conversation, RAGConfig, query
+from ui.streamlit_helpers import cached_indexed_documents
 
 
 def render_chat_tab() -> None:
@@ -18,6 +19,8 @@ def render_chat_tab() -> None:
         st.session_state.pending_query = None
     if "pending_config" not in st.session_state:
         st.session_state.pending_config = None
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = Conversation()
 
     # Get settings for defaults
     settings = get_settings()
@@ -67,16 +70,72 @@ def render_chat_tab() -> None:
             "🐛 Debug", value=False, help="Mostrar info detallada del proceso"
         )
 
+    # Stack filter (empty = search every stack)
+    try:
+        available_stacks = sorted(
+            {
+                stack.strip()
+                for doc in cached_indexed_documents()
+                for stack in doc.stack.split(",")
+                if stack.strip()
+            }
+        )
+    except RuntimeError:
+        available_stacks = []
+    stacks = st.multiselect(
+        "Stacks",
+        options=available_stacks,
+        help="Buscar solo en estos stacks (vacío = todos)",
+    )
+
+    # Context sent to the LLM around each retrieved chunk (small-to-big)
+    expansion_labels = {
+        "neighbours": "Chunks vecinos",
+        "parent": "Sección completa",
+        "none": "Solo chunks recuperados",
+    }
+    context_expansion = st.selectbox(
+        "🧩 Contexto",
+        options=list(expansion_labels),
+        index=list(expansion_labels).index(settings.expansion_mode),
+        format_func=expansion_labels.get,
+        help="Texto que recibe el LLM alrededor de cada chunk recuperado "
+        "(sin embeddings adicionales)",
+    )
+
     st.divider()
 
+    # Previous turns of the conversation (the latest answer is shown below)
+    conversation = st.session_state.conversation
+    previous_turns = conversation.turns[:-1] if st.session_state.rag_response else []
+    if previous_turns:
+        with st.expander(
+            f"🗨️ Conversación ({len(previous_turns)} turno(s) anteriores)",
+            expanded=False,
+        ):
+            for turn in previous_turns:
+                with st.chat_message("user"):
+                    st.markdown(turn.question)
+                with st.chat_message("assistant"):
+                    st.markdown(turn.answer)
+
     # Question input
     prompt = st.text_area(
         "Escribe tu pregunta:",
         height=100,
+        help="Las preguntas de seguimiento usan el contexto de la conversación",
     )
 
-    # Search button
-    if st.button("🔍 Buscar Respuesta", type="primary"):
+    # Search and new conversation buttons
+    col1, col2 = st.columns([1, 1])
+    with col2:
+        if st.button("🧹 Nueva Conversación", disabled=not conversation.turns):
+            conversation.reset()
+            st.session_state.rag_response = None
+            st.rerun()
+    with col1:
+        search_clicked = st.button("🔍 Buscar Respuesta", type="primary")
+    if search_clicked:
         if not prompt:
             st.warning("⚠️ Por favor, escribe una pregunta.")
         else:
@@ -90,6 +149,8 @@ def render_chat_tab() -> None:
                 use_hyde=use_hyde,
                 use_reranking=use_reranking,
                 debug_mode=debug_mode,
+                stacks=stacks,
+                context_expansion=context_expansion,
             )
             st.rerun()
 
@@ -100,6 +161,7 @@ def render_chat_tab() -> None:
                 st.session_state.rag_response = query(
                     st.session_state.pending_query,
                     st.session_state.pending_config,
+                    conversation,
                 )
         except ValueError as e:
             st.error(f"❌ Error: {e}")
@@ -122,6 +184,8 @@ def render_chat_tab() -> None:
         if answer.strip() == "Empty Response":
             answer = "Respuesta Vacía"
         st.markdown(answer)
+        if response.standalone_query:
+            st.caption(f"🔁 Pregunta reformulada: {response.standalone_query}")
 
         # Metrics (collapsible)
         with st.expander("📊 Métricas", expanded=False):
@@ -135,6 +199,26 @@ def render_chat_tab() -> None:
                 format_cost(m.estimated_cost),
                 help=f"Query: {m.query_tokens} tokens | LLM: {m.llm_input_tokens} in + {m.llm_output_tokens} out",
             )
+            if m.llm_cache_hits:
+                st.caption(
+                    f"⚡ {m.llm_cache_hits} llamada(s) al LLM servidas desde caché "
+                    f"(ahorro estimado: {format_cost(m.llm_cache_saved_cost)})"
+                )
+            if m.context_chunks_added:
+                st.caption(
+                    f"🧩 Contexto ampliado con {m.context_chunks_added} chunk(s) "
+                    "vecinos o de la misma sección"
+                )
+            if m.retrieval_reused:
+                st.caption(
+                    "♻️ Mismo tema que la pregunta anterior: se reutilizaron sus chunks "
+                    "(sin nueva búsqueda)"
+                )
+            if m.llm_queue_time_ms >= 100 or m.llm_retries:
+                st.caption(
+                    f"⏳ Espera por límite de tasa del LLM: {m.llm_queue_time_ms:.0f} ms "
+                    f"({m.llm_retries} reintento(s))"
+                )
 
         # All chunks (collapsible) - shows which were used
         if response.all_chunks:
@@ -257,6 +341,11 @@ def render_chat_tab() -> None:
                         "✅ Aplicado" if response.metrics.use_hyde else "⚪ No activado"
                     )
                     st.metric("🔮 HyDE", hyde_indicator)
+                st.caption(
+                    f"Colecciones consultadas: {response.metrics.collections_searched} | "
+                    f"Retrieval: {response.metrics.retrieval_time_ms:.0f} ms | "
+                    f"LLM: {response.metrics.llm_time_ms:.0f} ms"
+                )
 
                 st.markdown("---")
 
@@ -6,8 +6,8 @@ import time
 import pandas as pd
 import streamlit as st
 
-from core.indexing import get_all_documents_summary, get_chunks_for_document
-from core.storage import clear_database, invalidate_client
+from core.storage import clear_database
+from ui.streamlit_helpers import cached_chunks_for_document, cached_documents_summary
 
 
 def render_explorer_tab() -> None:
@@ -17,9 +17,9 @@ def render_explorer_tab() -> None:
         "Explora los documentos indexados, visualiza sus chunks y gestiona la base de datos."
     )
 
-    # Load documents
+    # Load documents (served from memory until the indexed data changes)
     try:
-        documents = get_all_documents_summary()
+        documents = cached_documents_summary()
     except Exception as e:
         st.error(f"❌ Error al cargar documentos: {e}")
         documents = []
@@ -131,20 +131,17 @@ def _render_document_details(selected_doc, selected_idx: int) -> None:
     st.divider()
     st.subheader("🧩 Chunks del Documento")
 
-    # Get chunks for selected document
-    try:
-        chunks = get_chunks_for_document(selected_doc.name)
-    except Exception as e:
-        st.error(f"❌ Error al cargar chunks: {e}")
-        chunks = []
-
-    if not chunks:
-        st.warning("⚠️ No se encontraron chunks para este documento.")
-        return
+    show_embeddings = st.toggle(
+        "🧠 Cargar embeddings",
+        value=False,
+        key="explorer_show_embeddings",
+        help="Los embeddings solo se leen de ChromaDB cuando esta opción está activa",
+    )
 
-    # Pagination controls
+    # Pagination controls (total comes from the catalog, chunks are fetched per page)
     chunks_per_page = 5
-    total_pages = (len(chunks) + chunks_per_page - 1) // chunks_per_page
+    total_chunks = selected_doc.num_chunks
+    total_pages = max((total_chunks + chunks_per_page - 1) // chunks_per_page, 1)
 
     # Initialize page in session state
     page_key = f"chunk_page_{selected_idx}"
@@ -155,10 +152,27 @@ def _render_document_details(selected_doc, selected_idx: int) -> None:
     if st.session_state[page_key] >= total_pages:
         st.session_state[page_key] = 0
 
+    start_idx = st.session_state[page_key] * chunks_per_page
+
+    # Get only the current page of chunks for the selected document
+    try:
+        chunks = cached_chunks_for_document(
+            selected_doc.name,
+            offset=start_idx,
+            limit=chunks_per_page,
+            include_embeddings=show_embeddings,
+        )
+    except Exception as e:
+        st.error(f"❌ Error al cargar chunks: {e}")
+        chunks = []
+
+    if not chunks:
+        st.warning("⚠️ No se encontraron chunks para este documento.")
+        return
+
     # Page info and navigation
-    start_chunk = st.session_state[page_key] * chunks_per_page + 1
-    end_chunk = min((st.session_state[page_key] + 1) * chunks_per_page, len(chunks))
-    st.caption(f"Mostrando chunks {start_chunk}-{end_chunk} de {len(chunks)}")
+    end_idx = start_idx + len(chunks)
+    st.caption(f"Mostrando chunks {start_idx + 1}-{end_idx} de {total_chunks}")
 
     if total_pages > 1:
         nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
@@ -188,11 +202,8 @@ def _render_document_details(selected_doc, selected_idx: int) -> None:
                 st.rerun()
 
     # Display current page of chunks
-    start_idx = st.session_state[page_key] * chunks_per_page
-    end_idx = min(start_idx + chunks_per_page, len(chunks))
-
-    for i, chunk in enumerate(chunks[start_idx:end_idx], start=start_idx + 1):
-        with st.expander(f"📝 Chunk {i} de {len(chunks)}", expanded=False):
+    for i, chunk in enumerate(chunks, start=start_idx + 1):
+        with st.expander(f"📝 Chunk {i} de {total_chunks}", expanded=False):
             # Chunk ID
             st.caption(f"ID: `{chunk.chunk_id[:60]}...`")
 
@@ -250,7 +261,6 @@ def _render_clear_database_section() -> None:
         if confirm_clicked:
             with st.spinner("Limpiando base de datos..."):
                 result = clear_database()
-                invalidate_client()
 
             if result.get("success"):
                 st.success(f"✅ {result['message']}")
@@ -289,6 +299,9 @@ def _render_metadata_table(metadata: dict) -> None:
         "text_template",
         "excluded_embed_metadata_keys",
         "excluded_llm_metadata_keys",
+        "prev_chunk_id",
+        "next_chunk_id",
+        "parent_id",
     }
 
     # Field name translations with icons
@@ -1,4 +1,4 @@
-"""Indexing Tab - UI for adding and processing URLs and PDFs."""
+"""Indexing Tab - UI for adding and processing URLs, PDFs and Markdown/HTML files."""
 
 import os
 import shutil
@@ -9,7 +9,8 @@ from pathlib import Path
 import streamlit as st
 
 from core.indexing import index_documents
-from core.loaders import PDFLoader, WebLoader
+from core.loaders import MarkdownLoader, PDFLoader, WebLoader
+from core.storage import rebuild_stacks
 from ui.streamlit_helpers import (
     display_index_stats,
     save_uploaded_file,
@@ -17,6 +18,15 @@ from ui.streamlit_helpers import (
 )
 
 
+# Display label for each resource type in the resources table
+_RESOURCE_LABELS = {"url": "🌐 URL", "pdf": "📄 PDF", "markdown": "📝 MD/HTML"}
+
+
+def _file_resource_type(filename: str) -> str:
+    """Get the resource type of an uploaded file from its extension."""
+    return "pdf" if Path(filename).suffix.lower() == ".pdf" else "markdown"
+
+
 def render_indexing_tab() -> None:
     """Renders the indexing tab with all its functionalities."""
 
@@ -54,19 +64,22 @@ def render_indexing_tab() -> None:
                     st.success(f"✅ URL agregada: {url}")
                     st.rerun()
 
-    # Section 2: Upload PDFs
-    with st.expander("📄 Subir PDFs", expanded=True):
+    # Section 2: Upload files (PDF, Markdown, HTML)
+    with st.expander("📄 Subir Archivos", expanded=True):
         uploaded_files = st.file_uploader(
-            "Archivos PDF",
-            type=["pdf"],
+            "Archivos PDF, Markdown o HTML",
+            type=["pdf", "md", "markdown", "html", "htm"],
             accept_multiple_files=True,
-            help="Selecciona uno o más archivos PDF",
+            help=(
+                "Selecciona uno o más archivos. Markdown y HTML se dividen "
+                "por secciones (encabezados y bloques de código)"
+            ),
         )
 
         if uploaded_files:
             st.write(f"**{len(uploaded_files)} archivo(s) seleccionado(s)**")
 
-            # Form to assign stacks to each PDF
+            # Form to assign stacks to each file
             with st.form("add_pdf_form"):
                 pdf_stacks = {}
                 for uploaded_file in uploaded_files:
@@ -76,7 +89,7 @@ def render_indexing_tab() -> None:
                         placeholder="python, react, nodejs...",
                     )
 
-                add_pdfs = st.form_submit_button("➕ Agregar PDFs", type="primary")
+                add_pdfs = st.form_submit_button("➕ Agregar Archivos", type="primary")
 
                 if add_pdfs:
                     # Validate that all have stack assigned
@@ -86,10 +99,10 @@ def render_indexing_tab() -> None:
 
                     if missing_stacks:
                         st.error(
-                            f"❌ Los siguientes PDFs requieren stack: {', '.join(missing_stacks)}"
+                            f"❌ Los siguientes archivos requieren stack: {', '.join(missing_stacks)}"
                         )
                     else:
-                        # Save PDFs temporarily and add to resources
+                        # Save files temporarily and add to resources
                         # Note: Temp files will be cleaned up after indexing
                         for uploaded_file in uploaded_files:
                             with save_uploaded_file(uploaded_file) as temp_path:
@@ -101,7 +114,7 @@ def render_indexing_tab() -> None:
                                     os.close(fd)  # Close the file descriptor
                                     shutil.copy2(temp_path, persistent_path)
                                     new_resource = {
-                                        "type": "pdf",
+                                        "type": _file_resource_type(uploaded_file.name),
                                         "source": persistent_path,
                                         "stack": pdf_stacks[uploaded_file.name].strip(),
                                         "filename": uploaded_file.name,
@@ -112,7 +125,7 @@ def render_indexing_tab() -> None:
                                     Path(persistent_path).unlink(missing_ok=True)
                                     raise
 
-                        st.success(f"✅ {len(uploaded_files)} PDF(s) agregado(s)")
+                        st.success(f"✅ {len(uploaded_files)} archivo(s) agregado(s)")
                         st.rerun()
 
     st.divider()
@@ -128,8 +141,7 @@ def render_indexing_tab() -> None:
                 col1, col2, col3, col4 = st.columns([1, 4, 2, 1])
 
                 with col1:
-                    resource_type = "🌐 URL" if resource["type"] == "url" else "📄 PDF"
-                    st.write(resource_type)
+                    st.write(_RESOURCE_LABELS[resource["type"]])
 
                 with col2:
                     source = (
@@ -144,8 +156,8 @@ def render_indexing_tab() -> None:
 
                 with col4:
                     if st.button("🗑️", key=f"delete_{idx}", help="Eliminar recurso"):
-                        # Clean up temp file if it's a PDF
-                        if st.session_state.resources[idx]["type"] == "pdf":
+                        # Clean up temp file if it's an uploaded file
+                        if st.session_state.resources[idx]["type"] != "url":
                             try:
                                 Path(st.session_state.resources[idx]["source"]).unlink(
                                     missing_ok=True
@@ -163,6 +175,26 @@ def render_indexing_tab() -> None:
         st.divider()
 
         # Section 4: Indexing action (only when resources exist)
+        rebuild = st.checkbox(
+            "♻️ Reconstruir índice (blue-green)",
+            value=False,
+            help=(
+                "Indexa los recursos en una nueva versión de la colección que "
+                "reemplaza a la actual al terminar. Las consultas siguen usando la "
+                "versión actual mientras tanto; las versiones anteriores se eliminan "
+                "en segundo plano."
+            ),
+        )
+        keep_untouched = st.checkbox(
+            "Conservar documentos no reindexados",
+            value=False,
+            disabled=not rebuild,
+            help=(
+                "Copia a la nueva versión los documentos que no se vuelven a "
+                "indexar. Solo se permite si la versión actual usa el mismo modelo "
+                "de embeddings y la misma división en chunks."
+            ),
+        )
         if st.button(
             "🚀 Indexar",
             type="primary",
@@ -170,6 +202,8 @@ def render_indexing_tab() -> None:
             width="stretch",
         ):
             st.session_state.start_indexing = True
+            st.session_state.rebuild_index = rebuild
+            st.session_state.keep_untouched = rebuild and keep_untouched
             st.rerun()
 
         # Section 5: Indexing process
@@ -177,7 +211,9 @@ def render_indexing_tab() -> None:
             _perform_indexing()
 
     else:
-        st.info("👆 Comienza agregando URLs o PDFs usando los formularios de arriba")
+        st.info(
+            "👆 Comienza agregando URLs o archivos usando los formularios de arriba"
+        )
 
 
 def _perform_indexing() -> None:
@@ -187,7 +223,7 @@ def _perform_indexing() -> None:
 
     with st.status("🔄 Indexando documentos...", expanded=True) as status_widget:
         # Step 1: Load documents
-        st.write("📥 **Paso 1/4:** Cargando documentos...")
+        st.write("📥 **Paso 1/2:** Cargando documentos...")
         start_time = time.time()
 
         for idx, resource in enumerate(st.session_state.resources, 1):
@@ -198,19 +234,41 @@ def _perform_indexing() -> None:
                     )
                     loader = WebLoader()
                     documents = loader.load(resource["source"])
+                elif resource["type"] == "markdown":
+                    st.write(
+                        f"   → Cargando archivo {idx}/{total_resources}: {resource.get('filename', 'archivo')}..."
+                    )
+                    loader = MarkdownLoader()
+                    documents = loader.load(resource["source"])
                 else:  # PDF
                     st.write(
                         f"   → Cargando PDF {idx}/{total_resources}: {resource.get('filename', 'archivo')}..."
                     )
                     loader = PDFLoader()
                     documents = loader.load(resource["source"])
+                    if loader.cache_hit:
+                        st.write("     ↳ Texto recuperado de la caché (sin re-parsear)")
+                    else:
+                        slow_pages = [
+                            t
+                            for t in loader.page_timings
+                            if t.seconds >= loader.slow_page_seconds
+                        ]
+                        if slow_pages:
+                            st.write(
+                                f"     ↳ ⚠️ {len(slow_pages)} página(s) lenta(s): "
+                                + ", ".join(
+                                    f"p{t.page_label} ({t.seconds:.1f}s)"
+                                    for t in slow_pages[:5]
+                                )
+                            )
 
                 # Add stack to metadata of each document
                 for doc in documents:
                     doc.metadata["stack"] = resource["stack"]
                     doc.metadata["source_type"] = resource["type"]
-                    # Override filename for PDFs with original name (preserves user's filename)
-                    if resource["type"] == "pdf" and "filename" in resource:
+                    # Override filename for uploads with original name (preserves user's filename)
+                    if resource["type"] != "url" and "filename" in resource:
                         doc.metadata["filename"] = resource["filename"]
                         doc.metadata["original_filename"] = resource["filename"]
 
@@ -228,14 +286,10 @@ def _perform_indexing() -> None:
             st.session_state.start_indexing = False
             return
 
-        # Step 2: Split into chunks
-        st.write("✂️ **Paso 2/4:** Dividiendo en chunks...")
-        # (The index_documents function does this internally)
-        st.write("   → Aplicando SentenceSplitter...")
-
-        # Step 3: Generate embeddings and index
-        st.write("🧠 **Paso 3/4:** Generando embeddings e indexando...")
-        index_start_time = time.time()
+        # Step 2: Split, deduplicate, embed and store (timed by index_documents)
+        st.write(
+            "🧠 **Paso 2/2:** Dividiendo en chunks, generando embeddings e indexando..."
+        )
 
         try:
             # Collect all unique stacks from resources as comma-separated string
@@ -247,13 +301,42 @@ def _perform_indexing() -> None:
                 "indexed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
             }
 
-            index_stats = index_documents(all_documents, metadata)
-            index_time = time.time() - index_start_time
-            st.write(f"✅ Indexación completada en {index_time:.2f}s")
-
-            # Step 4: Save results
-            st.write("💾 **Paso 4/4:** Guardando en ChromaDB...")
-            st.write("✅ Datos persistidos correctamente")
+            if st.session_state.get("rebuild_index", False):
+                st.write("   → Reconstruyendo en una nueva versión de la colección...")
+                # With sharding enabled only the shards of these stacks are rebuilt
+                with rebuild_stacks(
+                    "tech_docs",
+                    stacks,
+                    keep_documents=st.session_state.get("keep_untouched", False),
+                ) as targets:
+                    index_stats = index_documents(
+                        all_documents,
+                        metadata,
+                        load_time=load_time,
+                        shard_targets=targets,
+                    )
+                versions = ", ".join(
+                    f"`{name}`" for name in sorted(set(targets.values()))
+                )
+                st.write(f"   → Versiones activas: {versions}")
+            else:
+                index_stats = index_documents(
+                    all_documents, metadata, load_time=load_time
+                )
+            st.write(
+                f"   → División en chunks: {index_stats.split_time:.2f}s "
+                f"({index_stats.num_chunks + index_stats.duplicates_removed} chunks)"
+            )
+            st.write(
+                f"   → Deduplicación: {index_stats.dedup_time:.2f}s "
+                f"({index_stats.duplicates_removed} descartados)"
+            )
+            st.write(
+                f"   → Embeddings: {index_stats.embed_time:.2f}s "
+                f"({index_stats.tokens_per_second:,.0f} tokens/s)"
+            )
+            st.write(f"   → Escritura en ChromaDB: {index_stats.store_time:.2f}s")
+            st.write(f"✅ Indexación completada en {index_stats.time_taken:.2f}s")
 
             # Update final status
             total_time = time.time() - start_time
@@ -266,12 +349,14 @@ def _perform_indexing() -> None:
             st.success("🎉 **Indexación exitosa!**")
             display_index_stats(index_stats)
 
-            # Clean up temporary PDF files
+            # Clean up temporary uploaded files
             _cleanup_temp_files()
 
             # Clear resources after successful indexing
             st.session_state.resources = []
             st.session_state.start_indexing = False
+            st.session_state.rebuild_index = False
+            st.session_state.keep_untouched = False
 
         except Exception as e:
             st.error(f"❌ Error durante la indexación: {str(e)}")
@@ -280,9 +365,9 @@ def _perform_indexing() -> None:
 
 
 def _cleanup_temp_files() -> None:
-    """Clean up temporary PDF files stored in resources."""
+    """Clean up temporary uploaded files stored in resources."""
     for resource in st.session_state.resources:
-        if resource["type"] == "pdf":
+        if resource["type"] != "url":
             try:
                 Path(resource["source"]).unlink(missing_ok=True)
             except Exception as e:
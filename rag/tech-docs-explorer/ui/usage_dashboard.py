@@ -0,0 +1,108 @@
+"""UI helper for displaying the usage and cost ledger."""
+
+import time
+from typing import Any, Dict
+
+import pandas as pd
+import streamlit as st
+
+from config import get_settings
+from core.helpers.pricing import format_cost
+from core.helpers.usage import (
+    aggregate_usage,
+    expensive_queries,
+    latency_percentile,
+    spend_today,
+)
+
+
+_OPERATION_LABELS = {"query": "Consulta", "index": "Indexación"}
+# Seconds the ledger reads are reused across reruns (the sidebar renders on every one)
+_CACHE_TTL_SECONDS = 30
+
+
+@st.cache_data(show_spinner=False, ttl=_CACHE_TTL_SECONDS)
+def _read_usage(days: int) -> Dict[str, Any]:
+    """Read everything the dashboard shows for the last days from the ledger."""
+    since = time.time() - days * 86400
+    return {
+        "totals": aggregate_usage(group_by=(), since=since)[0],
+        "today": spend_today(),
+        "p50": latency_percentile(50, since=since),
+        "p95": latency_percentile(95, since=since),
+        "daily": aggregate_usage(group_by=("day", "operation"), since=since),
+        "by_model": aggregate_usage(group_by=("operation", "model"), since=since),
+        "patterns": expensive_queries(limit=5, since=since),
+    }
+
+
+def render_usage_dashboard(days: int = 7) -> None:
+    """Render spend and latency from the usage ledger in a compact sidebar layout.
+
+    Shows today's spend (against the daily budget, if set), query latency,
+    daily cost, cost by operation and model, and the most expensive query
+    patterns of the last days. Figures are read at most every 30 seconds.
+
+    Args:
+        days: Number of days covered by the charts and tables.
+    """
+    settings = get_settings()
+    if not settings.usage_enabled:
+        st.caption("Registro de uso desactivado (`usage.enabled` en `config.yaml`)")
+        return
+
+    usage = _read_usage(days)
+    totals = usage["totals"]
+    if not totals["operations"]:
+        st.caption("Aún no hay consultas ni indexaciones registradas")
+        return
+
+    today = usage["today"]
+    budget = settings.usage_daily_budget_usd
+    st.metric("💵 Gasto de hoy", format_cost(today))
+    if budget > 0:
+        st.progress(
+            min(today / budget, 1.0),
+            text=f"{today / budget:.0%} del presupuesto diario (USD ${budget:.2f})",
+        )
+    st.metric(f"🗓️ Gasto últimos {days} días", format_cost(totals["cost"]))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("⏱️ p50", f"{usage['p50']:.0f} ms")
+    with col2:
+        st.metric("⏱️ p95", f"{usage['p95']:.0f} ms")
+
+    # Daily cost per operation
+    df = pd.DataFrame(usage["daily"])
+    df["operation"] = df["operation"].map(lambda op: _OPERATION_LABELS.get(op, op))
+    st.bar_chart(
+        df.pivot_table(index="day", columns="operation", values="cost", aggfunc="sum"),
+        height=180,
+    )
+
+    # Cost by operation and model
+    by_model = pd.DataFrame(usage["by_model"])
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Operación": by_model["operation"].map(
+                    lambda op: _OPERATION_LABELS.get(op, op)
+                ),
+                "Modelo": by_model["model"],
+                "N": by_model["operations"],
+                "Costo": by_model["cost"].map(lambda c: f"${c:.4f}"),
+                "ms prom.": by_model["avg_latency_ms"].round(0),
+            }
+        ),
+        hide_index=True,
+    )
+
+    # Most expensive query patterns
+    if usage["patterns"]:
+        st.markdown("**Consultas más costosas**")
+        for entry in usage["patterns"]:
+            st.caption(
+                f"{entry['pattern'][:60] or '—'} · {entry['operations']}x · "
+                f"${entry['cost']:.4f} · {entry['avg_latency_ms']:.0f} ms"
+            )